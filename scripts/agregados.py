@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# agregados.py - Agregados diários dos candidatos (contagens, histograma de score e esboço de quantis de preço)
+
+import json
+import math
+
+# Erro relativo máximo dos quantis de preço estimados pelo esboço
+PRECISAO_PRECO = 0.01
+
+# Limiares usados pelos relatórios da analise_avancada
+SCORE_ALERTA_ALTO = 30
+SCORE_ALERTA_MAXIMO = 35
+PRECO_MUITO_BAIXO = 3000
+CARACTERISTICAS_SUSPEITAS = {
+    'anime_matrix': 'anime matrix',
+    'mini_led': 'mini led',
+    'gu604': 'gu604'
+}
+
+
+class EsbocoQuantis:
+    """Histograma com baldes logarítmicos: quantis com erro relativo fixo e junção por soma"""
+
+    gama = (1 + PRECISAO_PRECO) / (1 - PRECISAO_PRECO)
+    log_gama = math.log(gama)
+
+    def __init__(self, baldes=None):
+        self.baldes = baldes or {}
+
+    def adicionar(self, valor, quantidade=1):
+        balde = math.ceil(math.log(valor) / self.log_gama)
+        self.baldes[balde] = self.baldes.get(balde, 0) + quantidade
+
+    def combinar(self, outro):
+        for balde, quantidade in outro.baldes.items():
+            self.baldes[balde] = self.baldes.get(balde, 0) + quantidade
+
+    def quantil(self, q):
+        """Valor aproximado do quantil q (0 a 1), ou None se o esboço estiver vazio"""
+        total = sum(self.baldes.values())
+        if not total:
+            return None
+        alvo = q * (total - 1)
+        acumulado = 0
+        for balde in sorted(self.baldes):
+            acumulado += self.baldes[balde]
+            if acumulado > alvo:
+                return 2 * self.gama ** balde / (self.gama + 1)
+
+    def para_json(self):
+        return json.dumps({str(balde): quantidade for balde, quantidade in self.baldes.items()})
+
+    @classmethod
+    def de_json(cls, texto):
+        return cls({int(balde): quantidade for balde, quantidade in json.loads(texto or '{}').items()})
+
+
+class AgregadoDiario:
+    """Resumo dos candidatos de um dia e site; agregados de vários dias se juntam com combinar()"""
+
+    CAMPOS = ('total', 'soma_score', 'score_maximo', 'alertas_altos', 'alertas_maximos',
+              'precos', 'soma_precos', 'preco_minimo', 'preco_maximo', 'precos_baixos',
+              'anime_matrix', 'mini_led', 'gu604')
+
+    def __init__(self):
+        for campo in self.CAMPOS:
+            setattr(self, campo, 0)
+        self.preco_minimo = None
+        self.preco_maximo = None
+        self.histograma_score = {}
+        self.esboco_preco = EsbocoQuantis()
+        self.vendedores = {}
+
+    def adicionar(self, candidato):
+        score = candidato.get('score_total', 0) or 0
+        preco = candidato.get('preco', 0) or 0
+        titulo = candidato.get('titulo', '').lower()
+
+        self.total += 1
+        self.soma_score += score
+        self.score_maximo = max(self.score_maximo, score) if self.total > 1 else score
+        self.histograma_score[score] = self.histograma_score.get(score, 0) + 1
+        self.alertas_altos += score >= SCORE_ALERTA_ALTO
+        self.alertas_maximos += score >= SCORE_ALERTA_MAXIMO
+
+        if preco > 0:
+            self.precos += 1
+            self.soma_precos += preco
+            self.preco_minimo = preco if self.preco_minimo is None else min(self.preco_minimo, preco)
+            self.preco_maximo = preco if self.preco_maximo is None else max(self.preco_maximo, preco)
+            self.precos_baixos += preco < PRECO_MUITO_BAIXO
+            self.esboco_preco.adicionar(preco)
+
+        for campo, termo in CARACTERISTICAS_SUSPEITAS.items():
+            setattr(self, campo, getattr(self, campo) + (termo in titulo))
+
+        vendedor = candidato.get('vendedor', 'Anônimo')
+        if vendedor != 'Anônimo':
+            self.vendedores[vendedor] = self.vendedores.get(vendedor, 0) + 1
+
+    def combinar(self, outro):
+        if not outro.total:
+            return
+        self.score_maximo = max(self.score_maximo, outro.score_maximo) if self.total else outro.score_maximo
+        for campo in ('total', 'soma_score', 'alertas_altos', 'alertas_maximos', 'precos', 'soma_precos',
+                      'precos_baixos', 'anime_matrix', 'mini_led', 'gu604'):
+            setattr(self, campo, getattr(self, campo) + getattr(outro, campo))
+        if outro.preco_minimo is not None:
+            self.preco_minimo = outro.preco_minimo if self.preco_minimo is None else min(self.preco_minimo, outro.preco_minimo)
+            self.preco_maximo = outro.preco_maximo if self.preco_maximo is None else max(self.preco_maximo, outro.preco_maximo)
+        for score, quantidade in outro.histograma_score.items():
+            self.histograma_score[score] = self.histograma_score.get(score, 0) + quantidade
+        self.esboco_preco.combinar(outro.esboco_preco)
+        for vendedor, quantidade in outro.vendedores.items():
+            self.vendedores[vendedor] = self.vendedores.get(vendedor, 0) + quantidade
+
+    def score_medio(self):
+        return self.soma_score / self.total if self.total else None
+
+    def score_mediano(self):
+        """Mediana exata a partir do histograma (média dos dois centrais, como statistics.median)"""
+        if not self.total:
+            return None
+        meio_inferior, meio_superior = (self.total - 1) // 2, self.total // 2
+        acumulado = 0
+        inferior = None
+        for score in sorted(self.histograma_score):
+            acumulado += self.histograma_score[score]
+            if inferior is None and acumulado > meio_inferior:
+                inferior = score
+            if acumulado > meio_superior:
+                return (inferior + score) / 2
+
+    def preco_medio(self):
+        return self.soma_precos / self.precos if self.precos else None
+
+    def para_linha(self):
+        """Valores na ordem das colunas de agregados_diarios, após dia, site e nome_site"""
+        return tuple(getattr(self, campo) for campo in self.CAMPOS) + (
+            json.dumps({str(score): quantidade for score, quantidade in self.histograma_score.items()}),
+            self.esboco_preco.para_json(),
+            json.dumps(self.vendedores, ensure_ascii=False)
+        )
+
+    @classmethod
+    def de_linha(cls, linha):
+        """Agregado a partir de uma linha (sqlite3.Row) de agregados_diarios"""
+        agregado = cls()
+        for campo in cls.CAMPOS:
+            setattr(agregado, campo, linha[campo])
+        agregado.histograma_score = {int(score): quantidade for score, quantidade
+                                     in json.loads(linha['histograma_score']).items()}
+        agregado.esboco_preco = EsbocoQuantis.de_json(linha['esboco_preco'])
+        agregado.vendedores = json.loads(linha['vendedores'])
+        return agregado
+
+
+def agregar_por_site(candidatos):
+    """Agregados por nome de site (campo 'site' do anúncio) de uma lista de candidatos"""
+    agregados = {}
+    for candidato in candidatos:
+        nome_site = candidato.get('site', 'Desconhecido')
+        agregados.setdefault(nome_site, AgregadoDiario()).adicionar(candidato)
+    return agregados
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+# armazenamento.py - Banco SQLite (WAL) com execuções, anúncios e observações dos monitores
+
+import glob
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from agregados import AgregadoDiario, agregar_por_site
+from configuracao import BASE_DIR
+from indice_vistos import chave_anuncio, confirmar_vistos
+from registro_ndjson import obter_registro, registro_ativo
+
+RESULTADOS_DB = f"{BASE_DIR}/dados/resultados.db"
+
+# Prefixo dos arquivos JSON antigos ({prefixo}_candidatos_{timestamp}.json) -> site
+SITES_ARQUIVOS = {
+    'candidatos': 'mercadolivre',
+    'olx': 'olx',
+    'olx_regional': 'olx_regional',
+    'shopee': 'shopee',
+    'magalu': 'magalu',
+    'americanas': 'americanas',
+    'casasbahia': 'casasbahia',
+    'pontofrio': 'pontofrio',
+    'enjoei': 'enjoei',
+    'ebay': 'ebay'
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    executado_em TEXT NOT NULL,
+    total_candidatos INTEGER NOT NULL,
+    arquivo_origem TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS anuncios (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    chave TEXT NOT NULL UNIQUE,
+    titulo TEXT,
+    url TEXT,
+    primeiro_visto TEXT NOT NULL,
+    ultimo_visto TEXT NOT NULL,
+    ultimo_preco REAL,
+    ultimo_score INTEGER
+);
+CREATE TABLE IF NOT EXISTS observacoes (
+    id INTEGER PRIMARY KEY,
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    anuncio_id INTEGER NOT NULL REFERENCES anuncios(id),
+    site TEXT NOT NULL,
+    observado_em TEXT NOT NULL,
+    preco REAL,
+    score_total INTEGER,
+    nivel_alerta TEXT,
+    dados TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS agregados_diarios (
+    dia TEXT NOT NULL,
+    site TEXT NOT NULL,
+    nome_site TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    soma_score INTEGER NOT NULL,
+    score_maximo INTEGER NOT NULL,
+    alertas_altos INTEGER NOT NULL,
+    alertas_maximos INTEGER NOT NULL,
+    precos INTEGER NOT NULL,
+    soma_precos NUMERIC NOT NULL,
+    preco_minimo NUMERIC,
+    preco_maximo NUMERIC,
+    precos_baixos INTEGER NOT NULL,
+    anime_matrix INTEGER NOT NULL,
+    mini_led INTEGER NOT NULL,
+    gu604 INTEGER NOT NULL,
+    histograma_score TEXT NOT NULL,
+    esboco_preco TEXT NOT NULL,
+    vendedores TEXT NOT NULL,
+    PRIMARY KEY (dia, site, nome_site)
+);
+CREATE TABLE IF NOT EXISTS vigiados (
+    url TEXT PRIMARY KEY,
+    site TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    motivo TEXT,
+    adicionado_em TEXT NOT NULL,
+    situacao TEXT NOT NULL,
+    titulo TEXT,
+    preco REAL,
+    hash_descricao TEXT,
+    hash_corpo TEXT,
+    verificado_em TEXT,
+    alterado_em TEXT
+);
+CREATE TABLE IF NOT EXISTS eventos (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    url TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    ocorrido_em TEXT NOT NULL,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_execucoes_site ON execucoes(site, executado_em);
+CREATE INDEX IF NOT EXISTS idx_observacoes_site ON observacoes(site, observado_em);
+CREATE INDEX IF NOT EXISTS idx_observacoes_data ON observacoes(observado_em);
+CREATE INDEX IF NOT EXISTS idx_observacoes_score ON observacoes(score_total);
+CREATE INDEX IF NOT EXISTS idx_observacoes_anuncio ON observacoes(anuncio_id);
+CREATE INDEX IF NOT EXISTS idx_eventos_data ON eventos(ocorrido_em);
+CREATE INDEX IF NOT EXISTS idx_eventos_chave ON eventos(chave);
+"""
+
+_armazenamentos = {}
+_armazenamentos_lock = threading.Lock()
+
+
+class ArmazenamentoResultados:
+    """Resultados dos monitores: cada execução grava uma observação por candidato encontrado"""
+
+    def __init__(self, caminho=RESULTADOS_DB):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Compartilhado pelas threads do monitor_completo; o lock serializa a escrita
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            # WAL: as análises leem enquanto um monitor grava
+            self.conexao.execute("PRAGMA journal_mode=WAL")
+            self.conexao.execute("PRAGMA synchronous=NORMAL")
+            self.conexao.executescript(ESQUEMA)
+            # Bancos criados antes do hash do corpo dos vigiados ganham a coluna
+            colunas = {linha['name'] for linha in self.conexao.execute("PRAGMA table_info(vigiados)")}
+            if 'hash_corpo' not in colunas:
+                with self.conexao:
+                    self.conexao.execute("ALTER TABLE vigiados ADD COLUMN hash_corpo TEXT")
+            # Bancos criados antes dos agregados: monta-os uma vez a partir das observações
+            sem_agregados = self.conexao.execute(
+                "SELECT NOT EXISTS (SELECT 1 FROM agregados_diarios) AND EXISTS (SELECT 1 FROM observacoes)"
+            ).fetchone()[0]
+        if sem_agregados:
+            self.reconstruir_agregados()
+
+    def registrar_execucao(self, site, candidatos, executado_em=None, arquivo_origem=None):
+        """Grava a execução, atualiza os anúncios e acrescenta uma observação por candidato"""
+        executado_em = executado_em or datetime.now().isoformat()
+        with self.lock, self.conexao:
+            execucao_id = self.conexao.execute(
+                "INSERT INTO execucoes (site, executado_em, total_candidatos, arquivo_origem) VALUES (?, ?, ?, ?)",
+                (site, executado_em, len(candidatos), arquivo_origem)
+            ).lastrowid
+
+            for candidato in candidatos:
+                anuncio_id = self.conexao.execute("""
+                    INSERT INTO anuncios (site, chave, titulo, url, primeiro_visto, ultimo_visto, ultimo_preco, ultimo_score)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(chave) DO UPDATE SET
+                        titulo = excluded.titulo,
+                        url = excluded.url,
+                        ultimo_visto = excluded.ultimo_visto,
+                        ultimo_preco = excluded.ultimo_preco,
+                        ultimo_score = excluded.ultimo_score
+                    RETURNING id
+                """, (
+                    site, chave_anuncio(site, candidato), candidato.get('titulo'), candidato.get('url'),
+                    executado_em, executado_em, candidato.get('preco'), candidato.get('score_total')
+                )).fetchone()[0]
+
+                self.conexao.execute("""
+                    INSERT INTO observacoes (execucao_id, anuncio_id, site, observado_em, preco, score_total, nivel_alerta, dados)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    execucao_id, anuncio_id, site, executado_em, candidato.get('preco'),
+                    candidato.get('score_total'), candidato.get('nivel_alerta'),
+                    json.dumps(candidato, ensure_ascii=False, default=str)
+                ))
+
+            # Na mesma transação, para o agregado do dia nunca divergir das observações
+            self.acumular_agregados(site, executado_em[:10], candidatos)
+        return execucao_id
+
+    def acumular_agregados(self, site, dia, candidatos):
+        """Soma os candidatos ao agregado do dia (chamado com o lock e a transação abertos)"""
+        for nome_site, novo in agregar_por_site(candidatos).items():
+            linha = self.conexao.execute(
+                "SELECT * FROM agregados_diarios WHERE dia = ? AND site = ? AND nome_site = ?",
+                (dia, site, nome_site)
+            ).fetchone()
+            if linha:
+                agregado = AgregadoDiario.de_linha(linha)
+                agregado.combinar(novo)
+            else:
+                agregado = novo
+            valores = (dia, site, nome_site) + agregado.para_linha()
+            self.conexao.execute(
+                f"INSERT OR REPLACE INTO agregados_diarios VALUES ({','.join('?' * len(valores))})", valores
+            )
+
+    def reconstruir_agregados(self):
+        """Refaz todos os agregados diários a partir das observações"""
+        with self.lock, self.conexao:
+            self.conexao.execute("DELETE FROM agregados_diarios")
+            por_dia = {}
+            for linha in self.conexao.execute("SELECT site, observado_em, dados FROM observacoes"):
+                por_dia.setdefault((linha['site'], linha['observado_em'][:10]), []).append(json.loads(linha['dados']))
+            for (site, dia), candidatos in por_dia.items():
+                self.acumular_agregados(site, dia, candidatos)
+
+    def agregados(self, desde=None, site=None):
+        """Lista de (dia, site, nome_site, AgregadoDiario) a partir do dia informado"""
+        condicoes, parametros = [], []
+        if desde:
+            condicoes.append("dia >= ?")
+            parametros.append(desde.date().isoformat() if isinstance(desde, datetime) else desde)
+        if site:
+            condicoes.append("site = ?")
+            parametros.append(site)
+
+        sql = "SELECT * FROM agregados_diarios"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY dia"
+        with self.lock:
+            linhas = self.conexao.execute(sql, parametros).fetchall()
+        return [(linha['dia'], linha['site'], linha['nome_site'], AgregadoDiario.de_linha(linha)) for linha in linhas]
+
+    def filtros(self, site=None, desde=None, ate=None, score_minimo=None):
+        """Cláusula WHERE e parâmetros comuns às consultas de observações"""
+        condicoes, parametros = [], []
+        for condicao, valor in (("site = ?", site), ("observado_em >= ?", desde),
+                                ("observado_em < ?", ate), ("score_total >= ?", score_minimo)):
+            if valor is not None:
+                condicoes.append(condicao)
+                parametros.append(valor.isoformat() if isinstance(valor, datetime) else valor)
+        return (" WHERE " + " AND ".join(condicoes) if condicoes else ""), parametros
+
+    def consultar(self, site=None, desde=None, ate=None, score_minimo=None, limite=None, ordem='observado_em'):
+        """Candidatos observados, filtrados por site, período e score mínimo"""
+        filtro, parametros = self.filtros(site, desde, ate, score_minimo)
+        sql = "SELECT observado_em, dados FROM observacoes" + filtro
+        sql += " ORDER BY score_total DESC" if ordem == 'score' else " ORDER BY observado_em"
+        if limite:
+            sql += f" LIMIT {int(limite)}"
+
+        with self.lock:
+            linhas = self.conexao.execute(sql, parametros).fetchall()
+        return [self.candidato_da_linha(linha) for linha in linhas]
+
+    def iterar(self, site=None, desde=None, ate=None, score_minimo=None):
+        """Gerador dos candidatos observados, lidos do cursor em blocos (memória constante)"""
+        filtro, parametros = self.filtros(site, desde, ate, score_minimo)
+        for linha in self.ler_em_blocos("SELECT observado_em, dados FROM observacoes" + filtro + " ORDER BY id", parametros):
+            yield self.candidato_da_linha(linha)
+
+    def iterar_resumos(self, site=None, desde=None, ate=None, score_minimo=None):
+        """Como iterar(), mas só com as colunas indexadas (sem decodificar o JSON de cada candidato)"""
+        filtro, parametros = self.filtros(site, desde, ate, score_minimo)
+        return self.ler_em_blocos(
+            "SELECT id, site, observado_em, preco, score_total, nivel_alerta FROM observacoes" + filtro + " ORDER BY id",
+            parametros
+        )
+
+    def candidatos_por_id(self, ids):
+        """Candidatos completos das observações informadas, na mesma ordem"""
+        ids = list(ids)
+        if not ids:
+            return []
+        with self.lock:
+            linhas = {linha['id']: linha for linha in self.conexao.execute(
+                f"SELECT id, observado_em, dados FROM observacoes WHERE id IN ({','.join('?' * len(ids))})", ids
+            )}
+        return [self.candidato_da_linha(linhas[i]) for i in ids if i in linhas]
+
+    def ler_em_blocos(self, sql, parametros, bloco=500):
+        """Linhas da consulta em blocos; o lock só é segurado em cada leitura, não entre blocos"""
+        with self.lock:
+            cursor = self.conexao.execute(sql, parametros)
+        while True:
+            with self.lock:
+                linhas = cursor.fetchmany(bloco)
+            if not linhas:
+                break
+            yield from linhas
+
+    def candidato_da_linha(self, linha):
+        candidato = json.loads(linha['dados'])
+        candidato['observado_em'] = linha['observado_em']
+        return candidato
+
+    def contar(self, score_minimo=None, score_maximo=None, site=None, desde=None):
+        """Número de observações na faixa de score (mínimo inclusivo, máximo exclusivo)"""
+        condicoes, parametros = [], []
+        for condicao, valor in (("score_total >= ?", score_minimo), ("score_total < ?", score_maximo),
+                                ("site = ?", site), ("observado_em >= ?", desde)):
+            if valor is not None:
+                condicoes.append(condicao)
+                parametros.append(valor.isoformat() if isinstance(valor, datetime) else valor)
+
+        sql = "SELECT COUNT(*) FROM observacoes"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        with self.lock:
+            return self.conexao.execute(sql, parametros).fetchone()[0]
+
+    def ultima_execucao(self, site=None):
+        """Dados da execução mais recente (do site, se informado) ou None"""
+        sql = "SELECT * FROM execucoes"
+        parametros = []
+        if site:
+            sql += " WHERE site = ?"
+            parametros.append(site)
+        sql += " ORDER BY executado_em DESC, id DESC LIMIT 1"
+        with self.lock:
+            linha = self.conexao.execute(sql, parametros).fetchone()
+        return dict(linha) if linha else None
+
+    def candidatos_da_execucao(self, execucao_id, score_minimo=None):
+        """Candidatos gravados por uma execução"""
+        sql = "SELECT dados FROM observacoes WHERE execucao_id = ?"
+        parametros = [execucao_id]
+        if score_minimo is not None:
+            sql += " AND score_total >= ?"
+            parametros.append(score_minimo)
+        with self.lock:
+            return [json.loads(linha['dados']) for linha in self.conexao.execute(sql, parametros)]
+
+    def ultimos_resultados(self, site):
+        """Candidatos da última execução do site"""
+        execucao = self.ultima_execucao(site)
+        return self.candidatos_da_execucao(execucao['id']) if execucao else []
+
+    def importar_json(self, diretorio=None):
+        """Importa os *_candidatos_*.json antigos que ainda não estão no banco"""
+        diretorio = diretorio or f"{BASE_DIR}/resultados"
+        with self.lock:
+            importados = {linha[0] for linha in self.conexao.execute(
+                "SELECT arquivo_origem FROM execucoes WHERE arquivo_origem IS NOT NULL"
+            )}
+
+        total = 0
+        for arquivo in sorted(glob.glob(f"{diretorio}/*candidatos_*.json")):
+            nome = os.path.basename(arquivo)
+            site = site_do_arquivo(nome)
+            if site is None or nome in importados:
+                continue
+            try:
+                with open(arquivo, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+                executado_em = datetime.strptime(nome.rsplit('.', 1)[0][-15:], "%Y%m%d_%H%M%S").isoformat()
+            except Exception as e:
+                print(f"⚠️ Ignorando {nome}: {e}")
+                continue
+            candidatos = [d for d in (dados if isinstance(dados, list) else [dados]) if isinstance(d, dict)]
+            self.registrar_execucao(site, candidatos, executado_em, arquivo_origem=nome)
+            total += 1
+        return total
+
+    def importar_ndjson(self, registro):
+        """Importa do registro NDJSON as execuções que ainda não estão no banco"""
+        with self.lock:
+            existentes = {(linha[0], linha[1]) for linha in self.conexao.execute(
+                "SELECT site, executado_em FROM execucoes"
+            )}
+
+        total = 0
+        execucao, candidatos = None, []
+        # As linhas de uma execução são contíguas no registro: agrupa em fluxo, uma execução por vez
+        for monitor, observado_em, candidato in registro.ler():
+            if (monitor, observado_em) != execucao:
+                if candidatos and execucao not in existentes:
+                    self.registrar_execucao(execucao[0], candidatos, execucao[1])
+                    total += 1
+                execucao, candidatos = (monitor, observado_em), []
+            candidatos.append(candidato)
+        if candidatos and execucao not in existentes:
+            self.registrar_execucao(execucao[0], candidatos, execucao[1])
+            total += 1
+        return total
+
+    def exportar_ndjson(self, registro):
+        """Grava todas as execuções do banco no registro NDJSON e fecha o segmento"""
+        with self.lock:
+            execucoes = self.conexao.execute(
+                "SELECT id, site, executado_em FROM execucoes ORDER BY executado_em, id"
+            ).fetchall()
+        for execucao in execucoes:
+            registro.acrescentar(execucao['site'], self.candidatos_da_execucao(execucao['id']), execucao['executado_em'])
+        registro.fechar_segmento()
+        return len(execucoes)
+
+    def vigiar(self, url, site, motivo=None):
+        """Põe a URL na lista de vigiados (ou reativa, se já estava); True se ela é nova na lista"""
+        with self.lock, self.conexao:
+            existia = self.conexao.execute("SELECT 1 FROM vigiados WHERE url = ?", (url,)).fetchone()
+            self.conexao.execute("""
+                INSERT INTO vigiados (url, site, chave, motivo, adicionado_em, situacao)
+                VALUES (?, ?, ?, ?, ?, 'ativo')
+                ON CONFLICT(url) DO UPDATE SET situacao = 'ativo', motivo = COALESCE(excluded.motivo, motivo)
+            """, (url, site, chave_anuncio(site, {'url': url}), motivo, datetime.now().isoformat()))
+        return existia is None
+
+    def deixar_de_vigiar(self, url):
+        with self.lock, self.conexao:
+            return self.conexao.execute("DELETE FROM vigiados WHERE url = ?", (url,)).rowcount
+
+    def vigiados(self, situacao='ativo'):
+        """URLs vigiadas com o último estado conhecido (todas, se situacao for None)"""
+        sql = "SELECT * FROM vigiados"
+        parametros = []
+        if situacao:
+            sql += " WHERE situacao = ?"
+            parametros.append(situacao)
+        with self.lock:
+            return [dict(linha) for linha in self.conexao.execute(sql + " ORDER BY adicionado_em", parametros)]
+
+    def registrar_verificacoes(self, verificacoes):
+        """Grava o novo estado de cada vigiado e seus eventos numa transação
+
+        verificacoes: (vigiado, estado, eventos), com estado um dict de colunas de vigiados
+        e eventos uma lista de (tipo, dados).
+        """
+        with self.lock, self.conexao:
+            for vigiado, estado, eventos in verificacoes:
+                colunas = ', '.join(f"{coluna} = ?" for coluna in estado)
+                self.conexao.execute(f"UPDATE vigiados SET {colunas} WHERE url = ?", list(estado.values()) + [vigiado['url']])
+                self.conexao.executemany(
+                    "INSERT INTO eventos (site, chave, url, tipo, ocorrido_em, dados) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(vigiado['site'], vigiado['chave'], vigiado['url'], tipo, estado['verificado_em'],
+                      json.dumps(dados, ensure_ascii=False, default=str)) for tipo, dados in eventos]
+                )
+
+    def eventos(self, desde=None, site=None, url=None):
+        """Eventos dos vigiados (preço, edição, remoção), do mais antigo para o mais recente"""
+        condicoes, parametros = [], []
+        for condicao, valor in (("ocorrido_em >= ?", desde), ("site = ?", site), ("url = ?", url)):
+            if valor is not None:
+                condicoes.append(condicao)
+                parametros.append(valor.isoformat() if isinstance(valor, datetime) else valor)
+
+        sql = "SELECT * FROM eventos"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        with self.lock:
+            linhas = self.conexao.execute(sql + " ORDER BY ocorrido_em, id", parametros).fetchall()
+        return [dict(linha, dados=json.loads(linha['dados'])) for linha in linhas]
+
+
+def site_do_arquivo(arquivo):
+    """Site a partir do nome {prefixo}_candidatos_{timestamp}.json"""
+    nome = os.path.basename(arquivo)
+    prefixo = nome.rsplit('_candidatos_', 1)[0] if '_candidatos_' in nome else nome.split('_', 1)[0]
+    return SITES_ARQUIVOS.get(prefixo)
+
+
+def obter_armazenamento(caminho=RESULTADOS_DB):
+    """Armazenamento compartilhado pelo processo"""
+    with _armazenamentos_lock:
+        armazenamento = _armazenamentos.get(caminho)
+        if armazenamento is None:
+            armazenamento = _armazenamentos[caminho] = ArmazenamentoResultados(caminho)
+        return armazenamento
+
+
+def salvar_execucao(site, candidatos):
+    """Grava os candidatos de uma execução e retorna onde ficaram"""
+    executado_em = datetime.now().isoformat()
+    execucao_id = obter_armazenamento().registrar_execucao(site, candidatos, executado_em)
+    if registro_ativo():
+        # Cópia append-only em NDJSON comprimido, para arquivar ou reconstruir o banco
+        obter_registro().acrescentar(site, candidatos, executado_em)
+    # Só com os candidatos gravados os anúncios da varredura passam a contar como vistos
+    confirmar_vistos(site)
+    return f"{RESULTADOS_DB} (execução #{execucao_id})"
+
+
+def desde_dias(dias):
+    """Instante de X dias atrás, para consultas por período"""
+    return datetime.now() - timedelta(days=dias)
+
+# Execução principal
+if __name__ == "__main__":
+    comando = sys.argv[1] if len(sys.argv) > 1 else ''
+
+    if comando == 'importar':
+        armazenamento = obter_armazenamento()
+        total = armazenamento.importar_json(sys.argv[2] if len(sys.argv) > 2 else None)
+        print(f"📥 {total} arquivo(s) JSON importado(s) para {RESULTADOS_DB}")
+        total = armazenamento.importar_ndjson(obter_registro())
+        print(f"📥 {total} execução(ões) do registro NDJSON importada(s)")
+    elif comando == 'exportar':
+        registro = obter_registro()
+        total = obter_armazenamento().exportar_ndjson(registro)
+        print(f"📦 {total} execução(ões) exportada(s) para {registro.diretorio}")
+    elif comando == 'agregar':
+        obter_armazenamento().reconstruir_agregados()
+        print(f"📊 Agregados diários refeitos em {RESULTADOS_DB}")
+    elif comando == 'alertas':
+        # Para scripts shell: candidatos de score alto na última execução do site
+        armazenamento = obter_armazenamento()
+        execucao = armazenamento.ultima_execucao(sys.argv[2] if len(sys.argv) > 2 else None)
+        score_minimo = int(sys.argv[3]) if len(sys.argv) > 3 else 35
+        print(len(armazenamento.candidatos_da_execucao(execucao['id'], score_minimo)) if execucao else 0)
+    else:
+        print("Uso: python3 armazenamento.py importar [diretorio] | exportar | agregar | alertas [site] [score_minimo]")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# benchmark_parser.py - Mede o tempo de parsing por página salva, para cada parser HTML
+
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from busca_assincrona import PAGINAS_DIR
+from configuracao import BASE_DIR
+
+PARSERS = ['lxml', 'html.parser']
+
+class BenchmarkParser:
+    def __init__(self, repeticoes=3):
+        self.repeticoes = repeticoes
+        self.historico_file = f"{BASE_DIR}/logs/benchmark_parser.jsonl"
+
+    def medir_pagina(self, html, parser):
+        """Melhor tempo (ms) de parsing da página entre as repetições"""
+        melhor = None
+        for _ in range(self.repeticoes):
+            inicio = time.perf_counter()
+            BeautifulSoup(html, parser)
+            duracao = (time.perf_counter() - inicio) * 1000
+            melhor = duracao if melhor is None else min(melhor, duracao)
+        return melhor
+
+    def site_do_arquivo(self, arquivo):
+        """Extrai o site do nome {site}_{YYYYMMDD}_{HHMMSS}_{indice}.html"""
+        nome = os.path.basename(arquivo).rsplit('.', 1)[0]
+        partes = nome.rsplit('_', 3)
+        return partes[0] if len(partes) == 4 else 'desconhecido'
+
+    def executar(self, arquivos=None):
+        """Mede todos os parsers disponíveis sobre as páginas salvas e registra no histórico"""
+        arquivos = arquivos or sorted(glob.glob(f"{PAGINAS_DIR}/*.html"))
+        if not arquivos:
+            print(f"📭 Nenhuma página salva em {PAGINAS_DIR}")
+            print("💡 Ative \"salvar_paginas\": true no config.json e rode um monitor")
+            return None
+
+        print(f"⏱️ Medindo {len(arquivos)} página(s), melhor de {self.repeticoes} repetições...")
+
+        parsers = []
+        for parser in PARSERS:
+            try:
+                BeautifulSoup("<html></html>", parser)
+                parsers.append(parser)
+            except FeatureNotFound:
+                print(f"⚠️ Parser '{parser}' não instalado, ignorando")
+
+        tempos = {parser: {} for parser in parsers}
+        total_bytes = 0
+
+        for arquivo in arquivos:
+            with open(arquivo, 'rb') as f:
+                html = f.read()
+            total_bytes += len(html)
+            site = self.site_do_arquivo(arquivo)
+
+            for parser in parsers:
+                tempos[parser].setdefault(site, []).append(self.medir_pagina(html, parser))
+
+        print(f"\n📊 TEMPO MÉDIO DE PARSING POR PÁGINA (ms)")
+        print("=" * 60)
+        print(f"{'Site':<20}" + "".join(f"{parser:>15}" for parser in parsers))
+
+        for site in sorted(tempos[parsers[0]]):
+            linha = f"{site:<20}"
+            for parser in parsers:
+                medidas = tempos[parser][site]
+                linha += f"{sum(medidas) / len(medidas):>15.2f}"
+            print(linha)
+
+        resumo = {}
+        for parser in parsers:
+            medidas = [m for por_site in tempos[parser].values() for m in por_site]
+            resumo[parser] = round(sum(medidas) / len(medidas), 3)
+
+        print("-" * 60)
+        print(f"{'Média geral':<20}" + "".join(f"{resumo[parser]:>15.2f}" for parser in parsers))
+
+        registro = {
+            'timestamp': datetime.now().isoformat(),
+            'paginas': len(arquivos),
+            'bytes': total_bytes,
+            'ms_por_pagina': resumo,
+            'ms_por_pagina_site': {
+                parser: {site: round(sum(m) / len(m), 3) for site, m in por_site.items()}
+                for parser, por_site in tempos.items()
+            }
+        }
+        self.salvar_historico(registro)
+        return registro
+
+    def salvar_historico(self, registro):
+        """Acrescenta a medição ao histórico, para acompanhar a evolução do parsing"""
+        os.makedirs(os.path.dirname(self.historico_file), exist_ok=True)
+        with open(self.historico_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        print(f"\n💾 Medição registrada em: {self.historico_file}")
+
+# Execução principal
+if __name__ == "__main__":
+    benchmark = BenchmarkParser()
+    benchmark.executar(sys.argv[1:])
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# busca_assincrona.py - Camada assíncrona de requisições HTTP compartilhada pelos monitores
+
+import asyncio
+import os
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from cache_http import obter_cache
+from configuracao import BASE_DIR, carregar_config
+from limitador_taxa import TokenBucket, interpretar_retry_after, limites_do_host
+from sessoes_http import obter_sessao
+
+# Limite global de conexões em andamento, somando todos os hosts
+MAX_CONEXOES = 16
+
+# Páginas salvas (com salvar_paginas: true no config.json) alimentam o benchmark de parsing
+PAGINAS_DIR = f"{BASE_DIR}/paginas"
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONEXOES, thread_name_prefix='busca')
+_politicas = {}
+_politicas_lock = threading.Lock()
+
+
+class PoliticaHost:
+    """Controla a taxa (token bucket) e a concorrência das requisições a um host"""
+
+    def __init__(self, limites):
+        self.bucket = TokenBucket(limites['taxa'], limites['rajada'])
+        self.semaforo = threading.BoundedSemaphore(int(limites.get('simultaneas', 1)))
+
+
+def politica_para(host):
+    """Retorna (criando se preciso) a política de cortesia do host"""
+    with _politicas_lock:
+        if host not in _politicas:
+            _politicas[host] = PoliticaHost(limites_do_host(host))
+        return _politicas[host]
+
+
+def _executar_requisicao(sessao, politica, requisicao, site, cache):
+    """Executa uma requisição bloqueante respeitando o limite de concorrência do host"""
+    headers = requisicao.get('headers')
+    if cache is not None:
+        # GET condicional: com ETag/Last-Modified guardados, página sem mudança volta como 304
+        headers = {**(headers or {}), **cache.cabecalhos_condicionais(requisicao)} or None
+    with politica.semaforo:
+        response = sessao.get(
+            requisicao['url'],
+            params=requisicao.get('params'),
+            headers=headers,
+            timeout=requisicao.get('timeout', 15)
+        )
+    politica.bucket.registrar_resposta(
+        response.status_code, interpretar_retry_after(response.headers.get('Retry-After'))
+    )
+    return cache.processar(site, requisicao, response) if cache is not None else response
+
+
+async def _buscar_uma(sessao, site, requisicao):
+    """Aguarda a vez do host sem bloquear o loop e executa a requisição num worker"""
+    cache = obter_cache()
+    if cache is not None:
+        # Resposta ainda dentro da validade: nem consome a vez do host
+        resposta = cache.resposta_fresca(requisicao)
+        if resposta is not None:
+            return resposta
+
+    politica = politica_para(urlsplit(requisicao['url']).hostname or '')
+    espera = politica.bucket.reservar()
+    while espera > 0:
+        await asyncio.sleep(espera)
+        # O host pode ter bloqueado enquanto esta requisição esperava na fila
+        espera = politica.bucket.espera_bloqueio()
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_executor, _executar_requisicao, sessao, politica, requisicao, site, cache)
+    except Exception as e:
+        return e
+
+
+def salvar_pagina(site, indice, response):
+    """Guarda o HTML de uma resposta em paginas/ para o benchmark de parsing"""
+    os.makedirs(PAGINAS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{PAGINAS_DIR}/{site}_{timestamp}_{indice}.html"
+    with open(filename, 'wb') as f:
+        f.write(response.content)
+    return filename
+
+
+async def _buscar_e_notificar(sessao, site, indice, requisicao, ao_receber):
+    """Busca uma requisição e entrega a resposta ao callback assim que ela chega"""
+    resposta = await _buscar_uma(sessao, site, requisicao)
+    if (carregar_config().get('salvar_paginas') and getattr(resposta, 'status_code', None) == 200
+            and not getattr(resposta, 'inalterada', False)):
+        salvar_pagina(site, indice, resposta)
+    if ao_receber is not None:
+        ao_receber(indice, resposta)
+    return resposta
+
+
+async def fetch_many_async(site, requisicoes, headers=None, ao_receber=None):
+    """Versão assíncrona de fetch_many, para combinar vários sites num mesmo loop"""
+    sessao = obter_sessao(site, headers)
+    return await asyncio.gather(*(
+        _buscar_e_notificar(sessao, site, indice, requisicao, ao_receber)
+        for indice, requisicao in enumerate(requisicoes)
+    ))
+
+
+def fetch_many(site, requisicoes, headers=None, ao_receber=None):
+    """Executa as requisições de um site em paralelo e retorna as respostas na mesma ordem
+
+    Cada requisição é um dict com 'url' e, opcionalmente, 'params', 'headers' e 'timeout'.
+    Todas passam pela sessão keep-alive do site, que recebe os headers do monitor.
+    Requisições a hosts diferentes se sobrepõem; as do mesmo host seguem o token bucket
+    do host (limites_taxa no config.json). Falhas de rede voltam como a exceção no lugar da resposta.
+    Com o cache_http ligado, respostas iguais às da varredura anterior (304, corpo idêntico ou
+    ainda dentro da validade) voltam com o atributo inalterada=True.
+    Se ao_receber for informado, ele é chamado com (índice, resposta) na ordem de chegada, dentro do
+    loop de eventos: deve só repassar a resposta (ex.: para uma queue.Queue lida por outra thread).
+    """
+    if not requisicoes:
+        return []
+    return asyncio.run(fetch_many_async(site, requisicoes, headers, ao_receber))
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# cache_http.py - Cache em disco das respostas HTTP (ETag/Last-Modified, Cache-Control, TTL por site e LRU)
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from configuracao import BASE_DIR, carregar_config
+
+CACHE_DB = f"{BASE_DIR}/cache/http.db"
+
+# ttl_minutos: validade das respostas sem Cache-Control/Expires (0 = sempre revalidar com o servidor)
+CACHE_PADRAO = {'ativo': True, 'tamanho_max_mb': 200, 'ttl_minutos': {'padrao': 0}}
+
+# Cabeçalhos guardados junto com o corpo (o resto não é usado pelos monitores)
+CABECALHOS_GUARDADOS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Expires')
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def config_cache():
+    """Bloco cache_http do config.json, com valores padrão"""
+    cache = dict(CACHE_PADRAO)
+    cache.update(carregar_config().get('cache_http', {}))
+    return cache
+
+
+def chave_requisicao(requisicao):
+    """URL final da requisição GET, com os parâmetros já codificados"""
+    return requests.Request('GET', requisicao['url'], params=requisicao.get('params')).prepare().url
+
+
+def diretivas_cache_control(valor):
+    """Cache-Control como dict: {'max-age': '60', 'no-store': True, ...}"""
+    diretivas = {}
+    for parte in (valor or '').split(','):
+        nome, _, argumento = parte.strip().partition('=')
+        if nome:
+            diretivas[nome.lower()] = argumento.strip('"') or True
+    return diretivas
+
+
+class CacheHTTP:
+    """Respostas 200 por URL num SQLite: validadores para GET condicional, validade e último acesso (LRU)"""
+
+    def __init__(self, caminho=CACHE_DB):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Usado pelas threads da busca_assincrona; o lock serializa o acesso
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock, self.conexao:
+            self.conexao.execute("PRAGMA journal_mode=WAL")
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS respostas (
+                    chave TEXT PRIMARY KEY,
+                    site TEXT NOT NULL,
+                    cabecalhos TEXT NOT NULL,
+                    corpo BLOB NOT NULL,
+                    hash_corpo TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    expira_em REAL NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    ultimo_acesso REAL NOT NULL
+                )
+            """)
+            self.conexao.execute("CREATE INDEX IF NOT EXISTS idx_respostas_acesso ON respostas(ultimo_acesso)")
+
+    def buscar(self, chave):
+        with self.lock:
+            return self.conexao.execute("SELECT * FROM respostas WHERE chave = ?", (chave,)).fetchone()
+
+    def tocar(self, chave, expira_em=None, etag=None, last_modified=None):
+        """Marca o acesso (LRU) e, num 304, atualiza validade e validadores"""
+        with self.lock, self.conexao:
+            self.conexao.execute("""
+                UPDATE respostas SET ultimo_acesso = ?, expira_em = COALESCE(?, expira_em),
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE chave = ?
+            """, (time.time(), expira_em, etag, last_modified, chave))
+
+    def resposta_fresca(self, requisicao):
+        """Resposta ainda válida no cache (sem ir à rede), ou None"""
+        chave = chave_requisicao(requisicao)
+        linha = self.buscar(chave)
+        if linha is None or linha['expira_em'] <= time.time():
+            return None
+        self.tocar(chave)
+        return self.montar_resposta(linha)
+
+    def cabecalhos_condicionais(self, requisicao):
+        """If-None-Match/If-Modified-Since para revalidar a resposta guardada"""
+        linha = self.buscar(chave_requisicao(requisicao))
+        cabecalhos = {}
+        if linha is not None:
+            if linha['etag']:
+                cabecalhos['If-None-Match'] = linha['etag']
+            if linha['last_modified']:
+                cabecalhos['If-Modified-Since'] = linha['last_modified']
+        return cabecalhos
+
+    def validade(self, site, cabecalhos):
+        """Instante (epoch) até quando a resposta pode ser reutilizada sem perguntar ao servidor"""
+        agora = time.time()
+        diretivas = diretivas_cache_control(cabecalhos.get('Cache-Control'))
+        if 'no-cache' in diretivas:
+            return agora
+        for nome in ('s-maxage', 'max-age'):
+            if nome in diretivas:
+                try:
+                    return agora + max(0, int(diretivas[nome]) - int(cabecalhos.get('Age', 0)))
+                except ValueError:
+                    break
+        if cabecalhos.get('Expires'):
+            try:
+                return parsedate_to_datetime(cabecalhos['Expires']).timestamp()
+            except (TypeError, ValueError):
+                return agora
+        ttl = config_cache()['ttl_minutos']
+        return agora + ttl.get(site, ttl.get('padrao', 0)) * 60
+
+    def processar(self, site, requisicao, response):
+        """Trata a resposta da rede: 304 vira a resposta guardada, 200 atualiza o cache"""
+        chave = chave_requisicao(requisicao)
+        if response.status_code == 304:
+            linha = self.buscar(chave)
+            if linha is None:
+                return response
+            self.tocar(chave, self.validade(site, response.headers),
+                       response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return self.montar_resposta(linha)
+
+        if response.status_code != 200:
+            return response
+        if 'no-store' in diretivas_cache_control(response.headers.get('Cache-Control')):
+            with self.lock, self.conexao:
+                self.conexao.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+            return response
+
+        corpo = response.content
+        hash_corpo = hashlib.sha1(corpo).hexdigest()
+        anterior = self.buscar(chave)
+        # Mesmo corpo byte a byte: para o monitor é como um 304
+        response.inalterada = anterior is not None and anterior['hash_corpo'] == hash_corpo
+
+        cabecalhos = {nome: response.headers[nome] for nome in CABECALHOS_GUARDADOS if nome in response.headers}
+        agora = time.time()
+        with self.lock, self.conexao:
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (chave, site, json.dumps(cabecalhos), corpo, hash_corpo, response.headers.get('ETag'),
+                 response.headers.get('Last-Modified'), self.validade(site, response.headers), len(corpo), agora)
+            )
+            self.despejar()
+        return response
+
+    def despejar(self):
+        """Remove as respostas menos usadas até o cache caber no tamanho máximo (com o lock aberto)"""
+        limite = config_cache()['tamanho_max_mb'] * 1024 * 1024
+        total = self.conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+        if total <= limite:
+            return 0
+        removidas = []
+        for chave, tamanho in self.conexao.execute("SELECT chave, tamanho FROM respostas ORDER BY ultimo_acesso"):
+            removidas.append((chave,))
+            total -= tamanho
+            if total <= limite:
+                break
+        self.conexao.executemany("DELETE FROM respostas WHERE chave = ?", removidas)
+        return len(removidas)
+
+    def montar_resposta(self, linha):
+        """requests.Response com o corpo guardado, marcada como inalterada"""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = linha['corpo']
+        response.headers = CaseInsensitiveDict(json.loads(linha['cabecalhos']))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = linha['chave']
+        response.inalterada = True
+        return response
+
+    def estatisticas(self):
+        with self.lock:
+            return self.conexao.execute(
+                "SELECT site, COUNT(*), COALESCE(SUM(tamanho), 0) FROM respostas GROUP BY site ORDER BY site"
+            ).fetchall()
+
+    def limpar(self):
+        with self.lock, self.conexao:
+            self.conexao.execute("DELETE FROM respostas")
+        with self.lock:
+            self.conexao.execute("VACUUM")
+
+
+def obter_cache(caminho=CACHE_DB):
+    """Cache compartilhado pelo processo, ou None se desligado no config.json"""
+    if not config_cache().get('ativo', True):
+        return None
+    with _caches_lock:
+        cache = _caches.get(caminho)
+        if cache is None:
+            cache = _caches[caminho] = CacheHTTP(caminho)
+        return cache
+
+# Execução principal
+if __name__ == "__main__":
+    cache = CacheHTTP()
+    if len(sys.argv) > 1 and sys.argv[1] == 'limpar':
+        cache.limpar()
+        print(f"🧹 Cache HTTP esvaziado: {CACHE_DB}")
+    else:
+        print(f"📦 Cache HTTP: {CACHE_DB}")
+        for site, respostas, tamanho in cache.estatisticas():
+            print(f"   {site}: {respostas} resposta(s), {tamanho / 1024 / 1024:.1f} MB")
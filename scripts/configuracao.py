@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# configuracao.py - Leitura do config/config.json compartilhada pelos scripts
+
+import json
+import os
+import threading
+
+BASE_DIR = os.path.expanduser("~/monitor_asus_rog")
+
+# Instalação em ~/monitor_asus_rog primeiro; senão o config/ ao lado de scripts/
+CAMINHOS_CONFIG = [
+    f"{BASE_DIR}/config/config.json",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'config.json')
+]
+
+_cache = {'caminho': None, 'mtime': None, 'config': {}}
+_cache_lock = threading.Lock()
+
+
+def caminho_config():
+    """Retorna o caminho do config.json em uso (ou None se não existir)"""
+    for caminho in CAMINHOS_CONFIG:
+        if os.path.exists(caminho):
+            return os.path.normpath(caminho)
+    return None
+
+
+def carregar_config():
+    """Carrega o config.json, relendo o arquivo só quando ele muda"""
+    caminho = caminho_config()
+    if caminho is None:
+        return {}
+
+    try:
+        mtime = os.path.getmtime(caminho)
+    except OSError:
+        return _cache['config']
+
+    with _cache_lock:
+        if _cache['caminho'] != caminho or _cache['mtime'] != mtime:
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    _cache['config'] = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Erro ao ler {caminho}: {e}")
+                _cache['config'] = {}
+            _cache['caminho'] = caminho
+            _cache['mtime'] = mtime
+        return _cache['config']
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# daemon_monitor.py - Processo contínuo que varre cada site no seu próprio intervalo
+
+import heapq
+import math
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from configuracao import BASE_DIR, carregar_config
+from indice_vistos import indice_ativo, obter_indice
+from monitor_completo import SITES_MONITORAMENTO
+from top_k import top_k
+from vigilancia import CHAVE_VIGILANCIA, MonitorVigilancia, config_vigilancia, descrever_evento, vigiar_candidatos
+
+LOG_FILE = f"{BASE_DIR}/logs/monitor.log"
+ALERTAS_DIR = f"{BASE_DIR}/alertas"
+
+# jitter: fração do intervalo sorteada para mais ou para menos a cada reagendamento
+AGENDAMENTO_PADRAO = {'jitter': 0.1, 'score_alerta': 35, 'sites': {}, 'adaptativo': {}}
+
+# taxa_minima (anúncios novos/hora) garante varreduras aos sites parados; os intervalos ficam entre os limites
+ADAPTATIVO_PADRAO = {'ativo': True, 'taxa_minima': 0.05, 'intervalo_minimo_horas': 0.25, 'intervalo_maximo_horas': 12}
+
+# Espera máxima do laço principal, para atender sinais e mudanças no config.json
+ESPERA_MAXIMA = 5
+
+
+def config_agendamento():
+    """Bloco agendamento do config.json, com valores padrão"""
+    agendamento = dict(AGENDAMENTO_PADRAO)
+    agendamento.update(carregar_config().get('agendamento', {}))
+    return agendamento
+
+
+def config_site(chave):
+    """intervalo_horas, score_alerta e ativo do site: padrão global sobrescrito por agendamento.sites"""
+    agendamento = config_agendamento()
+    site = {
+        'intervalo_horas': carregar_config().get('intervalo_horas', 2),
+        'score_alerta': agendamento['score_alerta'],
+        'ativo': True
+    }
+    site.update(agendamento['sites'].get(chave, {}))
+    return site
+
+
+def config_adaptativo():
+    """Bloco agendamento.adaptativo do config.json, com valores padrão"""
+    adaptativo = dict(ADAPTATIVO_PADRAO)
+    adaptativo.update(config_agendamento()['adaptativo'])
+    return adaptativo
+
+
+def intervalos_adaptativos(intervalos_base, taxas, adaptativo):
+    """Intervalos (horas) que gastam o mesmo total de varreduras por hora, divididas pela raiz da taxa de novidades
+
+    Com anúncios novos chegando a uma taxa t_i e f_i varreduras por hora, o atraso médio até
+    a detecção é 1/(2 f_i); o atraso total (soma de t_i / 2 f_i) com orçamento fixo de varreduras
+    é mínimo com f_i proporcional a raiz(t_i). Sites ainda sem taxa medida ficam no intervalo
+    configurado, e o orçamento dividido é só o dos sites medidos.
+    """
+    medidos = {site: horas for site, horas in intervalos_base.items() if site in taxas}
+    intervalos = dict(intervalos_base)
+    if not medidos:
+        return intervalos
+
+    orcamento = sum(1 / horas for horas in medidos.values())
+    pesos = {site: math.sqrt(max(taxas[site], 0) + adaptativo['taxa_minima']) for site in medidos}
+    soma_pesos = sum(pesos.values())
+    for site, peso in pesos.items():
+        intervalos[site] = min(max(soma_pesos / (orcamento * peso), adaptativo['intervalo_minimo_horas']),
+                               adaptativo['intervalo_maximo_horas'])
+    return intervalos
+
+
+class DaemonMonitor:
+    """Agenda de varreduras por site num heap; monitores e sessões HTTP vivem enquanto o processo durar"""
+
+    def __init__(self, sites=None, max_workers=None):
+        self.sites = {
+            chave: (nome, classe, metodo_busca, metodo_salvar, emoji)
+            for chave, nome, classe, metodo_busca, metodo_salvar, emoji in SITES_MONITORAMENTO
+            if not sites or chave in sites
+        }
+        if config_vigilancia()['ativo'] and (not sites or CHAVE_VIGILANCIA in sites):
+            # Lista de vigiados: agendada como um site, no intervalo próprio (vigilancia.intervalo_minutos)
+            self.sites[CHAVE_VIGILANCIA] = ('Vigilância', MonitorVigilancia, 'verificar', 'resumir', '👁️')
+        self.monitores = {}
+        self.agenda = []
+        self.em_execucao = {}
+        self.parar = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or len(self.sites))
+        os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+        os.makedirs(ALERTAS_DIR, exist_ok=True)
+
+    def registrar(self, mensagem):
+        """Mostra a mensagem e a acrescenta ao log"""
+        print(mensagem, flush=True)
+        with open(LOG_FILE, 'a', encoding='utf-8') as f:
+            f.write(f"{datetime.now().isoformat(timespec='seconds')} {mensagem}\n")
+
+    def intervalos(self):
+        """Intervalo em horas de cada site ativo: o do config.json ou o redistribuído pela taxa de novidades"""
+        intervalos_base = {}
+        for chave in self.sites:
+            site = config_site(chave)
+            if site['ativo'] and chave != CHAVE_VIGILANCIA:
+                intervalos_base[chave] = site['intervalo_horas']
+
+        adaptativo = config_adaptativo()
+        intervalos = intervalos_base
+        if adaptativo['ativo'] and indice_ativo():
+            taxas = {site: taxa for site, taxa in obter_indice().taxas_por_site().items() if site in intervalos_base}
+            intervalos = intervalos_adaptativos(intervalos_base, taxas, adaptativo)
+        # A vigilância tem intervalo fixo e fica fora do orçamento dividido pelas taxas
+        if CHAVE_VIGILANCIA in self.sites:
+            intervalos[CHAVE_VIGILANCIA] = config_vigilancia()['intervalo_minutos'] / 60
+        return intervalos
+
+    def proximo_intervalo(self, chave):
+        """Segundos até a próxima varredura do site, com jitter"""
+        jitter = config_agendamento()['jitter']
+        horas = self.intervalos().get(chave, config_site(chave)['intervalo_horas'])
+        return horas * 3600 * (1 + random.uniform(-jitter, jitter))
+
+    def agendar(self, chave, atraso):
+        heapq.heappush(self.agenda, (time.monotonic() + atraso, chave))
+
+    def executar_site(self, chave):
+        """Varre o site com o monitor já instanciado e grava os candidatos"""
+        nome, classe, metodo_busca, metodo_salvar, emoji = self.sites[chave]
+        monitor = self.monitores.get(chave)
+        if monitor is None:
+            monitor = self.monitores[chave] = classe()
+
+        candidatos = getattr(monitor, metodo_busca)() or []
+        referencia = getattr(monitor, metodo_salvar)(candidatos) if candidatos else None
+        return candidatos, referencia
+
+    def avaliar_alertas(self, chave, candidatos, referencia):
+        """Gera o arquivo de alerta quando a varredura traz candidatos acima do score de alerta"""
+        limiar = config_site(chave)['score_alerta']
+        alto_score = [c for c in candidatos if c.get('score_total', 0) >= limiar]
+        if not alto_score:
+            return None
+
+        nome = self.sites[chave][0]
+        self.registrar(f"🚨 {len(alto_score)} CANDIDATOS DE ALTO SCORE! ({nome})")
+        if config_vigilancia()['ativo'] and config_vigilancia()['adicionar_alertas']:
+            novos = vigiar_candidatos(chave, alto_score)
+            if novos:
+                self.registrar(f"👁️ {novos} anúncio(s) de {nome} na lista de vigiados")
+        arquivo = f"{ALERTAS_DIR}/alerta_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{chave}.txt"
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            f.write(f"{datetime.now()}: {len(alto_score)} candidatos alto score encontrados ({nome})\n")
+            f.write(f"Banco: {referencia}\n")
+            for candidato in top_k(alto_score, 10):
+                f.write(f"[{candidato.get('score_total', 0)}] {candidato.get('titulo', 'N/A')} - "
+                        f"R$ {candidato.get('preco', 0):,} - {candidato.get('url', 'N/A')}\n")
+        return arquivo
+
+    def concluir(self, futuro):
+        """Trata uma varredura terminada e reagenda o site"""
+        chave = self.em_execucao.pop(futuro)
+        nome, classe, metodo_busca, metodo_salvar, emoji = self.sites[chave]
+        try:
+            candidatos, referencia = futuro.result()
+            if chave == CHAVE_VIGILANCIA:
+                # Na vigilância a "busca" devolve eventos (vigiado, tipo, dados), que vão todos para o log
+                for vigiado, tipo, dados in candidatos:
+                    self.registrar(f"👁️ {descrever_evento(tipo, dados)} - {vigiado['url']}")
+                self.registrar(f"✅ {emoji} {nome} concluída ({len(candidatos)} eventos)")
+            else:
+                self.registrar(f"✅ {emoji} {nome} concluído ({len(candidatos)} candidatos)")
+                self.avaliar_alertas(chave, candidatos, referencia)
+        except Exception as e:
+            self.registrar(f"❌ Erro execução {nome}: {e}")
+
+        atraso = self.proximo_intervalo(chave)
+        self.agendar(chave, atraso)
+        self.registrar(f"⏳ {nome}: próxima varredura em {atraso / 60:.0f} min")
+
+    def disparar_vencidos(self):
+        """Envia ao pool os sites cujo horário chegou"""
+        agora = time.monotonic()
+        while self.agenda and self.agenda[0][0] <= agora:
+            _, chave = heapq.heappop(self.agenda)
+            if not config_site(chave)['ativo']:
+                # Desligado no config.json: volta a ser consultado no próximo intervalo
+                self.agendar(chave, self.proximo_intervalo(chave))
+                continue
+            nome, classe, metodo_busca, metodo_salvar, emoji = self.sites[chave]
+            self.registrar(f"{emoji} Iniciando monitoramento {nome}...")
+            self.em_execucao[self.executor.submit(self.executar_site, chave)] = chave
+
+    def executar(self):
+        """Laço principal: dispara os sites vencidos e espera o próximo horário ou o fim de uma varredura"""
+        self.registrar(f"🔄 === DAEMON DE MONITORAMENTO INICIADO {datetime.now()} ===")
+        # Primeira rodada espalhada em um minuto, para os sites não começarem todos juntos
+        for chave in self.sites:
+            self.agendar(chave, random.uniform(0, 60))
+
+        while not self.parar.is_set():
+            self.disparar_vencidos()
+            espera = ESPERA_MAXIMA
+            if self.agenda:
+                espera = min(espera, max(0, self.agenda[0][0] - time.monotonic()))
+
+            if self.em_execucao:
+                concluidos, _ = wait(self.em_execucao, timeout=espera, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    self.concluir(futuro)
+            else:
+                self.parar.wait(espera)
+
+        self.registrar(f"🛑 Daemon encerrado ({len(self.em_execucao)} varredura(s) em andamento abandonada(s))")
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def encerrar(self, *args):
+        self.parar.set()
+
+    def mostrar_taxas(self):
+        """Taxas de anúncios novos medidas e o intervalo que cada site receberia agora"""
+        print("📈 ANÚNCIOS NOVOS POR HORA (média móvel)")
+        for site, termo, regiao, taxa, novos_total, varreduras in obter_indice().taxas_novidades():
+            origem = f"{termo} / {regiao}" if regiao else termo
+            print(f"   {site:12s} {taxa:6.2f}/h  {origem or '-'}  ({novos_total} novos em {varreduras} varreduras)")
+        print("\n⏱️ INTERVALOS")
+        for chave, horas in self.intervalos().items():
+            print(f"   {self.sites[chave][4]} {self.sites[chave][0]}: {horas * 60:.0f} min")
+
+# Execução principal
+if __name__ == "__main__":
+    # Opcional: só os sites informados (ex.: python3 daemon_monitor.py olx ebay)
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    daemon = DaemonMonitor(sites=argumentos)
+    if '--taxas' in sys.argv:
+        daemon.mostrar_taxas()
+        sys.exit(0)
+    signal.signal(signal.SIGTERM, daemon.encerrar)
+    signal.signal(signal.SIGINT, daemon.encerrar)
+    daemon.executar()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# deduplicacao.py - Junta anúncios repetidos entre termos de busca e regiões antes da pontuação
+
+from indice_vistos import chave_anuncio
+
+
+class Deduplicador:
+    """Recebe os anúncios à medida que chegam e deixa passar só a primeira ocorrência de cada um"""
+
+    def __init__(self, site):
+        self.site = site
+        self.anuncios = {}
+
+    def adicionar(self, anuncios):
+        """Retorna os anúncios inéditos; os repetidos só acrescentam seu termo ao já recebido"""
+        ineditos = []
+        for anuncio in anuncios:
+            chave = chave_anuncio(self.site, anuncio)
+            termo = anuncio.get('termo_busca')
+            existente = self.anuncios.get(chave)
+
+            if existente is None:
+                anuncio['termos_busca'] = [termo] if termo else []
+                self.anuncios[chave] = anuncio
+                ineditos.append(anuncio)
+            elif termo and termo not in existente['termos_busca']:
+                # Mesmo objeto que já seguiu para a pontuação: a lista é atualizada no lugar
+                existente['termos_busca'].append(termo)
+        return ineditos
+
+
+def deduplicar(site, anuncios):
+    """Versão de uma passada só, para quando todos os anúncios já estão em mãos"""
+    return Deduplicador(site).adicionar(anuncios)
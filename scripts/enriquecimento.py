@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# enriquecimento.py - Busca a página do anúncio dos melhores candidatos e repontua com título + descrição
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from busca_assincrona import fetch_many
+from configuracao import BASE_DIR, carregar_config
+from indice_vistos import chave_anuncio
+from parser_html import criar_soup, scripts_json
+from perfis_score import obter_perfil
+from score_lote import pontuar_lote, texto_do_anuncio
+from top_k import top_k
+
+DETALHES_DB = f"{BASE_DIR}/cache/detalhes.db"
+
+# score_minimo: só candidatos a partir deste score têm a página buscada; max_paginas: limite por varredura;
+# validade_horas: por quanto tempo a descrição guardada de um anúncio é reaproveitada
+ENRIQUECIMENTO_PADRAO = {'ativo': True, 'score_minimo': 15, 'max_paginas': 10, 'validade_horas': 24, 'sites': {}}
+
+# Tamanho máximo da descrição guardada e pontuada
+MAX_DESCRICAO = 5000
+
+HEADERS_PADRAO = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+}
+
+_PRECO = re.compile(r'R\$\s*([\d.]+)')
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def config_enriquecimento(site):
+    """Bloco enriquecimento do config.json para o site: padrão global sobrescrito por sites.<site>"""
+    enriquecimento = dict(ENRIQUECIMENTO_PADRAO)
+    enriquecimento.update(carregar_config().get('enriquecimento', {}))
+    enriquecimento.update(enriquecimento.pop('sites').get(site, {}))
+    return enriquecimento
+
+
+def descricao_json_ld(soup):
+    """Descrição do bloco JSON-LD (Product/Offer), quando o site publica um"""
+    for dados in scripts_json(soup, 'application/ld+json'):
+        for item in dados if isinstance(dados, list) else [dados]:
+            if isinstance(item, dict) and isinstance(item.get('description'), str) and item['description'].strip():
+                return item['description']
+    return ''
+
+
+def preco_do_texto(texto):
+    """Primeiro valor em reais do texto, sem centavos ("R$ 4.500,00" -> 4500), ou 0"""
+    encontrado = _PRECO.search(texto or '')
+    return int(encontrado.group(1).replace('.', '')) if encontrado and encontrado.group(1).strip('.') else 0
+
+
+def extrair_detalhes(html, site=None):
+    """Título, preço e descrição da página de um anúncio"""
+    soup = criar_soup(html, site)
+
+    titulo_elem = soup.find('h1')
+    titulo = titulo_elem.get_text(strip=True) if titulo_elem else ''
+
+    preco_elem = soup.find('span', class_=re.compile(r'price|valor'))
+    preco_str = preco_elem.get_text(strip=True) if preco_elem else str(soup.find(string=re.compile(r'R\$')) or '')
+
+    descricao = ''
+    desc_elem = (soup.find(attrs={'data-section': 'description'}) or
+                 soup.find('div', class_=lambda c: c and ('description' in c or 'desc' in c)))
+    if desc_elem:
+        descricao = desc_elem.get_text(' ', strip=True)
+    if not descricao:
+        descricao = descricao_json_ld(soup)
+    if not descricao:
+        meta = soup.find('meta', attrs={'property': 'og:description'}) or soup.find('meta', attrs={'name': 'description'})
+        descricao = meta.get('content', '') if meta else ''
+
+    return {
+        'titulo': titulo,
+        'preco': preco_do_texto(preco_str),
+        'preco_str': preco_str.strip(),
+        'descricao': ' '.join(descricao.split())[:MAX_DESCRICAO]
+    }
+
+
+class CacheDetalhes:
+    """Descrição extraída da página de cada anúncio, pela chave do anúncio (ID no site)"""
+
+    def __init__(self, caminho=DETALHES_DB):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Usado por monitores em threads diferentes; o lock serializa o acesso
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conexao:
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS detalhes (
+                    chave TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    titulo TEXT,
+                    descricao TEXT NOT NULL,
+                    obtido_em TEXT NOT NULL
+                )
+            """)
+
+    def buscar(self, chaves, desde):
+        """Descrição de cada chave obtida a partir de `desde` (ISO)"""
+        chaves = list(chaves)
+        encontradas = {}
+        with self.lock:
+            for inicio in range(0, len(chaves), 500):
+                bloco = chaves[inicio:inicio + 500]
+                marcadores = ','.join('?' * len(bloco))
+                encontradas.update(self.conexao.execute(
+                    f"SELECT chave, descricao FROM detalhes WHERE chave IN ({marcadores}) AND obtido_em >= ?",
+                    bloco + [desde]
+                ))
+        return encontradas
+
+    def guardar(self, linhas):
+        """linhas: (chave, url, título, descrição)"""
+        agora = datetime.now().isoformat()
+        with self.lock, self.conexao:
+            self.conexao.executemany(
+                "INSERT OR REPLACE INTO detalhes VALUES (?, ?, ?, ?, ?)",
+                [(chave, url, titulo, descricao, agora) for chave, url, titulo, descricao in linhas]
+            )
+
+
+def obter_cache_detalhes(caminho=DETALHES_DB):
+    """Cache de páginas de anúncio compartilhado pelo processo"""
+    with _caches_lock:
+        cache = _caches.get(caminho)
+        if cache is None:
+            cache = _caches[caminho] = CacheDetalhes(caminho)
+        return cache
+
+
+def buscar_descricoes(site, anuncios, headers=None, validade_horas=24):
+    """Descrição de cada anúncio (pela chave): do cache se ainda válida, senão da página do anúncio
+
+    As páginas que faltam são buscadas em paralelo pela camada de busca, dentro dos limites do host.
+    """
+    cache = obter_cache_detalhes()
+    por_chave = {chave_anuncio(site, anuncio): anuncio for anuncio in anuncios if anuncio.get('url')}
+    desde = (datetime.now() - timedelta(hours=validade_horas)).isoformat()
+    descricoes = cache.buscar(por_chave, desde)
+
+    faltando = [chave for chave in por_chave if chave not in descricoes]
+    if not faltando:
+        return descricoes
+
+    respostas = fetch_many(site, [{'url': por_chave[chave]['url'], 'timeout': 15} for chave in faltando],
+                           headers=headers or HEADERS_PADRAO)
+    novas = []
+    for chave, response in zip(faltando, respostas):
+        url = por_chave[chave]['url']
+        if isinstance(response, Exception):
+            print(f"❌ Erro ao buscar anúncio {url}: {response}")
+        elif response.status_code != 200:
+            print(f"❌ Erro HTTP {response.status_code} no anúncio {url}")
+        else:
+            detalhes = extrair_detalhes(response.text, site)
+            descricoes[chave] = detalhes['descricao']
+            novas.append((chave, url, detalhes['titulo'], detalhes['descricao']))
+    cache.guardar(novas)
+    return descricoes
+
+
+def repontuar(site, perfil, anuncios):
+    """Repontua os anúncios com o texto completo (título + descrição), guardando o score só do título"""
+    pontuacoes = pontuar_lote(
+        perfil,
+        [texto_do_anuncio(site, anuncio) for anuncio in anuncios],
+        [anuncio.get('preco') or 0 for anuncio in anuncios]
+    )
+    for indice, pontuacao in pontuacoes:
+        anuncio = anuncios[indice]
+        anuncio.setdefault('score_titulo', anuncio.get('score_total', 0))
+        anuncio.update(pontuacao)
+
+
+def enriquecer(site, candidatos, perfil, headers=None):
+    """Acrescenta a descrição aos melhores candidatos e os repontua; devolve todos, ordenados por score
+
+    Só candidatos com score_total >= score_minimo entram, até max_paginas por varredura (os de maior score).
+    """
+    enriquecimento = config_enriquecimento(site)
+    if not enriquecimento['ativo'] or not candidatos:
+        return candidatos
+
+    elegiveis = [c for c in candidatos if c.get('score_total', 0) >= enriquecimento['score_minimo']]
+    elegiveis = top_k(elegiveis, enriquecimento['max_paginas'])
+    if not elegiveis:
+        return candidatos
+
+    descricoes = buscar_descricoes(site, elegiveis, headers, enriquecimento['validade_horas'])
+    enriquecidos = []
+    for candidato in elegiveis:
+        descricao = descricoes.get(chave_anuncio(site, candidato))
+        if descricao:
+            candidato['descricao'] = descricao
+            enriquecidos.append(candidato)
+    repontuar(site, perfil, enriquecidos)
+
+    subiram = sum(1 for c in enriquecidos if c['score_total'] > c['score_titulo'])
+    print(f"📖 {site}: {len(enriquecidos)}/{len(elegiveis)} anúncio(s) com descrição, {subiram} subiram de score")
+    return sorted(candidatos, key=lambda x: x['score_total'], reverse=True)
+
+
+def analisar_anuncio(url, site='olx_regional', headers=None):
+    """Busca um anúncio avulso e mostra título, descrição e score com o perfil do site"""
+    print(f"🔍 Analisando anúncio: {url}")
+    response = fetch_many(site, [{'url': url, 'timeout': 15}], headers=headers or HEADERS_PADRAO)[0]
+    if isinstance(response, Exception):
+        print(f"❌ Erro na requisição: {response}")
+        return None
+    print(f"📡 Status HTTP: {response.status_code}")
+    if response.status_code == 404:
+        print("❌ Anúncio não encontrado (404) - pode ter sido removido")
+        return None
+    if response.status_code != 200:
+        print(f"❌ Erro HTTP {response.status_code}")
+        return None
+
+    anuncio = dict(extrair_detalhes(response.text, site), url=url)
+    pontuacao = pontuar_lote(obter_perfil(site), [texto_do_anuncio(site, anuncio)], [anuncio['preco']])
+    anuncio.update(pontuacao[0][1])
+
+    print(f"📝 Título: {anuncio['titulo'] or 'não encontrado'}")
+    print(f"💰 Preço: R$ {anuncio['preco']:,} ({anuncio['suspeita_preco']})")
+    print(f"📄 Descrição: {(anuncio['descricao'][:200] + '...') if anuncio['descricao'] else 'não encontrada'}")
+    print(f"📊 Score: {anuncio['score_total']} (Sim: {anuncio['score_similaridade']}, Preço: {anuncio['score_preco']})")
+    print(f"🚦 {anuncio['nivel_alerta']} (Probabilidade: {anuncio['probabilidade_match']})")
+    if anuncio['caracteristicas_encontradas']:
+        print(f"✅ Características: {', '.join(anuncio['caracteristicas_encontradas'])}")
+    return anuncio
+
+# Execução principal
+if __name__ == "__main__":
+    # Uso: python3 enriquecimento.py URL [site]
+    if len(sys.argv) < 2:
+        print("Uso: python3 enriquecimento.py URL [site]")
+        sys.exit(1)
+    analisar_anuncio(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else 'olx_regional')
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# extracoes.py - Reaproveita a extração de páginas de busca que não mudaram (digest sem trechos voláteis)
+
+import hashlib
+import importlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from configuracao import BASE_DIR, carregar_config
+
+EXTRACOES_DB = f"{BASE_DIR}/cache/extracoes.db"
+
+# Trechos que mudam a cada requisição sem mudar os anúncios: tokens CSRF, nonces, ids de requisição, horários
+PADROES_VOLATEIS = [
+    re.compile(r'<input[^>]+name=["\']?[\w-]*(?:csrf|xsrf|authenticity_token|requestverificationtoken)[^>]*>', re.I),
+    re.compile(r'<meta[^>]+name=["\']?[\w-]*(?:csrf|xsrf)[^>]*>', re.I),
+    re.compile(r'["\']?[\w-]*(?:csrf|xsrf)[\w-]*["\']?\s*[:=]\s*["\'][^"\']*["\']', re.I),
+    re.compile(r'\bnonce=["\'][^"\']*["\']', re.I),
+    re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.I),
+    re.compile(r'\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?'),
+    # Epoch em segundos ou milissegundos só com nome de carimbo de tempo: números soltos podem ser IDs ou preços
+    re.compile(r'(?:time|ts|timestamp|_t)["\']?\s*[:=]\s*["\']?\d{10,13}\b', re.I),
+    re.compile(r'\s+')
+]
+
+# Módulos que também decidem o resultado da extração, além do módulo do próprio extrator
+MODULOS_AUXILIARES = ('parser_html', 'extracoes')
+
+_caches = {}
+_caches_lock = threading.Lock()
+_hashes_fontes = {}
+
+
+def cache_extracoes_ativo():
+    return carregar_config().get('cache_extracoes', {}).get('ativo', True)
+
+
+def digest_pagina(texto):
+    """Hash da página sem os trechos voláteis"""
+    for padrao in PADROES_VOLATEIS:
+        texto = padrao.sub(' ', texto)
+    return hashlib.sha1(texto.encode('utf-8', 'replace')).hexdigest()
+
+
+def hash_fonte(caminho):
+    """Hash do arquivo-fonte de um módulo (o código carregado não muda enquanto o processo vive)"""
+    if caminho not in _hashes_fontes:
+        with open(caminho, 'rb') as f:
+            _hashes_fontes[caminho] = hashlib.sha1(f.read()).hexdigest()
+    return _hashes_fontes[caminho]
+
+
+def versao_extrator(extrair):
+    """Hash do código do módulo do extrator e dos auxiliares: mudou algum, a extração guardada deixa de valer"""
+    nomes = [getattr(extrair, '__module__', None), *MODULOS_AUXILIARES]
+    arquivos = [getattr(importlib.import_module(nome), '__file__', None) for nome in nomes if nome]
+    return hashlib.sha1(''.join(hash_fonte(arquivo) for arquivo in arquivos if arquivo).encode()).hexdigest()
+
+
+class CacheExtracoes:
+    """Último digest e anúncios extraídos de cada página de busca (site, termo, região)"""
+
+    def __init__(self, caminho=EXTRACOES_DB):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Usado por monitores em threads diferentes; o lock serializa o acesso
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conexao:
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS extracoes (
+                    site TEXT NOT NULL,
+                    termo TEXT NOT NULL,
+                    regiao TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    extrator TEXT NOT NULL,
+                    anuncios TEXT NOT NULL,
+                    atualizado_em TEXT NOT NULL,
+                    PRIMARY KEY (site, termo, regiao)
+                )
+            """)
+
+    def buscar(self, site, termo, regiao, extrator):
+        """(digest, anúncios em JSON) guardados para a página com esta versão do extrator, ou (None, None)"""
+        with self.lock:
+            linha = self.conexao.execute(
+                "SELECT digest, anuncios FROM extracoes WHERE site = ? AND termo = ? AND regiao = ? AND extrator = ?",
+                (site, termo, regiao, extrator)
+            ).fetchone()
+        return (linha[0], linha[1]) if linha else (None, None)
+
+    def guardar(self, site, termo, regiao, digest, extrator, anuncios):
+        with self.lock, self.conexao:
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO extracoes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (site, termo, regiao, digest, extrator, json.dumps(anuncios, ensure_ascii=False, default=str),
+                 datetime.now().isoformat())
+            )
+
+
+def obter_cache_extracoes(caminho=EXTRACOES_DB):
+    """Cache de extrações compartilhado pelo processo"""
+    with _caches_lock:
+        cache = _caches.get(caminho)
+        if cache is None:
+            cache = _caches[caminho] = CacheExtracoes(caminho)
+        return cache
+
+
+def reaproveitar(anuncios_json):
+    """Cópias novas dos anúncios guardados, com a data da busca atualizada"""
+    anuncios = json.loads(anuncios_json)
+    agora = datetime.now().isoformat()
+    for anuncio in anuncios:
+        if 'data_busca' in anuncio:
+            anuncio['data_busca'] = agora
+    return anuncios
+
+
+def extrair_pagina(site, response, extrair, termo, *argumentos, pagina=1):
+    """extrair(response.text, termo, *argumentos), ou a extração anterior se a página não mudou
+
+    A página é identificada por (site, termo, região, número da página); a região é o primeiro dos
+    argumentos extras, quando houver. Páginas marcadas como inalteradas pelo cache HTTP nem têm o
+    digest calculado.
+    """
+    if not cache_extracoes_ativo():
+        return extrair(response.text, termo, *argumentos)
+
+    regiao = str(argumentos[0]) if argumentos else ''
+    if pagina > 1:
+        regiao = f"{regiao}#{pagina}"
+    extrator = versao_extrator(extrair)
+    cache = obter_cache_extracoes()
+    digest_anterior, anuncios_json = cache.buscar(site, termo, regiao, extrator)
+    if anuncios_json is not None and getattr(response, 'inalterada', False):
+        return reaproveitar(anuncios_json)
+
+    digest = digest_pagina(response.text)
+    if digest == digest_anterior:
+        return reaproveitar(anuncios_json)
+
+    anuncios = extrair(response.text, termo, *argumentos)
+    # Guardado antes da deduplicação e da pontuação, que alteram os dicts
+    cache.guardar(site, termo, regiao, digest, extrator, anuncios)
+    return anuncios
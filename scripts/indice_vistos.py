@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# indice_vistos.py - Índice persistente (SQLite) dos anúncios já vistos em cada site
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from configuracao import BASE_DIR, carregar_config
+
+INDICE_DB = f"{BASE_DIR}/dados/vistos.db"
+
+# Meia-vida da média móvel de anúncios novos por hora: varreduras de 1 dia atrás pesam metade
+MEIA_VIDA_HORAS = 24
+
+# ID do item no site, quando a URL traz um; senão a chave é a própria URL normalizada
+PADROES_ID = [
+    re.compile(r'(mlb)-?(\d{6,})'),                             # Mercado Livre
+    re.compile(r'olx\.com\.br/.*-(\d{6,})$'),                   # OLX (qualquer região)
+    re.compile(r'ebay\.[a-z.]+/itm/(?:[^/]+/)?(\d{9,})'),       # eBay
+    re.compile(r'shopee\.com\.br/(?:item/(\d+)/(\d+)|.*-i\.(\d+)\.(\d+))')
+]
+
+_indices = {}
+_indices_lock = threading.Lock()
+
+
+def normalizar_url(url):
+    """URL sem esquema, www, query, fragmento e barra final, em minúsculas"""
+    partes = urlsplit(url.strip().lower())
+    host = partes.netloc[4:] if partes.netloc.startswith('www.') else partes.netloc
+    return f"{host}{partes.path.rstrip('/')}"
+
+
+def chave_anuncio(site, anuncio):
+    """Chave estável do anúncio: ID do item ou URL normalizada (título, se não houver URL)"""
+    url = normalizar_url(anuncio.get('url') or '')
+    if not url:
+        return f"{site}:titulo:{anuncio.get('titulo', '').strip().lower()}"
+    for padrao in PADROES_ID:
+        encontrado = padrao.search(url)
+        if encontrado:
+            return f"{site}:id:{'-'.join(g for g in encontrado.groups() if g)}"
+    return f"{site}:url:{url}"
+
+
+def hash_conteudo(anuncio):
+    """Hash do que importa para o score: título, preço e descrição"""
+    conteudo = f"{anuncio.get('titulo', '')}|{anuncio.get('preco', '')}|{anuncio.get('descricao', '')}"
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+
+def origem_anuncio(anuncio):
+    """(termo, região) da busca que trouxe o anúncio"""
+    return anuncio.get('termo_busca') or '', anuncio.get('regiao') or ''
+
+
+def indice_ativo():
+    """O índice pode ser desligado no config.json para forçar a repontuação de tudo"""
+    return carregar_config().get('indice_vistos', {}).get('ativo', True)
+
+
+class IndiceVistos:
+    """Anúncios vistos por chave, com hash do conteúdo, primeira/última vez vistos e último score"""
+
+    def __init__(self, caminho=INDICE_DB):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Compartilhado pelas threads do monitor_completo; o lock serializa o acesso
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.lock = threading.Lock()
+        # Varredura de cada site entre filtrar_novos e confirmar_vistos
+        self.pendentes = {}
+        with self.lock, self.conexao:
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS vistos (
+                    chave TEXT PRIMARY KEY,
+                    hash_conteudo TEXT NOT NULL,
+                    primeiro_visto TEXT NOT NULL,
+                    ultimo_visto TEXT NOT NULL,
+                    ultimo_score INTEGER
+                )
+            """)
+            # Ritmo de anúncios novos por site, termo e região (média móvel exponencial no tempo)
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS novidades (
+                    site TEXT NOT NULL,
+                    termo TEXT NOT NULL,
+                    regiao TEXT NOT NULL,
+                    ultima_varredura TEXT NOT NULL,
+                    taxa_por_hora REAL,
+                    novos_total INTEGER NOT NULL,
+                    varreduras INTEGER NOT NULL,
+                    PRIMARY KEY (site, termo, regiao)
+                )
+            """)
+
+    def hashes_conhecidos(self, chaves):
+        """Hash do conteúdo já registrado para cada chave conhecida"""
+        conhecidos = {}
+        chaves = list(chaves)
+        for inicio in range(0, len(chaves), 500):
+            bloco = chaves[inicio:inicio + 500]
+            marcadores = ','.join('?' * len(bloco))
+            conhecidos.update(self.conexao.execute(
+                f"SELECT chave, hash_conteudo FROM vistos WHERE chave IN ({marcadores})", bloco
+            ))
+        return conhecidos
+
+    def filtrar_novos(self, site, anuncios):
+        """Só os anúncios novos ou alterados (sem repetidos); a varredura fica pendente até confirmar_vistos
+
+        Nada é gravado aqui: se a execução falhar antes de salvar os candidatos, os anúncios
+        continuam inéditos e voltam a ser pontuados (e alertados) na próxima varredura. Chamadas
+        seguidas (um monitor que pontua em lotes) se somam na mesma varredura pendente; a de uma
+        execução que falhou entra na seguinte, medida desde a última varredura confirmada.
+        """
+        agora = datetime.now().isoformat()
+        por_chave = {}
+        for anuncio in anuncios:
+            # O mesmo anúncio volta em vários termos de busca; fica a primeira ocorrência
+            por_chave.setdefault(chave_anuncio(site, anuncio), anuncio)
+
+        hashes = {chave: hash_conteudo(anuncio) for chave, anuncio in por_chave.items()}
+        with self.lock:
+            conhecidos = self.hashes_conhecidos(por_chave)
+            pendente = self.pendentes.setdefault(site, {'por_chave': {}, 'hashes': {}, 'novos': [], 'scores': []})
+            pendente['agora'] = agora
+            for chave, anuncio in por_chave.items():
+                if chave in pendente['por_chave']:
+                    continue
+                pendente['por_chave'][chave] = anuncio
+                pendente['hashes'][chave] = hashes[chave]
+                if chave not in conhecidos:
+                    pendente['novos'].append(anuncio)
+
+        return [anuncio for chave, anuncio in por_chave.items() if conhecidos.get(chave) != hashes[chave]]
+
+    def confirmar_vistos(self, site):
+        """Grava a varredura pendente do site: anúncios vistos, ritmo de novidades e scores"""
+        with self.lock, self.conexao:
+            pendente = self.pendentes.pop(site, None)
+            if pendente is None:
+                return
+            agora, por_chave, hashes = pendente['agora'], pendente['por_chave'], pendente['hashes']
+            self.conexao.executemany("""
+                INSERT INTO vistos (chave, hash_conteudo, primeiro_visto, ultimo_visto)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(chave) DO UPDATE SET
+                    hash_conteudo = excluded.hash_conteudo,
+                    ultimo_visto = excluded.ultimo_visto
+            """, [(chave, hashes[chave], agora, agora) for chave in por_chave])
+            self.registrar_novidades(site, por_chave.values(), pendente['novos'], agora)
+            self.conexao.executemany("UPDATE vistos SET ultimo_score = ? WHERE chave = ?", pendente['scores'])
+
+    def registrar_novidades(self, site, anuncios, novos, agora):
+        """Atualiza a taxa de anúncios novos por hora de cada termo/região varrido (com o lock e a transação abertos)"""
+        # Termos/regiões varridos sem nada novo também entram, com zero, para a taxa cair
+        contagens = dict.fromkeys((origem_anuncio(anuncio) for anuncio in anuncios), 0)
+        for anuncio in novos:
+            contagens[origem_anuncio(anuncio)] += 1
+
+        instante = datetime.fromisoformat(agora)
+        for (termo, regiao), quantidade in contagens.items():
+            linha = self.conexao.execute(
+                "SELECT ultima_varredura, taxa_por_hora FROM novidades WHERE site = ? AND termo = ? AND regiao = ?",
+                (site, termo, regiao)
+            ).fetchone()
+            if linha is None:
+                # Primeira varredura do termo: tudo é "novo", então ainda não há taxa
+                self.conexao.execute(
+                    "INSERT INTO novidades VALUES (?, ?, ?, ?, NULL, ?, 1)", (site, termo, regiao, agora, quantidade)
+                )
+                continue
+
+            horas = (instante - datetime.fromisoformat(linha[0])).total_seconds() / 3600
+            if horas <= 0:
+                continue
+            taxa_atual = quantidade / horas
+            peso = 1 - 0.5 ** (horas / MEIA_VIDA_HORAS)
+            taxa = taxa_atual if linha[1] is None else linha[1] + peso * (taxa_atual - linha[1])
+            self.conexao.execute("""
+                UPDATE novidades SET ultima_varredura = ?, taxa_por_hora = ?,
+                    novos_total = novos_total + ?, varreduras = varreduras + 1
+                WHERE site = ? AND termo = ? AND regiao = ?
+            """, (agora, taxa, quantidade, site, termo, regiao))
+
+    def taxas_novidades(self, site=None):
+        """Linhas (site, termo, regiao, taxa_por_hora, novos_total, varreduras) com taxa já medida"""
+        sql = "SELECT site, termo, regiao, taxa_por_hora, novos_total, varreduras FROM novidades WHERE taxa_por_hora IS NOT NULL"
+        parametros = []
+        if site:
+            sql += " AND site = ?"
+            parametros.append(site)
+        with self.lock:
+            return self.conexao.execute(sql + " ORDER BY taxa_por_hora DESC", parametros).fetchall()
+
+    def taxas_por_site(self):
+        """Soma das taxas de anúncios novos por hora de cada site"""
+        with self.lock:
+            return dict(self.conexao.execute(
+                "SELECT site, SUM(taxa_por_hora) FROM novidades WHERE taxa_por_hora IS NOT NULL GROUP BY site"
+            ))
+
+    def fracao_inedita(self, site, anuncios):
+        """Fração dos anúncios cuja chave ainda não está no índice (só consulta, não registra)"""
+        chaves = {chave_anuncio(site, anuncio) for anuncio in anuncios}
+        if not chaves:
+            return 0.0
+        with self.lock:
+            conhecidos = self.hashes_conhecidos(chaves)
+        return 1 - len(conhecidos) / len(chaves)
+
+    def registrar_scores(self, site, anuncios):
+        """Guarda o último score dos anúncios pontuados (junto com a varredura pendente, se houver)"""
+        scores = [(a.get('score_total'), chave_anuncio(site, a)) for a in anuncios]
+        with self.lock:
+            pendente = self.pendentes.get(site)
+            if pendente is not None:
+                pendente['scores'].extend(scores)
+                return
+            with self.conexao:
+                self.conexao.executemany("UPDATE vistos SET ultimo_score = ? WHERE chave = ?", scores)
+
+    def fechar(self):
+        with self.lock:
+            self.conexao.close()
+
+
+def obter_indice(caminho=INDICE_DB):
+    """Índice compartilhado pelo processo"""
+    with _indices_lock:
+        indice = _indices.get(caminho)
+        if indice is None:
+            indice = _indices[caminho] = IndiceVistos(caminho)
+        return indice
+
+
+def filtrar_novos(site, anuncios):
+    """Só os anúncios novos ou alterados desde a última varredura confirmada (todos, se o índice estiver desligado)"""
+    if not anuncios or not indice_ativo():
+        return anuncios
+    return obter_indice().filtrar_novos(site, anuncios)
+
+
+def fracao_inedita(site, anuncios):
+    """Fração de anúncios nunca vistos no site (1.0 se o índice estiver desligado)"""
+    if not indice_ativo():
+        return 1.0 if anuncios else 0.0
+    return obter_indice().fracao_inedita(site, anuncios)
+
+
+def registrar_scores(site, candidatos):
+    """Atualiza o último score dos candidatos no índice (uma vez, no fim da varredura)
+
+    Sem candidatos não há o que salvar, então a varredura já é confirmada; com candidatos,
+    ela só é gravada por confirmar_vistos, depois que salvar_execucao os guardou.
+    """
+    if not indice_ativo():
+        return
+    if candidatos:
+        obter_indice().registrar_scores(site, candidatos)
+    else:
+        obter_indice().confirmar_vistos(site)
+
+
+def confirmar_vistos(site):
+    """Grava no índice a varredura pendente do site (anúncios passam a contar como vistos)"""
+    if indice_ativo():
+        obter_indice().confirmar_vistos(site)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# limitador_taxa.py - Token bucket por host com recuo adaptativo em 429/403
+
+import threading
+import time
+
+from configuracao import carregar_config
+
+# Usados quando o config.json não define limites para o host
+LIMITE_PADRAO = {'taxa': 0.33, 'rajada': 1, 'simultaneas': 1}
+LIMITES_HOSTS_PADRAO = {
+    'api.mercadolibre.com': {'taxa': 0.5, 'rajada': 2},
+    'olx.com.br': {'taxa': 1, 'rajada': 3},
+    'shopee.com.br': {'taxa': 0.25, 'rajada': 1},
+    'magazineluiza.com.br': {'taxa': 0.33, 'rajada': 1},
+    'enjoei.com.br': {'taxa': 0.25, 'rajada': 1},
+    'ebay.com': {'taxa': 0.25, 'rajada': 1},
+    'americanas.com.br': {'taxa': 0.33, 'rajada': 1},
+    'casasbahia.com.br': {'taxa': 0.33, 'rajada': 1},
+    'pontofrio.com.br': {'taxa': 0.33, 'rajada': 1}
+}
+
+STATUS_BLOQUEIO = (403, 429)
+PAUSA_BASE = 5       # segundos de pausa após o primeiro bloqueio
+PAUSA_MAXIMA = 300
+FATOR_RECUO = 0.5    # taxa multiplicada por este fator a cada bloqueio
+FATOR_RECUPERACAO = 1.1
+TAXA_MINIMA = 0.02
+
+
+class TokenBucket:
+    """Token bucket com taxa (req/s) e rajada; reduz a taxa quando o host bloqueia"""
+
+    def __init__(self, taxa, rajada=1):
+        self.taxa_base = float(taxa)
+        self.taxa = float(taxa)
+        self.rajada = float(rajada)
+        self.tokens = float(rajada)
+        self.atualizado = time.monotonic()
+        self.bloqueado_ate = 0.0
+        self.bloqueios_seguidos = 0
+        self.lock = threading.Lock()
+
+    def _repor(self, agora):
+        self.tokens = min(self.rajada, self.tokens + (agora - self.atualizado) * self.taxa)
+        self.atualizado = agora
+
+    def reservar(self):
+        """Consome um token e retorna quantos segundos esperar antes de usá-lo"""
+        with self.lock:
+            agora = time.monotonic()
+            self._repor(agora)
+            self.tokens -= 1
+            espera = -self.tokens / self.taxa if self.tokens < 0 else 0.0
+            return max(espera, self.bloqueado_ate - agora)
+
+    def espera_bloqueio(self):
+        """Segundos restantes da pausa imposta pelo último bloqueio (0 se não houver)"""
+        with self.lock:
+            return max(0.0, self.bloqueado_ate - time.monotonic())
+
+    def registrar_resposta(self, status_code, retry_after=None):
+        """Ajusta a taxa conforme a resposta: recua em 429/403, recupera aos poucos no resto"""
+        with self.lock:
+            agora = time.monotonic()
+            if status_code in STATUS_BLOQUEIO:
+                self.bloqueios_seguidos += 1
+                self._repor(agora)
+                self.taxa = max(TAXA_MINIMA, self.taxa * FATOR_RECUO)
+                pausa = min(PAUSA_MAXIMA, PAUSA_BASE * 2 ** (self.bloqueios_seguidos - 1))
+                if retry_after is not None:
+                    pausa = max(pausa, min(PAUSA_MAXIMA, retry_after))
+                self.bloqueado_ate = max(self.bloqueado_ate, agora + pausa)
+            else:
+                self.bloqueios_seguidos = 0
+                if self.taxa < self.taxa_base:
+                    self._repor(agora)
+                    self.taxa = min(self.taxa_base, self.taxa * FATOR_RECUPERACAO)
+
+
+def limites_do_host(host, config=None):
+    """Retorna o dict de limites do host, casando por sufixo (olx.com.br cobre sp.olx.com.br)"""
+    config = carregar_config() if config is None else config
+    limites_config = config.get('limites_taxa', {})
+    hosts = dict(LIMITES_HOSTS_PADRAO)
+    hosts.update(limites_config.get('hosts', {}))
+
+    limites = dict(LIMITE_PADRAO)
+    limites.update(limites_config.get('padrao', {}))
+    # Sufixo mais longo vence, para permitir exceções como 'df.olx.com.br'
+    for sufixo in sorted(hosts, key=len, reverse=True):
+        if host == sufixo or host.endswith('.' + sufixo):
+            limites.update(hosts[sufixo])
+            break
+    return limites
+
+
+def interpretar_retry_after(valor):
+    """Converte o cabeçalho Retry-After (em segundos) para número, se possível"""
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
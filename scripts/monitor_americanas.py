@@ -1,27 +1,22 @@
 #!/usr/bin/env python3
 # monitor_americanas.py - Monitoramento específico para Americanas
 
-import requests
-import json
 import re
 from datetime import datetime
-import time
-import os
-from bs4 import BeautifulSoup
+
+from armazenamento import salvar_execucao
+from busca_assincrona import fetch_many
+from deduplicacao import deduplicar
+from extracoes import extrair_pagina
+from indice_vistos import filtrar_novos, registrar_scores
+from parser_html import criar_soup
+from perfis_score import obter_perfil
+from score_lote import pontuar_lote
 
 class MonitorAmericanasEspecializado:
     def __init__(self):
         self.modelo_principal = "ASUS ROG Zephyrus M16"
         self.codigo_modelo = "GU604"
-        self.caracteristicas_unicas = [
-            "anime matrix", "mini led", "240hz", "2560x1600", 
-            "gu604", "2023", "tampa animada", "led matrix",
-            "nebula hdr", "rog intelligent cooling", "rtx 4070",
-            "rtx 4080", "ryzen 9", "ddr5", "32gb", "1tb ssd",
-            "dolby vision", "wifi 6e", "thunderbolt 4", "qhd", 
-            "16 polegadas", "zephyrus m16", "rog zephyrus",
-            "gaming laptop", "keystone ii"
-        ]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -30,6 +25,11 @@ class MonitorAmericanasEspecializado:
             'Connection': 'keep-alive'
         }
     
+    @property
+    def perfil(self):
+        """Perfil de score do site, montado a partir do config.json"""
+        return obter_perfil('americanas')
+    
     def gerar_termos_americanas(self):
         """Termos específicos para busca nas Americanas"""
         return [
@@ -43,39 +43,40 @@ class MonitorAmericanasEspecializado:
     def buscar_americanas(self):
         """Busca anúncios nas Americanas"""
         resultados_todos = []
+        termos = self.gerar_termos_americanas()
         
-        for termo in self.gerar_termos_americanas():
+        # URL das Americanas para busca
+        url = "https://www.americanas.com.br/busca"
+        requisicoes = []
+        for termo in termos:
             print(f"🔍 Buscando Americanas: '{termo}'")
-            
-            # URL das Americanas para busca
-            url = "https://www.americanas.com.br/busca"
             params = {
                 'termo': termo,
                 'sortBy': 'relevance'
             }
-            
-            try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=15)
-                
-                if response.status_code == 200:
-                    anuncios = self.extrair_anuncios_americanas(response.text, termo)
-                    resultados_todos.extend(anuncios)
-                else:
-                    print(f"❌ Erro HTTP {response.status_code} para '{termo}'")
-                
-                time.sleep(3)  # Respeitar rate limit
-                
-            except Exception as e:
-                print(f"❌ Erro na busca Americanas '{termo}': {e}")
-        
-        return self.filtrar_candidatos_americanas(resultados_todos)
+            requisicoes.append({'url': url, 'params': params, 'timeout': 15})
+        
+        # Requisições em paralelo; o espaçamento por host fica a cargo da camada de busca
+        respostas = fetch_many('americanas', requisicoes, headers=self.headers)
+        
+        for termo, response in zip(termos, respostas):
+            if isinstance(response, Exception):
+                print(f"❌ Erro na busca Americanas '{termo}': {response}")
+            elif response.status_code == 200:
+                anuncios = extrair_pagina('americanas', response, self.extrair_anuncios_americanas, termo)
+                resultados_todos.extend(anuncios)
+            else:
+                print(f"❌ Erro HTTP {response.status_code} para '{termo}'")
+        
+        # O mesmo anúncio aparece em vários termos: pontua uma vez só
+        return self.filtrar_candidatos_americanas(deduplicar('americanas', resultados_todos))
     
     def extrair_anuncios_americanas(self, html, termo_busca):
         """Extrai anúncios do HTML das Americanas"""
         anuncios = []
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = criar_soup(html, 'americanas')
             
             # Americanas usa estrutura específica para produtos
             containers = (soup.find_all('div', class_=re.compile(r'product|item')) or
@@ -131,125 +132,50 @@ class MonitorAmericanasEspecializado:
     
     def calcular_score_americanas(self, titulo, descricao=""):
         """Calcula score específico para Americanas"""
-        texto_completo = (titulo + " " + descricao).lower()
-        score = 0
-        caracteristicas_encontradas = []
-        
-        # Características super específicas
-        if "anime matrix" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 AniMe Matrix")
-        
-        if "gu604" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 GU604")
-        
-        if "mini led" in texto_completo:
-            score += 12
-            caracteristicas_encontradas.append("🎯 Mini LED")
-        
-        # Características importantes
-        if "240hz" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("⭐ 240Hz")
-        
-        if "2560x1600" in texto_completo or "2560 x 1600" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("⭐ Resolução")
-        
-        if "2023" in texto_completo:
-            score += 6
-            caracteristicas_encontradas.append("⭐ 2023")
-        
-        # Modelo e marca
-        if "zephyrus m16" in texto_completo:
-            score += 12
-            caracteristicas_encontradas.append("🎯 Zephyrus M16")
-        
-        if "asus" in texto_completo and "rog" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("✓ ASUS ROG")
-        
-        return score, caracteristicas_encontradas
+        return self.perfil.pontuar(titulo + " " + descricao)
     
     def analisar_suspeita_preco_americanas(self, preco):
         """Análise específica de preço para Americanas"""
-        if preco < 2000:
-            return "🚨 EXTREMAMENTE SUSPEITO", 12
-        elif preco < 4000:
-            return "⚠️ MUITO SUSPEITO", 10
-        elif preco < 7000:
-            return "⚠️ SUSPEITO", 7
-        elif preco < 10000:
-            return "💰 PREÇO BAIXO", 4
-        else:
-            return "💰 PREÇO NORMAL", 0
+        return self.perfil.analisar_preco(preco)
     
     def filtrar_candidatos_americanas(self, anuncios):
         """Filtra e pontua candidatos das Americanas"""
         candidatos = []
         
-        for anuncio in anuncios:
-            score, caracteristicas = self.calcular_score_americanas(anuncio['titulo'])
-            preco = anuncio['preco']
-            suspeita_preco, score_preco = self.analisar_suspeita_preco_americanas(preco)
-            
-            score_total = score + score_preco
-            
-            # Filtro: só candidatos com score significativo
-            if score >= 12 or score_preco >= 7:
-                anuncio.update({
-                    'score_similaridade': score,
-                    'score_preco': score_preco,
-                    'score_total': score_total,
-                    'caracteristicas_encontradas': caracteristicas,
-                    'suspeita_preco': suspeita_preco,
-                    'nivel_alerta': self.definir_nivel_alerta_americanas(score_total),
-                    'probabilidade_match': self.calcular_probabilidade(score_total)
-                })
-                candidatos.append(anuncio)
+        # Só anúncios novos ou alterados desde a última varredura são pontuados
+        anuncios = filtrar_novos('americanas', anuncios)
         
+        # Filtro: só candidatos com score significativo
+        pontuacoes = pontuar_lote(
+            self.perfil,
+            [anuncio['titulo'] for anuncio in anuncios],
+            [anuncio['preco'] for anuncio in anuncios],
+            score_minimo=12,
+            score_preco_minimo=7
+        )
+        
+        for indice, pontuacao in pontuacoes:
+            anuncio = anuncios[indice]
+            anuncio.update(pontuacao)
+            candidatos.append(anuncio)
+        
+        registrar_scores('americanas', candidatos)
         return sorted(candidatos, key=lambda x: x['score_total'], reverse=True)
     
     def definir_nivel_alerta_americanas(self, score_total):
         """Define nível de alerta para Americanas"""
-        if score_total >= 45:
-            return "🚨 ALERTA MÁXIMO"
-        elif score_total >= 35:
-            return "⚠️ ALERTA ALTO"
-        elif score_total >= 25:
-            return "⚠️ ALERTA MÉDIO"
-        else:
-            return "ℹ️ MONITORAR"
+        return self.perfil.nivel_alerta(score_total)
     
     def calcular_probabilidade(self, score_total):
         """Calcula probabilidade em % de ser o notebook"""
-        if score_total >= 50:
-            return "95%+"
-        elif score_total >= 40:
-            return "80-95%"
-        elif score_total >= 30:
-            return "60-80%"
-        elif score_total >= 20:
-            return "40-60%"
-        else:
-            return "< 40%"
+        return self.perfil.probabilidade(score_total)
     
     def salvar_resultados_americanas(self, candidatos):
-        """Salva resultados em arquivo JSON"""
+        """Salva resultados no banco de resultados"""
         if not candidatos:
             return None
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_dir = os.path.expanduser("~/monitor_asus_rog")
-        filename = f"{base_dir}/resultados/americanas_candidatos_{timestamp}.json"
-        
-        os.makedirs(f"{base_dir}/resultados", exist_ok=True)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(candidatos, f, indent=2, ensure_ascii=False)
         
-        return filename
+        return salvar_execucao('americanas', candidatos)
 
 # Execução principal
 if __name__ == "__main__":
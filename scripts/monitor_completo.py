@@ -1,20 +1,75 @@
 #!/usr/bin/env python3
 # monitor_completo.py - Executa todos os monitoramentos
 
-import subprocess
 import json
 import os
+import threading
+import time
+from concurrent.futures import Future, wait
 from datetime import datetime
+from itertools import chain
+
+from armazenamento import obter_armazenamento
+from monitor_asus_rog import MonitorASUSROG
+from monitor_olx import MonitorOLXEspecializado
+from monitor_shopee import MonitorShopeeEspecializado
+from monitor_magalu import MonitorMagazineLuizaEspecializado
+from monitor_enjoei import MonitorEnjoeiEspecializado
+from monitor_americanas import MonitorAmericanasEspecializado
+from monitor_casasbahia import MonitorCasasBahiaEspecializado
+from monitor_pontofrio import MonitorPontoFrioEspecializado
+from monitor_ebay import MonitorEbayEspecializado
+from top_k import SeletorTopK
+
+# (chave, nome, classe, método de busca, método de salvamento, emoji)
+SITES_MONITORAMENTO = [
+    ('mercadolivre', 'Mercado Livre', MonitorASUSROG, 'buscar_mercadolivre', 'salvar_resultados', '🛒'),
+    ('olx', 'OLX', MonitorOLXEspecializado, 'buscar_olx', 'salvar_resultados_olx', '🏪'),
+    ('shopee', 'Shopee', MonitorShopeeEspecializado, 'buscar_shopee', 'salvar_resultados_shopee', '🛍️'),
+    ('magalu', 'Magazine Luiza', MonitorMagazineLuizaEspecializado, 'buscar_magalu', 'salvar_resultados_magalu', '🏬'),
+    ('enjoei', 'Enjoei', MonitorEnjoeiEspecializado, 'buscar_enjoei', 'salvar_resultados_enjoei', '♻️'),
+    ('americanas', 'Americanas', MonitorAmericanasEspecializado, 'buscar_americanas', 'salvar_resultados_americanas', '🇺🇸'),
+    ('casasbahia', 'Casas Bahia', MonitorCasasBahiaEspecializado, 'buscar_casasbahia', 'salvar_resultados_casasbahia', '🏠'),
+    ('pontofrio', 'Ponto Frio', MonitorPontoFrioEspecializado, 'buscar_pontofrio', 'salvar_resultados_pontofrio', '❄️'),
+    ('ebay', 'eBay', MonitorEbayEspecializado, 'buscar_ebay', 'salvar_resultados_ebay', '🌎')
+]
 
 class MonitorCompleto:
-    def __init__(self):
+    def __init__(self, max_workers=None, timeout_total=180):
         self.base_dir = os.path.expanduser("~/monitor_asus_rog")
-        self.scripts_dir = f"{self.base_dir}/scripts"
+        self.timeout_total = timeout_total
+        
+        self.sites_monitoramento = SITES_MONITORAMENTO
+        
+        # Um worker por site por padrão: a varredura dura o tempo do site mais lento
+        self.max_workers = max_workers or len(self.sites_monitoramento)
+    
+    def executar_site(self, nome_site, classe_monitor, metodo_busca, metodo_salvar):
+        """Executa o monitor de um site no próprio processo e retorna os candidatos"""
+        monitor = classe_monitor()
+        candidatos = getattr(monitor, metodo_busca)()
+        
+        if candidatos:
+            getattr(monitor, metodo_salvar)(candidatos)
+        
+        return candidatos
+    
+    def executar_em_thread(self, limite, futuro, *argumentos):
+        """Executa um site e entrega o resultado no futuro; roda numa thread daemon, que não segura a saída do processo"""
+        with limite:
+            # Site que estourou o timeout ainda na fila por um worker nem começa
+            if not futuro.set_running_or_notify_cancel():
+                return
+            try:
+                futuro.set_result(self.executar_site(*argumentos))
+            except Exception as e:
+                futuro.set_exception(e)
     
     def executar_monitoramento_completo(self):
-        """Executa todos os scripts de monitoramento"""
+        """Executa todos os monitores em paralelo num pool limitado de workers"""
         print("🚀 === MONITORAMENTO COMPLETO INICIADO ===")
         print(f"⏰ {datetime.now()}")
+        inicio = time.monotonic()
         
         resultados = {
             'timestamp': datetime.now().isoformat(),
@@ -32,62 +87,53 @@ class MonitorCompleto:
             'alertas_maximos': 0
         }
         
-        sites_monitoramento = [
-            ('Mercado Livre', 'monitor_asus_rog.py', 'candidatos_', '🛒'),
-            ('OLX', 'monitor_olx.py', 'olx_candidatos_', '🏪'),
-            ('Shopee', 'monitor_shopee.py', 'shopee_candidatos_', '🛍️'),
-            ('Magazine Luiza', 'monitor_magalu.py', 'magalu_candidatos_', '🏬'),
-            ('Enjoei', 'monitor_enjoei.py', 'enjoei_candidatos_', '♻️'),
-            ('Americanas', 'monitor_americanas.py', 'americanas_candidatos_', '🇺🇸'),
-            ('Casas Bahia', 'monitor_casasbahia.py', 'casasbahia_candidatos_', '🏠'),
-            ('Ponto Frio', 'monitor_pontofrio.py', 'pontofrio_candidatos_', '❄️'),
-            ('eBay', 'monitor_ebay.py', 'ebay_candidatos_', '🌎')
-        ]
-        
-        for nome_site, script, prefixo_arquivo, emoji in sites_monitoramento:
-            print(f"\n{emoji} Executando monitoramento {nome_site}...")
+        # Threads daemon em vez de um ThreadPoolExecutor: o pool é aguardado na saída do interpretador,
+        # e um site travado seguraria a execução para sempre; estas são abandonadas no timeout
+        limite = threading.BoundedSemaphore(self.max_workers)
+        futuros = {}
+        
+        for chave, nome_site, classe_monitor, metodo_busca, metodo_salvar, emoji in self.sites_monitoramento:
+            print(f"{emoji} Iniciando monitoramento {nome_site}...")
+            futuro = Future()
+            threading.Thread(
+                target=self.executar_em_thread,
+                args=(limite, futuro, nome_site, classe_monitor, metodo_busca, metodo_salvar),
+                name=f"monitor-{chave}",
+                daemon=True
+            ).start()
+            futuros[futuro] = (chave, nome_site, emoji)
+        
+        concluidos, pendentes = wait(futuros, timeout=self.timeout_total)
+        
+        for futuro in concluidos:
+            chave, nome_site, emoji = futuros[futuro]
             try:
-                result = subprocess.run(
-                    ['python3', f"{self.scripts_dir}/{script}"],
-                    capture_output=True, text=True, timeout=180
-                )
-                if result.returncode == 0:
-                    print(f"✅ {nome_site} concluído")
-                    chave = nome_site.lower().replace(' ', '').replace('é', 'e')
-                    if chave == 'mercadolivre':
-                        chave = 'mercadolivre'
-                    elif chave == 'magazineluiza':
-                        chave = 'magalu'
-                    resultados[chave] = self.carregar_ultimos_resultados(prefixo_arquivo)
-                else:
-                    print(f"❌ Erro {nome_site}: {result.stderr}")
+                resultados[chave] = futuro.result() or []
+                print(f"✅ {nome_site} concluído ({len(resultados[chave])} candidatos)")
             except Exception as e:
                 print(f"❌ Erro execução {nome_site}: {e}")
         
+        for futuro in pendentes:
+            chave, nome_site, emoji = futuros[futuro]
+            # O site é abandonado: o relatório sai sem ele e a thread morre com o processo
+            futuro.cancel()
+            print(f"❌ Timeout {nome_site}: sem resposta em {self.timeout_total}s (abandonado)")
+        
+        print(f"\n⏱️ Varredura concluída em {time.monotonic() - inicio:.1f}s")
+        
         # Análise consolidada
         self.gerar_relatorio_consolidado(resultados)
         
         return resultados
     
-    def carregar_ultimos_resultados(self, prefixo):
-        """Carrega os últimos resultados de um tipo específico"""
-        import glob
-        
-        pattern = f"{self.base_dir}/resultados/{prefixo}*.json"
-        arquivos = sorted(glob.glob(pattern), reverse=True)
-        
-        if arquivos:
-            try:
-                with open(arquivos[0], 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+    def carregar_ultimos_resultados(self, site):
+        """Carrega os candidatos da última execução de um site"""
+        return obter_armazenamento().ultimos_resultados(site)
     
     def gerar_relatorio_consolidado(self, resultados):
         """Gera relatório consolidado de todos os sites"""
-        # Coletar candidatos de todos os sites
-        todos_candidatos = []
+        # Contar candidatos de todos os sites (o top 10 é escolhido em fluxo, sem juntar listas)
+        total_candidatos = 0
         total_alertas = 0
         
         sites_dados = {
@@ -104,12 +150,10 @@ class MonitorCompleto:
         
         for site_key, (nome_site, threshold) in sites_dados.items():
             candidatos = resultados.get(site_key, [])
-            todos_candidatos.extend(candidatos)
+            total_candidatos += len(candidatos)
             alertas_site = len([c for c in candidatos if c.get('score_total', 0) >= threshold])
             total_alertas += alertas_site
         
-        total_candidatos = len(todos_candidatos)
-        
         # Gerar relatório
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         relatorio_file = f"{self.base_dir}/resultados/relatorio_consolidado_{timestamp}.json"
@@ -130,7 +174,9 @@ class MonitorCompleto:
                 'alertas_maximos_total': total_alertas,
                 **alertas_por_site
             },
-            'top_candidatos': self.obter_top_candidatos_todos(todos_candidatos),
+            'top_candidatos': self.obter_top_candidatos_todos(
+                chain.from_iterable(resultados.get(site_key, []) for site_key in sites_dados)
+            ),
             'detalhes': resultados
         }
         
@@ -141,33 +187,29 @@ class MonitorCompleto:
         return relatorio_file
     
     def obter_top_candidatos_todos(self, todos_candidatos):
-        """Obtém os top 10 candidatos de todos os sites"""
-        # Adicionar origem se não existir
+        """Obtém os top 10 candidatos de todos os sites (aceita qualquer iterável)"""
+        seletor = SeletorTopK(10)
         for candidato in todos_candidatos:
+            # Adicionar origem se não existir
             if 'origem' not in candidato:
                 candidato['origem'] = candidato.get('site', 'Desconhecido')
+            seletor.adicionar(candidato)
         
-        # Ordenar por score total
-        todos_candidatos.sort(key=lambda x: x.get('score_total', 0), reverse=True)
-        
-        return todos_candidatos[:10]
+        return seletor.resultado()
     
     def obter_top_candidatos(self, ml_candidatos, olx_candidatos):
         """Obtém os top 10 candidatos de todos os sites (método legado)"""
-        todos_candidatos = []
+        seletor = SeletorTopK(10)
         
         for candidato in ml_candidatos:
             candidato['origem'] = 'Mercado Livre'
-            todos_candidatos.append(candidato)
+            seletor.adicionar(candidato)
         
         for candidato in olx_candidatos:
             candidato['origem'] = 'OLX'
-            todos_candidatos.append(candidato)
-        
-        # Ordenar por score total
-        todos_candidatos.sort(key=lambda x: x.get('score_total', 0), reverse=True)
+            seletor.adicionar(candidato)
         
-        return todos_candidatos[:10]
+        return seletor.resultado()
     
     def imprimir_resumo(self, relatorio):
         """Imprime resumo do monitoramento"""
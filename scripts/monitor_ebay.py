@@ -1,64 +1,58 @@
 #!/usr/bin/env python3
 # monitor_ebay.py - Monitoramento específico para eBay Brasil
 
-import requests
-import json
 import re
 from datetime import datetime
-import time
-import os
-from bs4 import BeautifulSoup
+
+from armazenamento import salvar_execucao
+from deduplicacao import deduplicar
+from enriquecimento import enriquecer
+from indice_vistos import filtrar_novos, registrar_scores
+from parser_html import criar_soup
+from perfis_score import obter_perfil
+from score_lote import pontuar_lote
+from varredura_paginada import varrer_paginas
 
 class MonitorEbayEspecializado:
     def __init__(self):
-        self.caracteristicas_unicas = [
-            "anime matrix", "mini led", "240hz", "2560x1600", 
-            "gu604", "2023", "tampa animada", "led matrix",
-            "nebula hdr", "rog intelligent cooling", "rtx 4070",
-            "rtx 4080", "ryzen 9", "ddr5", "32gb", "1tb ssd",
-            "dolby vision", "wifi 6e", "thunderbolt 4", "qhd", 
-            "16 polegadas", "zephyrus m16", "rog zephyrus",
-            "gaming laptop", "keystone ii"
-        ]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
     
+    @property
+    def perfil(self):
+        """Perfil de score do site, montado a partir do config.json"""
+        return obter_perfil('ebay')
+    
     def buscar_ebay(self):
         """Busca anúncios no eBay Brasil"""
-        resultados_todos = []
         termos = ["ASUS ROG Zephyrus M16", "ROG M16 AniMe Matrix", "Zephyrus GU604"]
         
+        # eBay Brasil - usar busca web
+        url = "https://www.ebay.com/sch/i.html"
+        requisicoes = []
         for termo in termos:
             print(f"🔍 Buscando eBay Brasil: '{termo}'")
-            
-            # eBay Brasil - usar busca web
-            url = "https://www.ebay.com/sch/i.html"
             params = {
                 '_nkw': termo,
                 '_sacat': '0',
                 'LH_PrefLoc': '3',  # Brasil
                 '_sop': '10'  # Recentes primeiro
             }
-            
-            try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=15)
-                if response.status_code == 200:
-                    anuncios = self.extrair_anuncios_ebay(response.text, termo)
-                    resultados_todos.extend(anuncios)
-                
-                time.sleep(4)  # eBay pode ser mais sensível
-            except Exception as e:
-                print(f"❌ Erro: {e}")
+            requisicoes.append({'url': url, 'params': params, 'timeout': 15})
         
-        return self.filtrar_candidatos_ebay(resultados_todos)
+        # Páginas seguintes pelo parâmetro '_pgn', com a varredura profunda ligada
+        resultados_todos = varrer_paginas('ebay', termos, requisicoes, self.headers, self.extrair_anuncios_ebay, '_pgn')
+        
+        # O mesmo anúncio aparece em vários termos: pontua uma vez só
+        return self.filtrar_candidatos_ebay(deduplicar('ebay', resultados_todos))
     
     def extrair_anuncios_ebay(self, html, termo_busca):
         """Extrai anúncios do HTML do eBay"""
         anuncios = []
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = criar_soup(html, 'ebay')
             
             # eBay usa estrutura específica
             containers = (soup.find_all('div', class_=re.compile(r's-item')) or
@@ -129,116 +123,53 @@ class MonitorEbayEspecializado:
     
     def calcular_score_ebay(self, titulo, localizacao=""):
         """Calcula score para eBay"""
-        texto = (titulo + " " + localizacao).lower()
-        score = 0
-        caracteristicas = []
-        
-        # Pontuação especial para itens no Brasil
-        if any(local in texto for local in ['brasil', 'brazil', 'são paulo', 'rio de janeiro']):
-            score += 5
-            caracteristicas.append("🇧🇷 Brasil")
-        
-        if "anime matrix" in texto:
-            score += 15
-            caracteristicas.append("🎯 AniMe Matrix")
-        if "gu604" in texto:
-            score += 15
-            caracteristicas.append("🎯 GU604")
-        if "mini led" in texto:
-            score += 12
-            caracteristicas.append("🎯 Mini LED")
-        if "240hz" in texto:
-            score += 8
-            caracteristicas.append("⭐ 240Hz")
-        if "zephyrus m16" in texto:
-            score += 12
-            caracteristicas.append("🎯 Zephyrus M16")
-        if "asus" in texto and "rog" in texto:
-            score += 8
-            caracteristicas.append("✓ ASUS ROG")
-        
-        return score, caracteristicas
+        return self.perfil.pontuar(titulo + " " + localizacao)
     
     def analisar_suspeita_preco_ebay(self, preco):
         """Análise de preço para eBay (considerando importação)"""
-        if preco < 3000:
-            return "🚨 EXTREMAMENTE SUSPEITO", 15  # Muito baixo mesmo com importação
-        elif preco < 5000:
-            return "🚨 MUITO SUSPEITO", 12
-        elif preco < 8000:
-            return "⚠️ SUSPEITO", 8
-        elif preco < 12000:
-            return "💰 PREÇO BAIXO", 4
-        elif preco < 20000:
-            return "💰 PREÇO NORMAL IMPORTADO", 2
-        else:
-            return "💰 PREÇO ALTO", 0
+        return self.perfil.analisar_preco(preco)
     
     def filtrar_candidatos_ebay(self, anuncios):
         """Filtra candidatos do eBay"""
         candidatos = []
         
-        for anuncio in anuncios:
-            score, caracteristicas = self.calcular_score_ebay(anuncio['titulo'], anuncio.get('localizacao', ''))
-            preco = anuncio['preco']
-            suspeita_preco, score_preco = self.analisar_suspeita_preco_ebay(preco)
-            
-            score_total = score + score_preco
-            
-            if score >= 10 or score_preco >= 8:  # Threshold menor para eBay
-                anuncio.update({
-                    'score_similaridade': score,
-                    'score_preco': score_preco,
-                    'score_total': score_total,
-                    'caracteristicas_encontradas': caracteristicas,
-                    'suspeita_preco': suspeita_preco,
-                    'nivel_alerta': self.definir_nivel_alerta(score_total),
-                    'probabilidade_match': self.calcular_probabilidade(score_total),
-                    'observacao': 'MERCADO INTERNACIONAL - Verificar localização'
-                })
-                candidatos.append(anuncio)
+        # Só anúncios novos ou alterados desde a última varredura são pontuados
+        anuncios = filtrar_novos('ebay', anuncios)
+        
+        # Pontuação e filtro de score feitos de uma vez sobre todos os anúncios
+        pontuacoes = pontuar_lote(
+            self.perfil,
+            [anuncio['titulo'] + " " + anuncio.get('localizacao', '') for anuncio in anuncios],
+            [anuncio['preco'] for anuncio in anuncios],
+            score_minimo=10,  # Threshold menor para eBay
+            score_preco_minimo=8
+        )
+        
+        for indice, pontuacao in pontuacoes:
+            anuncio = anuncios[indice]
+            anuncio.update(pontuacao)
+            anuncio['observacao'] = 'MERCADO INTERNACIONAL - Verificar localização'
+            candidatos.append(anuncio)
         
+        # Os melhores têm a página do anúncio buscada e são repontuados com a descrição
+        candidatos = enriquecer('ebay', candidatos, self.perfil, self.headers)
+        registrar_scores('ebay', candidatos)
         return sorted(candidatos, key=lambda x: x['score_total'], reverse=True)
     
     def definir_nivel_alerta(self, score_total):
         """Define nível de alerta"""
-        if score_total >= 45:
-            return "🚨 ALERTA MÁXIMO - EBAY"
-        elif score_total >= 35:
-            return "⚠️ ALERTA ALTO - EBAY"
-        elif score_total >= 25:
-            return "⚠️ ALERTA MÉDIO - EBAY"
-        else:
-            return "ℹ️ MONITORAR - EBAY"
+        return self.perfil.nivel_alerta(score_total)
     
     def calcular_probabilidade(self, score_total):
         """Calcula probabilidade"""
-        if score_total >= 50:
-            return "90%+"
-        elif score_total >= 40:
-            return "75-90%"
-        elif score_total >= 30:
-            return "50-75%"
-        elif score_total >= 20:
-            return "25-50%"
-        else:
-            return "< 25%"
+        return self.perfil.probabilidade(score_total)
     
     def salvar_resultados_ebay(self, candidatos):
         """Salva resultados"""
         if not candidatos:
             return None
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_dir = os.path.expanduser("~/monitor_asus_rog")
-        filename = f"{base_dir}/resultados/ebay_candidatos_{timestamp}.json"
-        
-        os.makedirs(f"{base_dir}/resultados", exist_ok=True)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(candidatos, f, indent=2, ensure_ascii=False)
         
-        return filename
+        return salvar_execucao('ebay', candidatos)
 
 # Execução principal
 if __name__ == "__main__":
@@ -1,27 +1,22 @@
 #!/usr/bin/env python3
 # monitor_enjoei.py - Monitoramento específico para Enjoei (usados)
 
-import requests
-import json
 import re
 from datetime import datetime
-import time
-import os
-from bs4 import BeautifulSoup
+
+from armazenamento import salvar_execucao
+from deduplicacao import deduplicar
+from enriquecimento import enriquecer
+from indice_vistos import filtrar_novos, registrar_scores
+from parser_html import criar_soup
+from perfis_score import obter_perfil
+from score_lote import pontuar_lote
+from varredura_paginada import varrer_paginas
 
 class MonitorEnjoeiEspecializado:
     def __init__(self):
         self.modelo_principal = "ASUS ROG Zephyrus M16"
         self.codigo_modelo = "GU604"
-        self.caracteristicas_unicas = [
-            "anime matrix", "mini led", "240hz", "2560x1600", 
-            "gu604", "2023", "tampa animada", "led matrix",
-            "nebula hdr", "rog intelligent cooling", "rtx 4070",
-            "rtx 4080", "ryzen 9", "ddr5", "32gb", "1tb ssd",
-            "dolby vision", "wifi 6e", "thunderbolt 4", "qhd", 
-            "16 polegadas", "zephyrus m16", "rog zephyrus",
-            "gaming laptop", "keystone ii"
-        ]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -30,6 +25,11 @@ class MonitorEnjoeiEspecializado:
             'Connection': 'keep-alive'
         }
     
+    @property
+    def perfil(self):
+        """Perfil de score do site, montado a partir do config.json"""
+        return obter_perfil('enjoei')
+    
     def gerar_termos_enjoei(self):
         """Termos específicos para busca no Enjoei"""
         return [
@@ -44,40 +44,34 @@ class MonitorEnjoeiEspecializado:
     
     def buscar_enjoei(self):
         """Busca anúncios no Enjoei"""
-        resultados_todos = []
+        termos = self.gerar_termos_enjoei()
         
-        for termo in self.gerar_termos_enjoei():
+        # URL do Enjoei para busca
+        url = "https://www.enjoei.com.br/busca"
+        requisicoes = []
+        for termo in termos:
             print(f"🔍 Buscando Enjoei: '{termo}'")
-            
-            # URL do Enjoei para busca
-            url = "https://www.enjoei.com.br/busca"
             params = {
                 'q': termo,
                 'ordenacao': 'recentes'
             }
-            
-            try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=15)
-                
-                if response.status_code == 200:
-                    anuncios = self.extrair_anuncios_enjoei(response.text, termo)
-                    resultados_todos.extend(anuncios)
-                else:
-                    print(f"❌ Erro HTTP {response.status_code} para '{termo}'")
-                
-                time.sleep(4)  # Enjoei pode ser sensível a muitas requests
-                
-            except Exception as e:
-                print(f"❌ Erro na busca Enjoei '{termo}': {e}")
+            requisicoes.append({'url': url, 'params': params, 'timeout': 15})
+        
+        # Requisições em paralelo; o espaçamento por host fica a cargo da camada de busca.
+        # Com a varredura profunda ligada, segue para as próximas páginas (parâmetro 'page') enquanto houver inéditos
+        resultados_todos = varrer_paginas('enjoei', termos, requisicoes, self.headers, self.extrair_anuncios_enjoei, 'page')
         
-        return self.filtrar_candidatos_enjoei(resultados_todos)
+        # O mesmo anúncio aparece em vários termos: pontua uma vez só
+        return self.filtrar_candidatos_enjoei(deduplicar('enjoei', resultados_todos))
     
     def extrair_anuncios_enjoei(self, html, termo_busca):
         """Extrai anúncios do HTML do Enjoei"""
         anuncios = []
+        soup = None
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            # Um único parse por página: o método alternativo reaproveita esta árvore
+            soup = criar_soup(html, 'enjoei')
             
             # Enjoei usa estrutura específica para produtos
             containers = (soup.find_all('div', class_=re.compile(r'product|item')) or
@@ -129,19 +123,17 @@ class MonitorEnjoeiEspecializado:
         except Exception as e:
             print(f"❌ Erro ao processar HTML Enjoei: {e}")
             
-        # Se não conseguir pelo scraping normal, tentar método alternativo
-        if not anuncios:
-            anuncios = self.metodo_alternativo_enjoei(html, termo_busca)
+        # Se não conseguir pelo scraping normal, tentar método alternativo na mesma árvore
+        if not anuncios and soup is not None:
+            anuncios = self.metodo_alternativo_enjoei(soup, termo_busca)
         
         return anuncios
     
-    def metodo_alternativo_enjoei(self, html, termo_busca):
+    def metodo_alternativo_enjoei(self, soup, termo_busca):
         """Método alternativo para extrair dados do Enjoei"""
         anuncios = []
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
             # Procurar por elementos com estrutura alternativa do Enjoei
             produtos = soup.find_all('div', {'data-testid': re.compile(r'product')})
             
@@ -201,136 +193,53 @@ class MonitorEnjoeiEspecializado:
     
     def calcular_score_enjoei(self, titulo, descricao=""):
         """Calcula score específico para Enjoei (usados)"""
-        texto_completo = (titulo + " " + descricao).lower()
-        score = 0
-        caracteristicas_encontradas = []
-        
-        # Características super específicas - PESO MAIOR para usados
-        if "anime matrix" in texto_completo:
-            score += 20  # Peso maior - muito específico para usados
-            caracteristicas_encontradas.append("🎯 AniMe Matrix")
-        
-        if "gu604" in texto_completo:
-            score += 20  # Peso maior - código específico
-            caracteristicas_encontradas.append("🎯 GU604")
-        
-        if "mini led" in texto_completo:
-            score += 15  # Característica única
-            caracteristicas_encontradas.append("🎯 Mini LED")
-        
-        # Características importantes
-        if "240hz" in texto_completo:
-            score += 10
-            caracteristicas_encontradas.append("⭐ 240Hz")
-        
-        if "2560x1600" in texto_completo or "2560 x 1600" in texto_completo:
-            score += 10
-            caracteristicas_encontradas.append("⭐ Resolução")
-        
-        if "2023" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("⭐ 2023")
-        
-        # Modelo e marca
-        if "zephyrus m16" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 Zephyrus M16")
-        
-        if "asus" in texto_completo and "rog" in texto_completo:
-            score += 10
-            caracteristicas_encontradas.append("✓ ASUS ROG")
-        
-        # Penalizações para termos suspeitos em usados
-        if any(termo in texto_completo for termo in ['novo', 'lacrado', 'nunca usado']):
-            score -= 5  # Suspeito se está "novo" sendo vendido como usado
-            caracteristicas_encontradas.append("⚠️ Anunciado como 'novo'")
-        
-        return score, caracteristicas_encontradas
+        return self.perfil.pontuar(titulo + " " + descricao)
     
     def analisar_suspeita_preco_enjoei(self, preco):
         """Análise específica de preço para Enjoei (mercado de usados)"""
-        # Preços mais baixos são esperados em usados, mas ainda assim suspeitos se muito baixos
-        if preco < 1000:
-            return "🚨 EXTREMAMENTE SUSPEITO", 15  # Peso maior para muito baixo
-        elif preco < 2500:
-            return "🚨 MUITO SUSPEITO", 12
-        elif preco < 4500:
-            return "⚠️ SUSPEITO", 8
-        elif preco < 7000:
-            return "⚠️ PREÇO BAIXO PARA USADO", 5
-        elif preco < 9000:
-            return "💰 PREÇO RAZOÁVEL USADO", 2
-        else:
-            return "💰 PREÇO ALTO PARA USADO", 0
+        return self.perfil.analisar_preco(preco)
     
     def filtrar_candidatos_enjoei(self, anuncios):
         """Filtra e pontua candidatos do Enjoei"""
         candidatos = []
         
-        for anuncio in anuncios:
-            score, caracteristicas = self.calcular_score_enjoei(anuncio['titulo'])
-            preco = anuncio['preco']
-            suspeita_preco, score_preco = self.analisar_suspeita_preco_enjoei(preco)
-            
-            score_total = score + score_preco
-            
-            # Filtro: Enjoei é crítico para usados, então threshold menor
-            if score >= 10 or score_preco >= 8:
-                anuncio.update({
-                    'score_similaridade': score,
-                    'score_preco': score_preco,
-                    'score_total': score_total,
-                    'caracteristicas_encontradas': caracteristicas,
-                    'suspeita_preco': suspeita_preco,
-                    'nivel_alerta': self.definir_nivel_alerta_enjoei(score_total),
-                    'probabilidade_match': self.calcular_probabilidade(score_total),
-                    'observacao': 'MERCADO DE USADOS - ALTA PRIORIDADE'
-                })
-                candidatos.append(anuncio)
+        # Só anúncios novos ou alterados desde a última varredura são pontuados
+        anuncios = filtrar_novos('enjoei', anuncios)
+        
+        # Filtro: Enjoei é crítico para usados, então threshold menor
+        pontuacoes = pontuar_lote(
+            self.perfil,
+            [anuncio['titulo'] for anuncio in anuncios],
+            [anuncio['preco'] for anuncio in anuncios],
+            score_minimo=10,
+            score_preco_minimo=8
+        )
+        
+        for indice, pontuacao in pontuacoes:
+            anuncio = anuncios[indice]
+            anuncio.update(pontuacao)
+            anuncio['observacao'] = 'MERCADO DE USADOS - ALTA PRIORIDADE'
+            candidatos.append(anuncio)
         
+        # Os melhores têm a página do anúncio buscada e são repontuados com a descrição
+        candidatos = enriquecer('enjoei', candidatos, self.perfil, self.headers)
+        registrar_scores('enjoei', candidatos)
         return sorted(candidatos, key=lambda x: x['score_total'], reverse=True)
     
     def definir_nivel_alerta_enjoei(self, score_total):
         """Define nível de alerta para Enjoei"""
-        if score_total >= 50:
-            return "🚨 ALERTA MÁXIMO - ENJOEI"
-        elif score_total >= 40:
-            return "🚨 ALERTA CRÍTICO - ENJOEI"
-        elif score_total >= 30:
-            return "⚠️ ALERTA ALTO - ENJOEI"
-        elif score_total >= 20:
-            return "⚠️ ALERTA MÉDIO - ENJOEI"
-        else:
-            return "ℹ️ MONITORAR - ENJOEI"
+        return self.perfil.nivel_alerta(score_total)
     
     def calcular_probabilidade(self, score_total):
         """Calcula probabilidade em % de ser o notebook"""
-        if score_total >= 55:
-            return "98%+"
-        elif score_total >= 45:
-            return "90-98%"
-        elif score_total >= 35:
-            return "75-90%"
-        elif score_total >= 25:
-            return "50-75%"
-        else:
-            return "< 50%"
+        return self.perfil.probabilidade(score_total)
     
     def salvar_resultados_enjoei(self, candidatos):
-        """Salva resultados em arquivo JSON"""
+        """Salva resultados no banco de resultados"""
         if not candidatos:
             return None
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_dir = os.path.expanduser("~/monitor_asus_rog")
-        filename = f"{base_dir}/resultados/enjoei_candidatos_{timestamp}.json"
-        
-        os.makedirs(f"{base_dir}/resultados", exist_ok=True)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(candidatos, f, indent=2, ensure_ascii=False)
         
-        return filename
+        return salvar_execucao('enjoei', candidatos)
 
 # Execução principal
 if __name__ == "__main__":
@@ -1,27 +1,22 @@
 #!/usr/bin/env python3
 # monitor_magalu.py - Monitoramento específico para Magazine Luiza
 
-import requests
-import json
 import re
 from datetime import datetime
-import time
-import os
-from bs4 import BeautifulSoup
+
+from armazenamento import salvar_execucao
+from busca_assincrona import fetch_many
+from deduplicacao import deduplicar
+from extracoes import extrair_pagina
+from indice_vistos import filtrar_novos, registrar_scores
+from parser_html import criar_soup, scripts_json, scripts_json_rapido
+from perfis_score import obter_perfil
+from score_lote import pontuar_lote
 
 class MonitorMagazineLuizaEspecializado:
     def __init__(self):
         self.modelo_principal = "ASUS ROG Zephyrus M16"
         self.codigo_modelo = "GU604"
-        self.caracteristicas_unicas = [
-            "anime matrix", "mini led", "240hz", "2560x1600", 
-            "gu604", "2023", "tampa animada", "led matrix",
-            "nebula hdr", "rog intelligent cooling", "rtx 4070",
-            "rtx 4080", "ryzen 9", "ddr5", "32gb", "1tb ssd",
-            "dolby vision", "wifi 6e", "thunderbolt 4", "qhd", 
-            "16 polegadas", "zephyrus m16", "rog zephyrus",
-            "gaming laptop", "keystone ii"
-        ]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -30,6 +25,11 @@ class MonitorMagazineLuizaEspecializado:
             'Connection': 'keep-alive'
         }
     
+    @property
+    def perfil(self):
+        """Perfil de score do site, montado a partir do config.json"""
+        return obter_perfil('magalu')
+    
     def gerar_termos_magalu(self):
         """Termos específicos para busca no Magazine Luiza"""
         return [
@@ -44,39 +44,46 @@ class MonitorMagazineLuizaEspecializado:
     def buscar_magalu(self):
         """Busca anúncios no Magazine Luiza"""
         resultados_todos = []
+        termos = self.gerar_termos_magalu()
         
-        for termo in self.gerar_termos_magalu():
+        # URL da Magazine Luiza para busca
+        url = "https://www.magazineluiza.com.br/busca"
+        requisicoes = []
+        for termo in termos:
             print(f"🔍 Buscando Magazine Luiza: '{termo}'")
-            
-            # URL da Magazine Luiza para busca
-            url = "https://www.magazineluiza.com.br/busca"
             params = {
                 'q': termo,
                 'sortBy': 'relevance'
             }
-            
-            try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=15)
-                
-                if response.status_code == 200:
-                    anuncios = self.extrair_anuncios_magalu(response.text, termo)
-                    resultados_todos.extend(anuncios)
-                else:
-                    print(f"❌ Erro HTTP {response.status_code} para '{termo}'")
-                
-                time.sleep(3)  # Respeitar rate limit
-                
-            except Exception as e:
-                print(f"❌ Erro na busca Magazine Luiza '{termo}': {e}")
+            requisicoes.append({'url': url, 'params': params, 'timeout': 15})
         
-        return self.filtrar_candidatos_magalu(resultados_todos)
+        # Requisições em paralelo; o espaçamento por host fica a cargo da camada de busca
+        respostas = fetch_many('magalu', requisicoes, headers=self.headers)
+        
+        for termo, response in zip(termos, respostas):
+            if isinstance(response, Exception):
+                print(f"❌ Erro na busca Magazine Luiza '{termo}': {response}")
+            elif response.status_code == 200:
+                anuncios = extrair_pagina('magalu', response, self.extrair_anuncios_magalu, termo)
+                resultados_todos.extend(anuncios)
+            else:
+                print(f"❌ Erro HTTP {response.status_code} para '{termo}'")
+        
+        # O mesmo anúncio aparece em vários termos: pontua uma vez só
+        return self.filtrar_candidatos_magalu(deduplicar('magalu', resultados_todos))
     
     def extrair_anuncios_magalu(self, html, termo_busca):
         """Extrai anúncios do HTML do Magazine Luiza"""
-        anuncios = []
+        # Caminho rápido: produtos em ld+json são lidos sem montar a árvore HTML
+        anuncios = self.extrair_json_embutido_magalu(html, termo_busca)
+        if anuncios:
+            return anuncios
+        
+        soup = None
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            # Um único parse por página: o método alternativo reaproveita esta árvore
+            soup = criar_soup(html, 'magalu')
             
             # Magazine Luiza usa estrutura específica para produtos
             containers = (soup.find_all('li', {'data-testid': 'product-card'}) or
@@ -123,44 +130,59 @@ class MonitorMagazineLuizaEspecializado:
         except Exception as e:
             print(f"❌ Erro ao processar HTML Magazine Luiza: {e}")
             
-        # Se não conseguir pelo scraping normal, tentar método alternativo
-        if not anuncios:
-            anuncios = self.metodo_alternativo_magalu(html, termo_busca)
+        # Se não conseguir pelo scraping normal, tentar método alternativo na mesma árvore
+        if not anuncios and soup is not None:
+            anuncios = self.metodo_alternativo_magalu(soup, termo_busca)
+        
+        return anuncios
+    
+    def extrair_json_embutido_magalu(self, html, termo_busca):
+        """Lê os produtos dos blocos ld+json varrendo o HTML, sem BeautifulSoup"""
+        anuncios = []
+        
+        for data in scripts_json_rapido(html, 'application/ld+json'):
+            try:
+                anuncios.extend(self.anuncios_do_json_magalu(data, termo_busca))
+            except:
+                continue
+        
+        return anuncios
+    
+    def anuncios_do_json_magalu(self, data, termo_busca):
+        """Converte um bloco ld+json com itemListElement em anúncios"""
+        anuncios = []
+        
+        if isinstance(data, dict) and 'itemListElement' in data:
+            for item in data['itemListElement']:
+                produto = item.get('item', {})
+                titulo = produto.get('name', '')
+                
+                if titulo and any(word in titulo.lower() for word in ['asus', 'rog']):
+                    offers = produto.get('offers', {})
+                    preco = offers.get('price', 0)
+                    
+                    anuncio = {
+                        'titulo': titulo,
+                        'preco': float(preco) if preco else 0,
+                        'preco_str': f"R$ {preco}",
+                        'url': produto.get('url', ''),
+                        'site': 'Magazine Luiza',
+                        'termo_busca': termo_busca,
+                        'data_busca': datetime.now().isoformat()
+                    }
+                    anuncios.append(anuncio)
         
         return anuncios
     
-    def metodo_alternativo_magalu(self, html, termo_busca):
+    def metodo_alternativo_magalu(self, soup, termo_busca):
         """Método alternativo para extrair dados do Magazine Luiza"""
         anuncios = []
         
         try:
-            # Procurar por dados JSON embutidos na página
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Magazine Luiza pode usar scripts com dados JSON
-            scripts = soup.find_all('script', type='application/ld+json')
-            for script in scripts:
+            # Magazine Luiza pode usar scripts com dados JSON embutidos na página
+            for data in scripts_json(soup, 'application/ld+json'):
                 try:
-                    data = json.loads(script.get_text())
-                    if isinstance(data, dict) and 'itemListElement' in data:
-                        for item in data['itemListElement']:
-                            produto = item.get('item', {})
-                            titulo = produto.get('name', '')
-                            
-                            if titulo and any(word in titulo.lower() for word in ['asus', 'rog']):
-                                offers = produto.get('offers', {})
-                                preco = offers.get('price', 0)
-                                
-                                anuncio = {
-                                    'titulo': titulo,
-                                    'preco': float(preco) if preco else 0,
-                                    'preco_str': f"R$ {preco}",
-                                    'url': produto.get('url', ''),
-                                    'site': 'Magazine Luiza',
-                                    'termo_busca': termo_busca,
-                                    'data_busca': datetime.now().isoformat()
-                                }
-                                anuncios.append(anuncio)
+                    anuncios.extend(self.anuncios_do_json_magalu(data, termo_busca))
                 except:
                     continue
                     
@@ -225,125 +247,50 @@ class MonitorMagazineLuizaEspecializado:
     
     def calcular_score_magalu(self, titulo, descricao=""):
         """Calcula score específico para Magazine Luiza"""
-        texto_completo = (titulo + " " + descricao).lower()
-        score = 0
-        caracteristicas_encontradas = []
-        
-        # Características super específicas
-        if "anime matrix" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 AniMe Matrix")
-        
-        if "gu604" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 GU604")
-        
-        if "mini led" in texto_completo:
-            score += 12
-            caracteristicas_encontradas.append("🎯 Mini LED")
-        
-        # Características importantes
-        if "240hz" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("⭐ 240Hz")
-        
-        if "2560x1600" in texto_completo or "2560 x 1600" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("⭐ Resolução")
-        
-        if "2023" in texto_completo:
-            score += 6
-            caracteristicas_encontradas.append("⭐ 2023")
-        
-        # Modelo e marca
-        if "zephyrus m16" in texto_completo:
-            score += 12
-            caracteristicas_encontradas.append("🎯 Zephyrus M16")
-        
-        if "asus" in texto_completo and "rog" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("✓ ASUS ROG")
-        
-        return score, caracteristicas_encontradas
+        return self.perfil.pontuar(titulo + " " + descricao)
     
     def analisar_suspeita_preco_magalu(self, preco):
         """Análise específica de preço para Magazine Luiza"""
-        if preco < 2000:
-            return "🚨 EXTREMAMENTE SUSPEITO", 12
-        elif preco < 4000:
-            return "⚠️ MUITO SUSPEITO", 10
-        elif preco < 7000:
-            return "⚠️ SUSPEITO", 7
-        elif preco < 10000:
-            return "💰 PREÇO BAIXO", 4
-        else:
-            return "💰 PREÇO NORMAL", 0
+        return self.perfil.analisar_preco(preco)
     
     def filtrar_candidatos_magalu(self, anuncios):
         """Filtra e pontua candidatos do Magazine Luiza"""
         candidatos = []
         
-        for anuncio in anuncios:
-            score, caracteristicas = self.calcular_score_magalu(anuncio['titulo'])
-            preco = anuncio['preco']
-            suspeita_preco, score_preco = self.analisar_suspeita_preco_magalu(preco)
-            
-            score_total = score + score_preco
-            
-            # Filtro: só candidatos com score significativo
-            if score >= 12 or score_preco >= 7:
-                anuncio.update({
-                    'score_similaridade': score,
-                    'score_preco': score_preco,
-                    'score_total': score_total,
-                    'caracteristicas_encontradas': caracteristicas,
-                    'suspeita_preco': suspeita_preco,
-                    'nivel_alerta': self.definir_nivel_alerta_magalu(score_total),
-                    'probabilidade_match': self.calcular_probabilidade(score_total)
-                })
-                candidatos.append(anuncio)
+        # Só anúncios novos ou alterados desde a última varredura são pontuados
+        anuncios = filtrar_novos('magalu', anuncios)
+        
+        # Filtro: só candidatos com score significativo
+        pontuacoes = pontuar_lote(
+            self.perfil,
+            [anuncio['titulo'] for anuncio in anuncios],
+            [anuncio['preco'] for anuncio in anuncios],
+            score_minimo=12,
+            score_preco_minimo=7
+        )
         
+        for indice, pontuacao in pontuacoes:
+            anuncio = anuncios[indice]
+            anuncio.update(pontuacao)
+            candidatos.append(anuncio)
+        
+        registrar_scores('magalu', candidatos)
         return sorted(candidatos, key=lambda x: x['score_total'], reverse=True)
     
     def definir_nivel_alerta_magalu(self, score_total):
         """Define nível de alerta para Magazine Luiza"""
-        if score_total >= 45:
-            return "🚨 ALERTA MÁXIMO"
-        elif score_total >= 35:
-            return "⚠️ ALERTA ALTO"
-        elif score_total >= 25:
-            return "⚠️ ALERTA MÉDIO"
-        else:
-            return "ℹ️ MONITORAR"
+        return self.perfil.nivel_alerta(score_total)
     
     def calcular_probabilidade(self, score_total):
         """Calcula probabilidade em % de ser o notebook"""
-        if score_total >= 50:
-            return "95%+"
-        elif score_total >= 40:
-            return "80-95%"
-        elif score_total >= 30:
-            return "60-80%"
-        elif score_total >= 20:
-            return "40-60%"
-        else:
-            return "< 40%"
+        return self.perfil.probabilidade(score_total)
     
     def salvar_resultados_magalu(self, candidatos):
-        """Salva resultados em arquivo JSON"""
+        """Salva resultados no banco de resultados"""
         if not candidatos:
             return None
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_dir = os.path.expanduser("~/monitor_asus_rog")
-        filename = f"{base_dir}/resultados/magalu_candidatos_{timestamp}.json"
-        
-        os.makedirs(f"{base_dir}/resultados", exist_ok=True)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(candidatos, f, indent=2, ensure_ascii=False)
         
-        return filename
+        return salvar_execucao('magalu', candidatos)
 
 # Execução principal
 if __name__ == "__main__":
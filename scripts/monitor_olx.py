@@ -1,31 +1,31 @@
 #!/usr/bin/env python3
 # monitor_olx.py - Monitoramento específico para OLX
 
-import requests
-import json
 import re
 from datetime import datetime
-import time
-import os
-from bs4 import BeautifulSoup
+
+from armazenamento import salvar_execucao
+from deduplicacao import deduplicar
+from enriquecimento import enriquecer
+from indice_vistos import filtrar_novos, registrar_scores
+from parser_html import criar_soup
+from perfis_score import obter_perfil
+from score_lote import pontuar_lote
+from varredura_paginada import varrer_paginas
 
 class MonitorOLXEspecializado:
     def __init__(self):
         self.modelo_principal = "ASUS ROG Zephyrus M16"
         self.codigo_modelo = "GU604"
-        self.caracteristicas_unicas = [
-            "anime matrix", "mini led", "240hz", "2560x1600", 
-            "gu604", "2023", "tampa animada", "led matrix",
-            "nebula hdr", "rog intelligent cooling", "rtx 4070",
-            "rtx 4080", "ryzen 9", "ddr5", "32gb", "1tb ssd",
-            "dolby vision", "wifi 6e", "thunderbolt 4", "qhd", 
-            "16 polegadas", "zephyrus m16", "rog zephyrus",
-            "gaming laptop", "keystone ii"
-        ]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
     
+    @property
+    def perfil(self):
+        """Perfil de score do site, montado a partir do config.json"""
+        return obter_perfil('olx')
+    
     def gerar_termos_olx(self):
         """Termos específicos para busca na OLX"""
         return [
@@ -39,40 +39,32 @@ class MonitorOLXEspecializado:
     
     def buscar_olx(self):
         """Busca anúncios na OLX"""
-        resultados_todos = []
+        termos = self.gerar_termos_olx()
         
-        for termo in self.gerar_termos_olx():
+        # URL da OLX para notebooks
+        url = "https://www.olx.com.br/informatica/notebooks-netbooks"
+        requisicoes = []
+        for termo in termos:
             print(f"🔍 Buscando OLX: '{termo}'")
-            
-            # URL da OLX para notebooks
-            url = f"https://www.olx.com.br/informatica/notebooks-netbooks"
             params = {
                 'q': termo,
                 'sf': '1'  # Ordenar por mais recentes
             }
-            
-            try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=15)
-                
-                if response.status_code == 200:
-                    anuncios = self.extrair_anuncios_olx(response.text, termo)
-                    resultados_todos.extend(anuncios)
-                else:
-                    print(f"❌ Erro HTTP {response.status_code} para '{termo}'")
-                
-                time.sleep(3)  # Evitar bloqueio
-                
-            except Exception as e:
-                print(f"❌ Erro na busca OLX '{termo}': {e}")
+            requisicoes.append({'url': url, 'params': params, 'timeout': 15})
         
-        return self.filtrar_candidatos_olx(resultados_todos)
+        # Requisições em paralelo; o espaçamento por host fica a cargo da camada de busca.
+        # Com a varredura profunda ligada, segue para as próximas páginas (parâmetro 'o') enquanto houver inéditos
+        resultados_todos = varrer_paginas('olx', termos, requisicoes, self.headers, self.extrair_anuncios_olx, 'o')
+        
+        # O mesmo anúncio aparece em vários termos: pontua uma vez só
+        return self.filtrar_candidatos_olx(deduplicar('olx', resultados_todos))
     
     def extrair_anuncios_olx(self, html, termo_busca):
         """Extrai anúncios do HTML da OLX"""
         anuncios = []
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = criar_soup(html, 'olx')
             
             # Procurar por containers de anúncios (estrutura pode mudar)
             containers = soup.find_all('div', {'data-ds-component': True})
@@ -121,121 +113,52 @@ class MonitorOLXEspecializado:
     
     def calcular_score_olx(self, titulo, descricao=""):
         """Calcula score específico para OLX"""
-        texto_completo = (titulo + " " + descricao).lower()
-        score = 0
-        caracteristicas_encontradas = []
-        
-        # Características super específicas
-        if "anime matrix" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 AniMe Matrix")
-        
-        if "gu604" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 GU604")
-        
-        if "mini led" in texto_completo:
-            score += 12
-            caracteristicas_encontradas.append("🎯 Mini LED")
-        
-        # Características importantes
-        if "240hz" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("⭐ 240Hz")
-        
-        if "2560x1600" in texto_completo or "2560 x 1600" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("⭐ Resolução")
-        
-        if "2023" in texto_completo:
-            score += 6
-            caracteristicas_encontradas.append("⭐ 2023")
-        
-        # Modelo e marca
-        if "zephyrus m16" in texto_completo:
-            score += 12
-            caracteristicas_encontradas.append("🎯 Zephyrus M16")
-        
-        if "asus" in texto_completo and "rog" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("✓ ASUS ROG")
-        
-        return score, caracteristicas_encontradas
+        return self.perfil.pontuar(titulo + " " + descricao)
     
     def analisar_suspeita_preco_olx(self, preco):
         """Análise específica de preço para OLX"""
-        if preco < 2000:
-            return "🚨 EXTREMAMENTE SUSPEITO", 12
-        elif preco < 4000:
-            return "⚠️ MUITO SUSPEITO", 10
-        elif preco < 7000:
-            return "⚠️ SUSPEITO", 7
-        elif preco < 10000:
-            return "💰 PREÇO BAIXO", 4
-        else:
-            return "💰 PREÇO NORMAL", 0
+        return self.perfil.analisar_preco(preco)
     
     def filtrar_candidatos_olx(self, anuncios):
         """Filtra e pontua candidatos da OLX"""
         candidatos = []
         
-        for anuncio in anuncios:
-            score, caracteristicas = self.calcular_score_olx(anuncio['titulo'])
-            preco = anuncio['preco']
-            suspeita_preco, score_preco = self.analisar_suspeita_preco_olx(preco)
-            
-            score_total = score + score_preco
-            
-            # Filtro: só candidatos com score significativo
-            if score >= 12 or score_preco >= 7:
-                anuncio.update({
-                    'score_similaridade': score,
-                    'score_preco': score_preco,
-                    'score_total': score_total,
-                    'caracteristicas_encontradas': caracteristicas,
-                    'suspeita_preco': suspeita_preco,
-                    'nivel_alerta': self.definir_nivel_alerta_olx(score_total),
-                    'probabilidade_match': self.calcular_probabilidade(score_total)
-                })
-                candidatos.append(anuncio)
-        
+        # Só anúncios novos ou alterados desde a última varredura são pontuados
+        anuncios = filtrar_novos('olx', anuncios)
+        
+        # Filtro: só candidatos com score significativo
+        pontuacoes = pontuar_lote(
+            self.perfil,
+            [anuncio['titulo'] for anuncio in anuncios],
+            [anuncio['preco'] for anuncio in anuncios],
+            score_minimo=12,
+            score_preco_minimo=7
+        )
+        
+        for indice, pontuacao in pontuacoes:
+            anuncio = anuncios[indice]
+            anuncio.update(pontuacao)
+            candidatos.append(anuncio)
+        
+        # Os melhores têm a página do anúncio buscada e são repontuados com a descrição
+        candidatos = enriquecer('olx', candidatos, self.perfil, self.headers)
+        registrar_scores('olx', candidatos)
         return sorted(candidatos, key=lambda x: x['score_total'], reverse=True)
     
     def definir_nivel_alerta_olx(self, score_total):
         """Define nível de alerta para OLX"""
-        if score_total >= 45:
-            return "🚨 ALERTA MÁXIMO"
-        elif score_total >= 35:
-            return "⚠️ ALERTA ALTO"
-        elif score_total >= 25:
-            return "⚠️ ALERTA MÉDIO"
-        else:
-            return "ℹ️ MONITORAR"
+        return self.perfil.nivel_alerta(score_total)
     
     def calcular_probabilidade(self, score_total):
         """Calcula probabilidade de match"""
-        if score_total >= 45:
-            return "95%+"
-        elif score_total >= 35:
-            return "80-95%"
-        elif score_total >= 25:
-            return "60-80%"
-        else:
-            return "30-60%"
+        return self.perfil.probabilidade(score_total)
     
     def salvar_resultados_olx(self, candidatos):
         """Salva resultados específicos da OLX"""
         if not candidatos:
             return None
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_dir = os.path.expanduser("~/monitor_asus_rog")
-        filename = f"{base_dir}/resultados/olx_candidatos_{timestamp}.json"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(candidatos, f, indent=2, ensure_ascii=False)
         
-        return filename
+        return salvar_execucao('olx', candidatos)
 
 # Execução principal
 if __name__ == "__main__":
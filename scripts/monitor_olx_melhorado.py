@@ -1,46 +1,58 @@
 #!/usr/bin/env python3
 # monitor_olx_melhorado.py - Monitoramento OLX com busca regional
 
-import requests
-import json
+import queue
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import time
-import os
-from bs4 import BeautifulSoup
+
+from armazenamento import salvar_execucao
+from busca_assincrona import fetch_many
+from deduplicacao import Deduplicador
+from enriquecimento import enriquecer
+from extracoes import extrair_pagina
+from indice_vistos import filtrar_novos, registrar_scores
+from configuracao import carregar_config
+from parser_html import criar_soup
+from perfis_score import obter_perfil
+from score_lote import pontuar_lote
+from sessoes_http import obter_sessao
 
 class MonitorOLXRegional:
     def __init__(self):
         self.modelo_principal = "ASUS ROG Zephyrus M16"
         self.codigo_modelo = "GU604"
-        self.caracteristicas_unicas = [
-            "anime matrix", "mini led", "240hz", "2560x1600", 
-            "gu604", "2023", "tampa animada", "led matrix",
-            "nebula hdr", "rog intelligent cooling", "rtx 4070",
-            "rtx 4080", "ryzen 9", "ddr5", "32gb", "1tb ssd",
-            "dolby vision", "wifi 6e", "thunderbolt 4", "qhd", 
-            "16 polegadas", "zephyrus m16", "rog zephyrus",
-            "gaming laptop", "keystone ii"
-        ]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
         }
         
-        # Regiões importantes para buscar
-        self.regioes_olx = [
-            ('www', 'Nacional'),
-            ('sp', 'São Paulo'),
-            ('rj', 'Rio de Janeiro'),
-            ('df', 'Distrito Federal'),
-            ('mg', 'Minas Gerais'),
-            ('pr', 'Paraná'),
-            ('rs', 'Rio Grande do Sul'),
-            ('ba', 'Bahia'),
-            ('sc', 'Santa Catarina'),
-            ('go', 'Goiás')
-        ]
+        # Regiões importantes para buscar (sobrescritas por regioes_olx no config.json)
+        regioes_config = carregar_config().get('regioes_olx')
+        if regioes_config:
+            self.regioes_olx = list(regioes_config.items())
+        else:
+            self.regioes_olx = [
+                ('www', 'Nacional'),
+                ('sp', 'São Paulo'),
+                ('rj', 'Rio de Janeiro'),
+                ('df', 'Distrito Federal'),
+                ('mg', 'Minas Gerais'),
+                ('pr', 'Paraná'),
+                ('rs', 'Rio Grande do Sul'),
+                ('ba', 'Bahia'),
+                ('sc', 'Santa Catarina'),
+                ('go', 'Goiás')
+            ]
+        
+        # Cada subdomínio é um host próprio: um pool de conexões e um token bucket por região
+        obter_sessao('olx_regional', self.headers, pool_conexoes=len(self.regioes_olx))
+    
+    @property
+    def perfil(self):
+        """Perfil de score do site, montado a partir do config.json"""
+        return obter_perfil('olx_regional')
     
     def gerar_termos_olx(self):
         """Termos específicos para busca na OLX"""
@@ -56,45 +68,79 @@ class MonitorOLXRegional:
         ]
     
     def buscar_olx_regional(self):
-        """Busca anúncios na OLX em todas as regiões"""
-        resultados_todos = []
-        
+        """Busca anúncios na OLX em todas as regiões ao mesmo tempo"""
+        consultas = []
+        requisicoes = []
         for regiao, nome_regiao in self.regioes_olx:
-            print(f"\n🗺️ Buscando em {nome_regiao} ({regiao}.olx.com.br)...")
+            # URL específica da região
+            url = f"https://{regiao}.olx.com.br/informatica/notebooks-netbooks"
             
             for termo in self.gerar_termos_olx():
-                print(f"  🔍 Termo: '{termo}'")
-                
-                # URL específica da região
-                url = f"https://{regiao}.olx.com.br/informatica/notebooks-netbooks"
                 params = {
                     'q': termo,
                     'sf': '1'  # Ordenar por mais recentes
                 }
-                
-                try:
-                    response = requests.get(url, headers=self.headers, params=params, timeout=15)
-                    
-                    if response.status_code == 200:
-                        anuncios = self.extrair_anuncios_olx(response.text, termo, regiao, nome_regiao)
-                        resultados_todos.extend(anuncios)
-                        print(f"    ✅ {len(anuncios)} anúncios encontrados")
-                    else:
-                        print(f"    ❌ Erro HTTP {response.status_code}")
-                    
-                    time.sleep(2)  # Evitar bloqueio
-                    
-                except Exception as e:
-                    print(f"    ❌ Erro: {e}")
+                consultas.append((regiao, nome_regiao, termo))
+                requisicoes.append({'url': url, 'params': params, 'timeout': 15})
         
-        return self.filtrar_candidatos_olx(resultados_todos)
+        # O callback roda no loop de eventos e só enfileira a resposta; extração, pontuação e banco
+        # ficam numa thread à parte, que processa cada lote de páginas assim que ele chega
+        fila = queue.Queue()
+        print(f"\n🗺️ Buscando em {len(self.regioes_olx)} regiões em paralelo ({len(requisicoes)} consultas)...")
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='olx-regional') as executor:
+            processamento = executor.submit(self.processar_respostas, fila, consultas)
+            try:
+                fetch_many('olx_regional', requisicoes, headers=self.headers,
+                           ao_receber=lambda indice, response: fila.put((indice, response)))
+            finally:
+                fila.put(None)
+            candidatos = processamento.result()
+        
+        # Os melhores de todas as regiões têm a página do anúncio buscada e são repontuados com a descrição
+        candidatos = enriquecer('olx_regional', candidatos, self.perfil, self.headers)
+        registrar_scores('olx_regional', candidatos)
+        return sorted(candidatos, key=lambda x: x['score_total'], reverse=True)
+    
+    def processar_respostas(self, fila, consultas):
+        """Extrai, deduplica e pontua as páginas da fila em lotes, conforme chegam, até receber None"""
+        candidatos = []
+        deduplicador = Deduplicador('olx_regional')
+        fim = False
+        while not fim:
+            lote = [fila.get()]
+            # O que chegou enquanto o lote anterior era pontuado entra todo no mesmo lote
+            while not fila.empty():
+                lote.append(fila.get_nowait())
+            
+            ineditos = []
+            for item in lote:
+                if item is None:
+                    fim = True
+                    continue
+                indice, response = item
+                regiao, nome_regiao, termo = consultas[indice]
+                
+                if isinstance(response, Exception):
+                    print(f"  ❌ {nome_regiao} '{termo}': {response}")
+                elif response.status_code == 200:
+                    anuncios = extrair_pagina('olx_regional', response, self.extrair_anuncios_olx, termo, regiao, nome_regiao)
+                    # Anúncio nacional que também aparece na região (ou em outro termo) só é pontuado uma vez
+                    novos = deduplicador.adicionar(anuncios)
+                    ineditos.extend(novos)
+                    print(f"  ✅ {nome_regiao} '{termo}': {len(anuncios)} anúncios encontrados ({len(novos)} inéditos)")
+                else:
+                    print(f"  ❌ {nome_regiao} '{termo}': Erro HTTP {response.status_code}")
+            
+            if ineditos:
+                candidatos.extend(self.filtrar_candidatos_olx(ineditos))
+        return candidatos
     
     def extrair_anuncios_olx(self, html, termo_busca, regiao, nome_regiao):
         """Extrai anúncios do HTML da OLX"""
         anuncios = []
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = criar_soup(html, 'olx_regional')
             
             # Procurar por containers de anúncios (estrutura pode mudar)
             containers = (soup.find_all('div', {'data-ds-component': True}) or
@@ -156,142 +202,49 @@ class MonitorOLXRegional:
     
     def calcular_score_olx(self, titulo, descricao=""):
         """Calcula score específico para OLX"""
-        texto_completo = (titulo + " " + descricao).lower()
-        score = 0
-        caracteristicas_encontradas = []
-        
-        # Características super específicas - PESO MAIOR
-        if "anime matrix" in texto_completo:
-            score += 20
-            caracteristicas_encontradas.append("🎯 AniMe Matrix")
-        
-        if "gu604" in texto_completo:
-            score += 20
-            caracteristicas_encontradas.append("🎯 GU604")
-        
-        if "mini led" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 Mini LED")
-        
-        # Características importantes
-        if "240hz" in texto_completo:
-            score += 10
-            caracteristicas_encontradas.append("⭐ 240Hz")
-        
-        if "2560x1600" in texto_completo or "2560 x 1600" in texto_completo or "qhd" in texto_completo:
-            score += 10
-            caracteristicas_encontradas.append("⭐ Resolução QHD")
-        
-        if "2023" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("⭐ 2023")
-        
-        # Modelo e marca
-        if "zephyrus m16" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 Zephyrus M16")
-        
-        if "asus" in texto_completo and "rog" in texto_completo:
-            score += 10
-            caracteristicas_encontradas.append("✓ ASUS ROG")
-        
-        # Hardware específico
-        if "rtx 4070" in texto_completo or "rtx 4080" in texto_completo:
-            score += 12
-            caracteristicas_encontradas.append("🎮 RTX 40xx")
-        
-        if "ryzen 9" in texto_completo:
-            score += 10
-            caracteristicas_encontradas.append("⚡ Ryzen 9")
-        
-        if "32gb" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("💾 32GB RAM")
-        
-        return score, caracteristicas_encontradas
+        return self.perfil.pontuar(titulo + " " + descricao)
     
     def analisar_suspeita_preco_olx(self, preco):
         """Análise específica de preço para OLX"""
-        if preco < 1500:
-            return "🚨 EXTREMAMENTE SUSPEITO", 15
-        elif preco < 3000:
-            return "🚨 MUITO SUSPEITO", 12
-        elif preco < 5500:
-            return "⚠️ SUSPEITO", 8
-        elif preco < 8000:
-            return "⚠️ PREÇO BAIXO", 5
-        elif preco < 12000:
-            return "💰 PREÇO RAZOÁVEL", 2
-        else:
-            return "💰 PREÇO ALTO", 0
+        return self.perfil.analisar_preco(preco)
     
     def filtrar_candidatos_olx(self, anuncios):
-        """Filtra e pontua candidatos da OLX"""
+        """Filtra e pontua candidatos da OLX (um lote; o enriquecimento e o índice ficam para o fim da varredura)"""
         candidatos = []
         
-        for anuncio in anuncios:
-            score, caracteristicas = self.calcular_score_olx(anuncio['titulo'])
-            preco = anuncio['preco']
-            suspeita_preco, score_preco = self.analisar_suspeita_preco_olx(preco)
-            
-            score_total = score + score_preco
-            
-            # Filtro: só candidatos com score significativo
-            if score >= 10 or score_preco >= 8:
-                anuncio.update({
-                    'score_similaridade': score,
-                    'score_preco': score_preco,
-                    'score_total': score_total,
-                    'caracteristicas_encontradas': caracteristicas,
-                    'suspeita_preco': suspeita_preco,
-                    'nivel_alerta': self.definir_nivel_alerta_olx(score_total),
-                    'probabilidade_match': self.calcular_probabilidade(score_total)
-                })
-                candidatos.append(anuncio)
+        # Só anúncios novos ou alterados desde a última varredura são pontuados
+        anuncios = filtrar_novos('olx_regional', anuncios)
+        
+        # Filtro: só candidatos com score significativo
+        pontuacoes = pontuar_lote(
+            self.perfil,
+            [anuncio['titulo'] for anuncio in anuncios],
+            [anuncio['preco'] for anuncio in anuncios],
+            score_minimo=10,
+            score_preco_minimo=8
+        )
+        
+        for indice, pontuacao in pontuacoes:
+            anuncio = anuncios[indice]
+            anuncio.update(pontuacao)
+            candidatos.append(anuncio)
         
         return sorted(candidatos, key=lambda x: x['score_total'], reverse=True)
     
     def definir_nivel_alerta_olx(self, score_total):
         """Define nível de alerta para OLX"""
-        if score_total >= 50:
-            return "🚨 ALERTA MÁXIMO"
-        elif score_total >= 40:
-            return "🚨 ALERTA CRÍTICO"
-        elif score_total >= 30:
-            return "⚠️ ALERTA ALTO"
-        elif score_total >= 20:
-            return "⚠️ ALERTA MÉDIO"
-        else:
-            return "ℹ️ MONITORAR"
+        return self.perfil.nivel_alerta(score_total)
     
     def calcular_probabilidade(self, score_total):
         """Calcula probabilidade em % de ser o notebook"""
-        if score_total >= 55:
-            return "95%+"
-        elif score_total >= 45:
-            return "85-95%"
-        elif score_total >= 35:
-            return "70-85%"
-        elif score_total >= 25:
-            return "50-70%"
-        else:
-            return "< 50%"
+        return self.perfil.probabilidade(score_total)
     
     def salvar_resultados_olx(self, candidatos):
-        """Salva resultados em arquivo JSON"""
+        """Salva resultados no banco de resultados"""
         if not candidatos:
             return None
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_dir = os.path.expanduser("~/monitor_asus_rog")
-        filename = f"{base_dir}/resultados/olx_regional_candidatos_{timestamp}.json"
-        
-        os.makedirs(f"{base_dir}/resultados", exist_ok=True)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(candidatos, f, indent=2, ensure_ascii=False)
         
-        return filename
+        return salvar_execucao('olx_regional', candidatos)
 
 # Execução principal
 if __name__ == "__main__":
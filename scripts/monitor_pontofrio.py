@@ -1,58 +1,58 @@
 #!/usr/bin/env python3
 # monitor_pontofrio.py - Monitoramento específico para Ponto Frio
 
-import requests
-import json
 import re
 from datetime import datetime
-import time
-import os
-from bs4 import BeautifulSoup
+
+from armazenamento import salvar_execucao
+from busca_assincrona import fetch_many
+from deduplicacao import deduplicar
+from extracoes import extrair_pagina
+from indice_vistos import filtrar_novos, registrar_scores
+from parser_html import criar_soup
+from perfis_score import obter_perfil
+from score_lote import pontuar_lote
 
 class MonitorPontoFrioEspecializado:
     def __init__(self):
-        self.caracteristicas_unicas = [
-            "anime matrix", "mini led", "240hz", "2560x1600", 
-            "gu604", "2023", "tampa animada", "led matrix",
-            "nebula hdr", "rog intelligent cooling", "rtx 4070",
-            "rtx 4080", "ryzen 9", "ddr5", "32gb", "1tb ssd",
-            "dolby vision", "wifi 6e", "thunderbolt 4", "qhd", 
-            "16 polegadas", "zephyrus m16", "rog zephyrus",
-            "gaming laptop", "keystone ii"
-        ]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
     
+    @property
+    def perfil(self):
+        """Perfil de score do site, montado a partir do config.json"""
+        return obter_perfil('pontofrio')
+    
     def buscar_pontofrio(self):
         """Busca anúncios no Ponto Frio"""
         resultados_todos = []
         termos = ["ASUS ROG Zephyrus M16", "ROG M16 AniMe Matrix", "Zephyrus GU604"]
         
+        url = "https://www.pontofrio.com.br/busca"
+        requisicoes = []
         for termo in termos:
             print(f"🔍 Buscando Ponto Frio: '{termo}'")
-            
-            url = "https://www.pontofrio.com.br/busca"
-            params = {'q': termo}
-            
-            try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=15)
-                if response.status_code == 200:
-                    anuncios = self.extrair_anuncios_pontofrio(response.text, termo)
-                    resultados_todos.extend(anuncios)
-                
-                time.sleep(3)
-            except Exception as e:
-                print(f"❌ Erro: {e}")
+            requisicoes.append({'url': url, 'params': {'q': termo}, 'timeout': 15})
         
-        return self.filtrar_candidatos_pontofrio(resultados_todos)
+        respostas = fetch_many('pontofrio', requisicoes, headers=self.headers)
+        
+        for termo, response in zip(termos, respostas):
+            if isinstance(response, Exception):
+                print(f"❌ Erro: {response}")
+            elif response.status_code == 200:
+                anuncios = extrair_pagina('pontofrio', response, self.extrair_anuncios_pontofrio, termo)
+                resultados_todos.extend(anuncios)
+        
+        # O mesmo anúncio aparece em vários termos: pontua uma vez só
+        return self.filtrar_candidatos_pontofrio(deduplicar('pontofrio', resultados_todos))
     
     def extrair_anuncios_pontofrio(self, html, termo_busca):
         """Extrai anúncios do HTML do Ponto Frio"""
         anuncios = []
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = criar_soup(html, 'pontofrio')
             containers = soup.find_all('div', class_=re.compile(r'product|item'))
             
             for container in containers:
@@ -92,108 +92,50 @@ class MonitorPontoFrioEspecializado:
     
     def calcular_score_pontofrio(self, titulo):
         """Calcula score para Ponto Frio"""
-        texto = titulo.lower()
-        score = 0
-        caracteristicas = []
-        
-        if "anime matrix" in texto:
-            score += 15
-            caracteristicas.append("🎯 AniMe Matrix")
-        if "gu604" in texto:
-            score += 15
-            caracteristicas.append("🎯 GU604")
-        if "mini led" in texto:
-            score += 12
-            caracteristicas.append("🎯 Mini LED")
-        if "240hz" in texto:
-            score += 8
-            caracteristicas.append("⭐ 240Hz")
-        if "zephyrus m16" in texto:
-            score += 12
-            caracteristicas.append("🎯 Zephyrus M16")
-        if "asus" in texto and "rog" in texto:
-            score += 8
-            caracteristicas.append("✓ ASUS ROG")
-        
-        return score, caracteristicas
+        return self.perfil.pontuar(titulo)
     
     def analisar_suspeita_preco_pontofrio(self, preco):
         """Análise de preço para Ponto Frio"""
-        if preco < 2000:
-            return "🚨 EXTREMAMENTE SUSPEITO", 12
-        elif preco < 4000:
-            return "⚠️ MUITO SUSPEITO", 10
-        elif preco < 7000:
-            return "⚠️ SUSPEITO", 7
-        elif preco < 10000:
-            return "💰 PREÇO BAIXO", 4
-        else:
-            return "💰 PREÇO NORMAL", 0
+        return self.perfil.analisar_preco(preco)
     
     def filtrar_candidatos_pontofrio(self, anuncios):
         """Filtra candidatos do Ponto Frio"""
         candidatos = []
         
-        for anuncio in anuncios:
-            score, caracteristicas = self.calcular_score_pontofrio(anuncio['titulo'])
-            preco = anuncio['preco']
-            suspeita_preco, score_preco = self.analisar_suspeita_preco_pontofrio(preco)
-            
-            score_total = score + score_preco
-            
-            if score >= 12 or score_preco >= 7:
-                anuncio.update({
-                    'score_similaridade': score,
-                    'score_preco': score_preco,
-                    'score_total': score_total,
-                    'caracteristicas_encontradas': caracteristicas,
-                    'suspeita_preco': suspeita_preco,
-                    'nivel_alerta': self.definir_nivel_alerta(score_total),
-                    'probabilidade_match': self.calcular_probabilidade(score_total)
-                })
-                candidatos.append(anuncio)
+        # Só anúncios novos ou alterados desde a última varredura são pontuados
+        anuncios = filtrar_novos('pontofrio', anuncios)
+        
+        # Pontuação e filtro de score feitos de uma vez sobre todos os anúncios
+        pontuacoes = pontuar_lote(
+            self.perfil,
+            [anuncio['titulo'] for anuncio in anuncios],
+            [anuncio['preco'] for anuncio in anuncios],
+            score_minimo=12,
+            score_preco_minimo=7
+        )
+        
+        for indice, pontuacao in pontuacoes:
+            anuncio = anuncios[indice]
+            anuncio.update(pontuacao)
+            candidatos.append(anuncio)
         
+        registrar_scores('pontofrio', candidatos)
         return sorted(candidatos, key=lambda x: x['score_total'], reverse=True)
     
     def definir_nivel_alerta(self, score_total):
         """Define nível de alerta"""
-        if score_total >= 45:
-            return "🚨 ALERTA MÁXIMO"
-        elif score_total >= 35:
-            return "⚠️ ALERTA ALTO"
-        elif score_total >= 25:
-            return "⚠️ ALERTA MÉDIO"
-        else:
-            return "ℹ️ MONITORAR"
+        return self.perfil.nivel_alerta(score_total)
     
     def calcular_probabilidade(self, score_total):
         """Calcula probabilidade"""
-        if score_total >= 50:
-            return "95%+"
-        elif score_total >= 40:
-            return "80-95%"
-        elif score_total >= 30:
-            return "60-80%"
-        elif score_total >= 20:
-            return "40-60%"
-        else:
-            return "< 40%"
+        return self.perfil.probabilidade(score_total)
     
     def salvar_resultados_pontofrio(self, candidatos):
         """Salva resultados"""
         if not candidatos:
             return None
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_dir = os.path.expanduser("~/monitor_asus_rog")
-        filename = f"{base_dir}/resultados/pontofrio_candidatos_{timestamp}.json"
-        
-        os.makedirs(f"{base_dir}/resultados", exist_ok=True)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(candidatos, f, indent=2, ensure_ascii=False)
         
-        return filename
+        return salvar_execucao('pontofrio', candidatos)
 
 # Execução principal
 if __name__ == "__main__":
@@ -1,27 +1,22 @@
 #!/usr/bin/env python3
 # monitor_shopee.py - Monitoramento específico para Shopee
 
-import requests
-import json
 import re
 from datetime import datetime
-import time
-import os
-from bs4 import BeautifulSoup
+
+from armazenamento import salvar_execucao
+from busca_assincrona import fetch_many
+from deduplicacao import deduplicar
+from extracoes import extrair_pagina
+from indice_vistos import filtrar_novos, registrar_scores
+from parser_html import criar_soup, scripts_json, scripts_json_rapido
+from perfis_score import obter_perfil
+from score_lote import pontuar_lote
 
 class MonitorShopeeEspecializado:
     def __init__(self):
         self.modelo_principal = "ASUS ROG Zephyrus M16"
         self.codigo_modelo = "GU604"
-        self.caracteristicas_unicas = [
-            "anime matrix", "mini led", "240hz", "2560x1600", 
-            "gu604", "2023", "tampa animada", "led matrix",
-            "nebula hdr", "rog intelligent cooling", "rtx 4070",
-            "rtx 4080", "ryzen 9", "ddr5", "32gb", "1tb ssd",
-            "dolby vision", "wifi 6e", "thunderbolt 4", "qhd", 
-            "16 polegadas", "zephyrus m16", "rog zephyrus",
-            "gaming laptop", "keystone ii"
-        ]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -30,6 +25,11 @@ class MonitorShopeeEspecializado:
             'Connection': 'keep-alive'
         }
     
+    @property
+    def perfil(self):
+        """Perfil de score do site, montado a partir do config.json"""
+        return obter_perfil('shopee')
+    
     def gerar_termos_shopee(self):
         """Termos específicos para busca na Shopee"""
         return [
@@ -44,40 +44,47 @@ class MonitorShopeeEspecializado:
     def buscar_shopee(self):
         """Busca anúncios na Shopee"""
         resultados_todos = []
+        termos = self.gerar_termos_shopee()
         
-        for termo in self.gerar_termos_shopee():
+        # URL da Shopee para busca
+        url = "https://shopee.com.br/search"
+        requisicoes = []
+        for termo in termos:
             print(f"🔍 Buscando Shopee: '{termo}'")
-            
-            # URL da Shopee para busca
-            url = "https://shopee.com.br/search"
             params = {
                 'keyword': termo,
                 'page': 0,
                 'sortBy': 'ctime'  # Ordenar por mais recentes
             }
-            
-            try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=15)
-                
-                if response.status_code == 200:
-                    anuncios = self.extrair_anuncios_shopee(response.text, termo)
-                    resultados_todos.extend(anuncios)
-                else:
-                    print(f"❌ Erro HTTP {response.status_code} para '{termo}'")
-                
-                time.sleep(4)  # Evitar bloqueio - Shopee é mais restritiva
-                
-            except Exception as e:
-                print(f"❌ Erro na busca Shopee '{termo}': {e}")
+            requisicoes.append({'url': url, 'params': params, 'timeout': 15})
+        
+        # Requisições em paralelo; o espaçamento por host fica a cargo da camada de busca
+        respostas = fetch_many('shopee', requisicoes, headers=self.headers)
+        
+        for termo, response in zip(termos, respostas):
+            if isinstance(response, Exception):
+                print(f"❌ Erro na busca Shopee '{termo}': {response}")
+            elif response.status_code == 200:
+                anuncios = extrair_pagina('shopee', response, self.extrair_anuncios_shopee, termo)
+                resultados_todos.extend(anuncios)
+            else:
+                print(f"❌ Erro HTTP {response.status_code} para '{termo}'")
         
-        return self.filtrar_candidatos_shopee(resultados_todos)
+        # O mesmo anúncio aparece em vários termos: pontua uma vez só
+        return self.filtrar_candidatos_shopee(deduplicar('shopee', resultados_todos))
     
     def extrair_anuncios_shopee(self, html, termo_busca):
         """Extrai anúncios do HTML da Shopee"""
-        anuncios = []
+        # Caminho rápido: itens em application/json são lidos sem montar a árvore HTML
+        anuncios = self.extrair_json_embutido_shopee(html, termo_busca)
+        if anuncios:
+            return anuncios
+        
+        soup = None
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            # Um único parse por página: o método alternativo reaproveita esta árvore
+            soup = criar_soup(html, 'shopee')
             
             # Shopee usa estrutura com JSON embutido ou elementos específicos
             # Procurar por containers de produtos
@@ -121,42 +128,58 @@ class MonitorShopeeEspecializado:
         except Exception as e:
             print(f"❌ Erro ao processar HTML Shopee: {e}")
             
-        # Se não conseguir pelo scraping normal, tentar método alternativo
-        if not anuncios:
-            anuncios = self.metodo_alternativo_shopee(html, termo_busca)
+        # Se não conseguir pelo scraping normal, tentar método alternativo na mesma árvore
+        if not anuncios and soup is not None:
+            anuncios = self.metodo_alternativo_shopee(soup, termo_busca)
+        
+        return anuncios
+    
+    def extrair_json_embutido_shopee(self, html, termo_busca):
+        """Lê os itens dos blocos application/json varrendo o HTML, sem BeautifulSoup"""
+        anuncios = []
+        
+        for data in scripts_json_rapido(html, 'application/json'):
+            try:
+                anuncios.extend(self.anuncios_do_json_shopee(data, termo_busca))
+            except:
+                continue
+        
+        return anuncios
+    
+    def anuncios_do_json_shopee(self, data, termo_busca):
+        """Converte um bloco JSON com 'items' em anúncios"""
+        anuncios = []
+        
+        # Navegar pela estrutura JSON para encontrar produtos
+        # (estrutura pode variar)
+        if isinstance(data, dict) and 'items' in data:
+            for item in data['items']:
+                titulo = item.get('name', '')
+                preco = item.get('price', 0)
+                
+                if titulo and any(word in titulo.lower() for word in ['asus', 'rog']):
+                    anuncio = {
+                        'titulo': titulo,
+                        'preco': preco // 100000 if preco > 100000 else preco,  # Shopee usa centavos
+                        'preco_str': f"R$ {preco // 100000}" if preco > 100000 else f"R$ {preco}",
+                        'url': f"https://shopee.com.br/item/{item.get('shopid', '')}/{item.get('itemid', '')}",
+                        'site': 'Shopee',
+                        'termo_busca': termo_busca,
+                        'data_busca': datetime.now().isoformat()
+                    }
+                    anuncios.append(anuncio)
         
         return anuncios
     
-    def metodo_alternativo_shopee(self, html, termo_busca):
+    def metodo_alternativo_shopee(self, soup, termo_busca):
         """Método alternativo para extrair dados da Shopee"""
         anuncios = []
         
         try:
             # Procurar por dados JSON embutidos na página
-            soup = BeautifulSoup(html, 'html.parser')
-            scripts = soup.find_all('script', type='application/json')
-            
-            for script in scripts:
+            for data in scripts_json(soup, 'application/json'):
                 try:
-                    data = json.loads(script.get_text())
-                    # Navegar pela estrutura JSON para encontrar produtos
-                    # (estrutura pode variar)
-                    if isinstance(data, dict) and 'items' in data:
-                        for item in data['items']:
-                            titulo = item.get('name', '')
-                            preco = item.get('price', 0)
-                            
-                            if titulo and any(word in titulo.lower() for word in ['asus', 'rog']):
-                                anuncio = {
-                                    'titulo': titulo,
-                                    'preco': preco // 100000 if preco > 100000 else preco,  # Shopee usa centavos
-                                    'preco_str': f"R$ {preco // 100000}" if preco > 100000 else f"R$ {preco}",
-                                    'url': f"https://shopee.com.br/item/{item.get('shopid', '')}/{item.get('itemid', '')}",
-                                    'site': 'Shopee',
-                                    'termo_busca': termo_busca,
-                                    'data_busca': datetime.now().isoformat()
-                                }
-                                anuncios.append(anuncio)
+                    anuncios.extend(self.anuncios_do_json_shopee(data, termo_busca))
                 except:
                     continue
                     
@@ -172,125 +195,50 @@ class MonitorShopeeEspecializado:
     
     def calcular_score_shopee(self, titulo, descricao=""):
         """Calcula score específico para Shopee"""
-        texto_completo = (titulo + " " + descricao).lower()
-        score = 0
-        caracteristicas_encontradas = []
-        
-        # Características super específicas
-        if "anime matrix" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 AniMe Matrix")
-        
-        if "gu604" in texto_completo:
-            score += 15
-            caracteristicas_encontradas.append("🎯 GU604")
-        
-        if "mini led" in texto_completo:
-            score += 12
-            caracteristicas_encontradas.append("🎯 Mini LED")
-        
-        # Características importantes
-        if "240hz" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("⭐ 240Hz")
-        
-        if "2560x1600" in texto_completo or "2560 x 1600" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("⭐ Resolução")
-        
-        if "2023" in texto_completo:
-            score += 6
-            caracteristicas_encontradas.append("⭐ 2023")
-        
-        # Modelo e marca
-        if "zephyrus m16" in texto_completo:
-            score += 12
-            caracteristicas_encontradas.append("🎯 Zephyrus M16")
-        
-        if "asus" in texto_completo and "rog" in texto_completo:
-            score += 8
-            caracteristicas_encontradas.append("✓ ASUS ROG")
-        
-        return score, caracteristicas_encontradas
+        return self.perfil.pontuar(titulo + " " + descricao)
     
     def analisar_suspeita_preco_shopee(self, preco):
         """Análise específica de preço para Shopee"""
-        if preco < 1500:
-            return "🚨 EXTREMAMENTE SUSPEITO", 12
-        elif preco < 3500:
-            return "⚠️ MUITO SUSPEITO", 10
-        elif preco < 6500:
-            return "⚠️ SUSPEITO", 7
-        elif preco < 9000:
-            return "💰 PREÇO BAIXO", 4
-        else:
-            return "💰 PREÇO NORMAL", 0
+        return self.perfil.analisar_preco(preco)
     
     def filtrar_candidatos_shopee(self, anuncios):
         """Filtra e pontua candidatos da Shopee"""
         candidatos = []
         
-        for anuncio in anuncios:
-            score, caracteristicas = self.calcular_score_shopee(anuncio['titulo'])
-            preco = anuncio['preco']
-            suspeita_preco, score_preco = self.analisar_suspeita_preco_shopee(preco)
-            
-            score_total = score + score_preco
-            
-            # Filtro: só candidatos com score significativo
-            if score >= 12 or score_preco >= 7:
-                anuncio.update({
-                    'score_similaridade': score,
-                    'score_preco': score_preco,
-                    'score_total': score_total,
-                    'caracteristicas_encontradas': caracteristicas,
-                    'suspeita_preco': suspeita_preco,
-                    'nivel_alerta': self.definir_nivel_alerta_shopee(score_total),
-                    'probabilidade_match': self.calcular_probabilidade(score_total)
-                })
-                candidatos.append(anuncio)
+        # Só anúncios novos ou alterados desde a última varredura são pontuados
+        anuncios = filtrar_novos('shopee', anuncios)
         
+        # Filtro: só candidatos com score significativo
+        pontuacoes = pontuar_lote(
+            self.perfil,
+            [anuncio['titulo'] for anuncio in anuncios],
+            [anuncio['preco'] for anuncio in anuncios],
+            score_minimo=12,
+            score_preco_minimo=7
+        )
+        
+        for indice, pontuacao in pontuacoes:
+            anuncio = anuncios[indice]
+            anuncio.update(pontuacao)
+            candidatos.append(anuncio)
+        
+        registrar_scores('shopee', candidatos)
         return sorted(candidatos, key=lambda x: x['score_total'], reverse=True)
     
     def definir_nivel_alerta_shopee(self, score_total):
         """Define nível de alerta para Shopee"""
-        if score_total >= 45:
-            return "🚨 ALERTA MÁXIMO"
-        elif score_total >= 35:
-            return "⚠️ ALERTA ALTO"
-        elif score_total >= 25:
-            return "⚠️ ALERTA MÉDIO"
-        else:
-            return "ℹ️ MONITORAR"
+        return self.perfil.nivel_alerta(score_total)
     
     def calcular_probabilidade(self, score_total):
         """Calcula probabilidade em % de ser o notebook"""
-        if score_total >= 50:
-            return "95%+"
-        elif score_total >= 40:
-            return "80-95%"
-        elif score_total >= 30:
-            return "60-80%"
-        elif score_total >= 20:
-            return "40-60%"
-        else:
-            return "< 40%"
+        return self.perfil.probabilidade(score_total)
     
     def salvar_resultados_shopee(self, candidatos):
-        """Salva resultados em arquivo JSON"""
+        """Salva resultados no banco de resultados"""
         if not candidatos:
             return None
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_dir = os.path.expanduser("~/monitor_asus_rog")
-        filename = f"{base_dir}/resultados/shopee_candidatos_{timestamp}.json"
-        
-        os.makedirs(f"{base_dir}/resultados", exist_ok=True)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(candidatos, f, indent=2, ensure_ascii=False)
         
-        return filename
+        return salvar_execucao('shopee', candidatos)
 
 # Execução principal
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# motor_score.py - Motor de score compartilhado, compilado uma vez a partir das regras de cada site
+
+import re
+import threading
+
+# Cada regra é um dict com 'peso', 'rotulo' e os padrões (em minúsculas):
+#   'padroes': [...] -> pontua se QUALQUER padrão aparecer no texto
+#   'todos': [...]   -> pontua só se TODOS aparecerem (ex.: 'asus' e 'rog')
+# Pesos negativos funcionam como penalização.
+
+# Acima deste número de padrões distintos a regex em trie supera os testes "in" individuais
+LIMIAR_REGEX = 150
+
+_motores = {}
+_motores_lock = threading.Lock()
+
+
+class MotorScore:
+    """Compila as regras de um site uma única vez: padrões deduplicados e indexados por regra"""
+
+    def __init__(self, regras):
+        self.regras = []
+        self.regras_por_padrao = {}
+
+        for indice, regra in enumerate(regras):
+            todos = 'todos' in regra
+            padroes = frozenset(p.lower() for p in (regra['todos'] if todos else regra['padroes']))
+            self.regras.append((padroes, todos, regra['peso'], regra['rotulo']))
+            for padrao in padroes:
+                self.regras_por_padrao.setdefault(padrao, []).append(indice)
+
+        self.padroes = sorted(self.regras_por_padrao)
+        self.regex = None
+        if len(self.padroes) >= LIMIAR_REGEX:
+            self.regex = re.compile(_regex_trie(self.padroes))
+            # Padrões contidos num padrão encontrado também estão no texto
+            self.implicados = {p: [q for q in self.padroes if q in p] for p in self.padroes}
+            # Padrões cujo final pode ser o começo de outro ('mini led' + 'led matrix')
+            self.sobrepoe = {
+                p for p in self.padroes
+                if any(q.startswith(p[i:]) and q not in p for q in self.padroes for i in range(1, len(p)))
+            }
+
+    def encontrar(self, texto):
+        """Conjunto de padrões presentes no texto (já em minúsculas), cada um testado uma vez"""
+        if self.regex is None:
+            return {padrao for padrao in self.padroes if padrao in texto}
+
+        casados = self.regex.findall(texto)
+        if self.sobrepoe.isdisjoint(casados):
+            encontrados = set()
+            for padrao in casados:
+                encontrados.update(self.implicados[padrao])
+            return encontrados
+
+        # Algum padrão pode esconder outro começando dentro dele: varre posição a posição
+        encontrados = set()
+        match = self.regex.search(texto)
+        while match:
+            encontrados.update(self.implicados[match.group()])
+            match = self.regex.search(texto, match.start() + 1)
+        return encontrados
+
+    def pontuar(self, texto):
+        """Retorna (score, características encontradas), na ordem das regras"""
+        encontrados = self.encontrar(texto.lower())
+
+        score = 0
+        caracteristicas = []
+        if not encontrados:
+            return score, caracteristicas
+
+        for padroes, todos, peso, rotulo in self.regras:
+            if (padroes <= encontrados) if todos else not padroes.isdisjoint(encontrados):
+                score += peso
+                caracteristicas.append(rotulo)
+
+        return score, caracteristicas
+
+
+def _regex_trie(padroes):
+    """Monta a regex em forma de trie: prefixos comuns são testados uma vez só e,
+    em cada posição, o padrão mais longo que casa ali é o capturado"""
+    trie = {}
+    for padrao in padroes:
+        no = trie
+        for caractere in padrao:
+            no = no.setdefault(caractere, {})
+        no[''] = True
+
+    def montar(no):
+        fim = no.get('') is True
+        ramos = [re.escape(c) + montar(filho) for c, filho in sorted(no.items()) if c]
+        if not ramos:
+            return ''
+        grupo = ramos[0] if len(ramos) == 1 else '(?:' + '|'.join(ramos) + ')'
+        if fim:
+            # Guloso: tenta o padrão mais longo antes de aceitar o que termina aqui
+            return (grupo if len(ramos) > 1 else '(?:' + grupo + ')') + '?'
+        return grupo
+
+    return montar(trie)
+
+
+def _chave_regras(regras):
+    return tuple(
+        (tuple(r.get('todos', ())), tuple(r.get('padroes', ())), r['peso'], r['rotulo'])
+        for r in regras
+    )
+
+
+def compilar_motor(regras):
+    """Retorna o motor das regras, compilando só na primeira vez que elas aparecem"""
+    chave = _chave_regras(regras)
+    with _motores_lock:
+        motor = _motores.get(chave)
+        if motor is None:
+            motor = _motores[chave] = MotorScore(regras)
+        return motor
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# parser_html.py - Camada central de parsing HTML (lxml com fallback para html.parser)
+
+import json
+import re
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from configuracao import carregar_config
+
+PARSER_PADRAO = 'lxml'
+PARSER_FALLBACK = 'html.parser'
+
+_parsers_indisponiveis = set()
+
+
+def parser_do_site(site=None):
+    """Parser configurado para o site (bloco parsers_html do config.json)"""
+    parsers = carregar_config().get('parsers_html', {})
+    return parsers.get(site) or parsers.get('padrao') or PARSER_PADRAO
+
+
+def criar_soup(html, site=None, parser=None):
+    """Monta o BeautifulSoup com o parser escolhido, caindo para html.parser se faltar"""
+    parser = parser or parser_do_site(site)
+    if parser not in _parsers_indisponiveis:
+        try:
+            return BeautifulSoup(html, parser)
+        except FeatureNotFound:
+            _parsers_indisponiveis.add(parser)
+            print(f"⚠️ Parser '{parser}' indisponível, usando {PARSER_FALLBACK}")
+    return BeautifulSoup(html, PARSER_FALLBACK)
+
+
+def scripts_json(soup, tipo='application/json'):
+    """Decodifica os blocos <script type=tipo> de uma árvore já montada, ignorando os inválidos"""
+    for script in soup.find_all('script', type=tipo):
+        try:
+            yield json.loads(script.get_text())
+        except ValueError:
+            continue
+
+
+_TAG_SCRIPT = re.compile(r'<script\b([^>]*)>', re.IGNORECASE)
+_FIM_SCRIPT = re.compile(r'</script\s*>', re.IGNORECASE)
+_ATRIBUTO_TYPE = re.compile(r'''\btype\s*=\s*["']?([^"'\s>]+)''', re.IGNORECASE)
+
+
+def scripts_json_rapido(html, tipo='application/json'):
+    """Decodifica os blocos <script type=tipo> varrendo o HTML direto, sem montar árvore"""
+    tipo = tipo.lower()
+    if tipo not in html and tipo not in html.lower():
+        return
+
+    posicao = 0
+    while True:
+        tag = _TAG_SCRIPT.search(html, posicao)
+        if not tag:
+            return
+        fim = _FIM_SCRIPT.search(html, tag.end())
+        if not fim:
+            return
+        posicao = fim.end()
+
+        tipo_tag = _ATRIBUTO_TYPE.search(tag.group(1))
+        if not tipo_tag or tipo_tag.group(1).lower() != tipo:
+            continue
+        try:
+            yield json.loads(html[tag.end():fim.start()])
+        except ValueError:
+            continue
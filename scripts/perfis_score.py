@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# perfis_score.py - Perfis de score por site, montados a partir do config.json uma única vez
+
+import threading
+from bisect import bisect_right
+
+from configuracao import carregar_config
+from motor_score import compilar_motor
+
+# Faixas de preço: [limite, rótulo, pontos] -> vale quando preco < limite; limite null = demais preços
+# Níveis de alerta e probabilidades: [mínimo, rótulo] -> vale quando score >= mínimo; null = abaixo de todos
+
+REGRAS_BASE = [
+    {'padroes': ['anime matrix'], 'peso': 15, 'rotulo': '🎯 AniMe Matrix'},
+    {'padroes': ['gu604'], 'peso': 15, 'rotulo': '🎯 GU604'},
+    {'padroes': ['mini led'], 'peso': 12, 'rotulo': '🎯 Mini LED'},
+    {'padroes': ['240hz'], 'peso': 8, 'rotulo': '⭐ 240Hz'},
+    {'padroes': ['2560x1600', '2560 x 1600'], 'peso': 8, 'rotulo': '⭐ Resolução'},
+    {'padroes': ['2023'], 'peso': 6, 'rotulo': '⭐ 2023'},
+    {'padroes': ['zephyrus m16'], 'peso': 12, 'rotulo': '🎯 Zephyrus M16'},
+    {'todos': ['asus', 'rog'], 'peso': 8, 'rotulo': '✓ ASUS ROG'}
+]
+
+# Casas Bahia, Ponto Frio e eBay não pontuam resolução nem ano
+REGRAS_SEM_RESOLUCAO = [r for r in REGRAS_BASE if r['rotulo'] not in ('⭐ Resolução', '⭐ 2023')]
+
+FAIXAS_PRECO_VAREJO = [
+    [2000, "🚨 EXTREMAMENTE SUSPEITO", 12],
+    [4000, "⚠️ MUITO SUSPEITO", 10],
+    [7000, "⚠️ SUSPEITO", 7],
+    [10000, "💰 PREÇO BAIXO", 4],
+    [None, "💰 PREÇO NORMAL", 0]
+]
+
+NIVEIS_ALERTA_PADRAO = [
+    [45, "🚨 ALERTA MÁXIMO"],
+    [35, "⚠️ ALERTA ALTO"],
+    [25, "⚠️ ALERTA MÉDIO"],
+    [None, "ℹ️ MONITORAR"]
+]
+
+PROBABILIDADES_VAREJO = [
+    [50, "95%+"],
+    [40, "80-95%"],
+    [30, "60-80%"],
+    [20, "40-60%"],
+    [None, "< 40%"]
+]
+
+PERFIS_PADRAO = {
+    'olx': {
+        'regras': REGRAS_BASE,
+        'faixas_preco': FAIXAS_PRECO_VAREJO,
+        'niveis_alerta': NIVEIS_ALERTA_PADRAO,
+        'probabilidades': [[45, "95%+"], [35, "80-95%"], [25, "60-80%"], [None, "30-60%"]]
+    },
+    'olx_regional': {
+        'regras': [
+            {'padroes': ['anime matrix'], 'peso': 20, 'rotulo': '🎯 AniMe Matrix'},
+            {'padroes': ['gu604'], 'peso': 20, 'rotulo': '🎯 GU604'},
+            {'padroes': ['mini led'], 'peso': 15, 'rotulo': '🎯 Mini LED'},
+            {'padroes': ['240hz'], 'peso': 10, 'rotulo': '⭐ 240Hz'},
+            {'padroes': ['2560x1600', '2560 x 1600', 'qhd'], 'peso': 10, 'rotulo': '⭐ Resolução QHD'},
+            {'padroes': ['2023'], 'peso': 8, 'rotulo': '⭐ 2023'},
+            {'padroes': ['zephyrus m16'], 'peso': 15, 'rotulo': '🎯 Zephyrus M16'},
+            {'todos': ['asus', 'rog'], 'peso': 10, 'rotulo': '✓ ASUS ROG'},
+            {'padroes': ['rtx 4070', 'rtx 4080'], 'peso': 12, 'rotulo': '🎮 RTX 40xx'},
+            {'padroes': ['ryzen 9'], 'peso': 10, 'rotulo': '⚡ Ryzen 9'},
+            {'padroes': ['32gb'], 'peso': 8, 'rotulo': '💾 32GB RAM'}
+        ],
+        'faixas_preco': [
+            [1500, "🚨 EXTREMAMENTE SUSPEITO", 15],
+            [3000, "🚨 MUITO SUSPEITO", 12],
+            [5500, "⚠️ SUSPEITO", 8],
+            [8000, "⚠️ PREÇO BAIXO", 5],
+            [12000, "💰 PREÇO RAZOÁVEL", 2],
+            [None, "💰 PREÇO ALTO", 0]
+        ],
+        'niveis_alerta': [
+            [50, "🚨 ALERTA MÁXIMO"],
+            [40, "🚨 ALERTA CRÍTICO"],
+            [30, "⚠️ ALERTA ALTO"],
+            [20, "⚠️ ALERTA MÉDIO"],
+            [None, "ℹ️ MONITORAR"]
+        ],
+        'probabilidades': [[55, "95%+"], [45, "85-95%"], [35, "70-85%"], [25, "50-70%"], [None, "< 50%"]]
+    },
+    'shopee': {
+        'regras': REGRAS_BASE,
+        'faixas_preco': [
+            [1500, "🚨 EXTREMAMENTE SUSPEITO", 12],
+            [3500, "⚠️ MUITO SUSPEITO", 10],
+            [6500, "⚠️ SUSPEITO", 7],
+            [9000, "💰 PREÇO BAIXO", 4],
+            [None, "💰 PREÇO NORMAL", 0]
+        ],
+        'niveis_alerta': NIVEIS_ALERTA_PADRAO,
+        'probabilidades': PROBABILIDADES_VAREJO
+    },
+    'magalu': {
+        'regras': REGRAS_BASE,
+        'faixas_preco': FAIXAS_PRECO_VAREJO,
+        'niveis_alerta': NIVEIS_ALERTA_PADRAO,
+        'probabilidades': PROBABILIDADES_VAREJO
+    },
+    'americanas': {
+        'regras': REGRAS_BASE,
+        'faixas_preco': FAIXAS_PRECO_VAREJO,
+        'niveis_alerta': NIVEIS_ALERTA_PADRAO,
+        'probabilidades': PROBABILIDADES_VAREJO
+    },
+    'casasbahia': {
+        'regras': REGRAS_SEM_RESOLUCAO,
+        'faixas_preco': FAIXAS_PRECO_VAREJO,
+        'niveis_alerta': NIVEIS_ALERTA_PADRAO,
+        'probabilidades': PROBABILIDADES_VAREJO
+    },
+    'pontofrio': {
+        'regras': REGRAS_SEM_RESOLUCAO,
+        'faixas_preco': FAIXAS_PRECO_VAREJO,
+        'niveis_alerta': NIVEIS_ALERTA_PADRAO,
+        'probabilidades': PROBABILIDADES_VAREJO
+    },
+    'enjoei': {
+        'regras': [
+            {'padroes': ['anime matrix'], 'peso': 20, 'rotulo': '🎯 AniMe Matrix'},
+            {'padroes': ['gu604'], 'peso': 20, 'rotulo': '🎯 GU604'},
+            {'padroes': ['mini led'], 'peso': 15, 'rotulo': '🎯 Mini LED'},
+            {'padroes': ['240hz'], 'peso': 10, 'rotulo': '⭐ 240Hz'},
+            {'padroes': ['2560x1600', '2560 x 1600'], 'peso': 10, 'rotulo': '⭐ Resolução'},
+            {'padroes': ['2023'], 'peso': 8, 'rotulo': '⭐ 2023'},
+            {'padroes': ['zephyrus m16'], 'peso': 15, 'rotulo': '🎯 Zephyrus M16'},
+            {'todos': ['asus', 'rog'], 'peso': 10, 'rotulo': '✓ ASUS ROG'},
+            {'padroes': ['novo', 'lacrado', 'nunca usado'], 'peso': -5, 'rotulo': "⚠️ Anunciado como 'novo'"}
+        ],
+        'faixas_preco': [
+            [1000, "🚨 EXTREMAMENTE SUSPEITO", 15],
+            [2500, "🚨 MUITO SUSPEITO", 12],
+            [4500, "⚠️ SUSPEITO", 8],
+            [7000, "⚠️ PREÇO BAIXO PARA USADO", 5],
+            [9000, "💰 PREÇO RAZOÁVEL USADO", 2],
+            [None, "💰 PREÇO ALTO PARA USADO", 0]
+        ],
+        'niveis_alerta': [
+            [50, "🚨 ALERTA MÁXIMO - ENJOEI"],
+            [40, "🚨 ALERTA CRÍTICO - ENJOEI"],
+            [30, "⚠️ ALERTA ALTO - ENJOEI"],
+            [20, "⚠️ ALERTA MÉDIO - ENJOEI"],
+            [None, "ℹ️ MONITORAR - ENJOEI"]
+        ],
+        'probabilidades': [[55, "98%+"], [45, "90-98%"], [35, "75-90%"], [25, "50-75%"], [None, "< 50%"]]
+    },
+    'ebay': {
+        'regras': [
+            {'padroes': ['brasil', 'brazil', 'são paulo', 'rio de janeiro'], 'peso': 5, 'rotulo': '🇧🇷 Brasil'}
+        ] + REGRAS_SEM_RESOLUCAO,
+        'faixas_preco': [
+            [3000, "🚨 EXTREMAMENTE SUSPEITO", 15],  # Muito baixo mesmo com importação
+            [5000, "🚨 MUITO SUSPEITO", 12],
+            [8000, "⚠️ SUSPEITO", 8],
+            [12000, "💰 PREÇO BAIXO", 4],
+            [20000, "💰 PREÇO NORMAL IMPORTADO", 2],
+            [None, "💰 PREÇO ALTO", 0]
+        ],
+        'niveis_alerta': [
+            [45, "🚨 ALERTA MÁXIMO - EBAY"],
+            [35, "⚠️ ALERTA ALTO - EBAY"],
+            [25, "⚠️ ALERTA MÉDIO - EBAY"],
+            [None, "ℹ️ MONITORAR - EBAY"]
+        ],
+        'probabilidades': [[50, "90%+"], [40, "75-90%"], [30, "50-75%"], [20, "25-50%"], [None, "< 25%"]]
+    },
+    'mercadolivre': {
+        # Regras e faixas de preço vêm de caracteristicas_unicas e preco_* do config.json
+        'niveis_alerta': [
+            [40, "🚨 ALERTA MÁXIMO"],
+            [30, "⚠️ ALERTA ALTO"],
+            [20, "⚠️ ALERTA MÉDIO"],
+            [None, "ℹ️ MONITORAR"]
+        ],
+        'probabilidades': PROBABILIDADES_VAREJO
+    }
+}
+
+CARACTERISTICAS_PADRAO = [
+    "anime matrix", "mini led", "240hz", "2560x1600",
+    "gu604", "2023", "tampa animada", "led matrix",
+    "nebula hdr", "rog intelligent cooling", "rtx 4070",
+    "rtx 4080", "ryzen 9", "ddr5", "32gb", "1tb ssd",
+    "dolby vision", "wifi 6e", "thunderbolt 4", "qhd",
+    "16 polegadas", "zephyrus m16", "rog zephyrus",
+    "gaming laptop", "keystone ii"
+]
+
+_perfis = {}
+_perfis_config = None
+_perfis_lock = threading.Lock()
+
+
+class PerfilScore:
+    """Perfil compilado de um site: motor de score e tabelas de faixas prontas para bisect"""
+
+    def __init__(self, site, perfil):
+        self.site = site
+        self.motor = compilar_motor(perfil['regras'])
+
+        faixas = sorted(perfil['faixas_preco'], key=lambda f: (f[0] is None, f[0] or 0))
+        self.limites_preco = [f[0] for f in faixas if f[0] is not None]
+        self.faixas_preco = [(f[1], f[2]) for f in faixas]
+
+        self.minimos_alerta, self.niveis_alerta = self._tabela_minimos(perfil['niveis_alerta'])
+        self.minimos_probabilidade, self.probabilidades = self._tabela_minimos(perfil['probabilidades'])
+
+    def _tabela_minimos(self, faixas):
+        """Ordena [mínimo, rótulo] de forma crescente, com o rótulo padrão na posição 0"""
+        padrao = [f[1] for f in faixas if f[0] is None]
+        faixas = sorted((f for f in faixas if f[0] is not None), key=lambda f: f[0])
+        return [f[0] for f in faixas], padrao[:1] + [f[1] for f in faixas]
+
+    def pontuar(self, texto):
+        """Retorna (score, características encontradas)"""
+        return self.motor.pontuar(texto)
+
+    def analisar_preco(self, preco):
+        """Retorna (suspeita, pontos) da faixa em que o preço cai"""
+        return self.faixas_preco[bisect_right(self.limites_preco, preco)]
+
+    def nivel_alerta(self, score_total):
+        """Nível de alerta correspondente ao score total"""
+        return self.niveis_alerta[bisect_right(self.minimos_alerta, score_total)]
+
+    def probabilidade(self, score_total):
+        """Probabilidade de match correspondente ao score total"""
+        return self.probabilidades[bisect_right(self.minimos_probabilidade, score_total)]
+
+
+def regras_caracteristicas(caracteristicas):
+    """Regras do Mercado Livre: peso por importância de cada característica única
+
+    As regras seguem a ordem de CARACTERISTICAS_PADRAO, qualquer que seja a ordem no config.json,
+    para que caracteristicas_encontradas saia sempre na mesma ordem; as desconhecidas vêm depois.
+    """
+    posicoes = {caracteristica: indice for indice, caracteristica in enumerate(CARACTERISTICAS_PADRAO)}
+    caracteristicas = [caracteristica.lower() for caracteristica in caracteristicas]
+    # sorted é estável: as desconhecidas mantêm a ordem do config
+    caracteristicas = sorted(caracteristicas, key=lambda c: posicoes.get(c, len(posicoes)))
+    regras = []
+    for caracteristica in caracteristicas:
+        if caracteristica in ["anime matrix", "gu604", "mini led"]:
+            regras.append({'padroes': [caracteristica], 'peso': 10, 'rotulo': f"🎯 {caracteristica}"})  # Características muito específicas
+        elif caracteristica in ["240hz", "2560x1600", "2023"]:
+            regras.append({'padroes': [caracteristica], 'peso': 7, 'rotulo': f"⭐ {caracteristica}"})  # Características importantes
+        else:
+            regras.append({'padroes': [caracteristica], 'peso': 3, 'rotulo': f"✓ {caracteristica}"})  # Características secundárias
+
+    regras.append({'padroes': ["zephyrus m16"], 'peso': 15, 'rotulo': "🎯 Modelo Exato"})
+    regras.append({'todos': ["asus", "rog"], 'peso': 10, 'rotulo': "✓ Marca/Linha"})
+    return regras
+
+
+def faixas_preco_config(config):
+    """Faixas do Mercado Livre usando preco_muito_suspeito e preco_suspeito_max do config"""
+    muito_suspeito = config.get('preco_muito_suspeito', 5000)
+    suspeito = config.get('preco_suspeito_max', 8000)
+    return [
+        [min(3000, muito_suspeito), "🚨 EXTREMAMENTE SUSPEITO", 10],
+        [muito_suspeito, "⚠️ MUITO SUSPEITO", 8],
+        [suspeito, "⚠️ SUSPEITO", 5],
+        [max(12000, suspeito), "💰 PREÇO BAIXO", 3],
+        [None, "💰 PREÇO NORMAL", 0]
+    ]
+
+
+def montar_perfil(site, config):
+    """Combina o perfil padrão do site com o bloco perfis_score do config.json"""
+    perfil = dict(PERFIS_PADRAO.get(site, PERFIS_PADRAO['olx']))
+    if site == 'mercadolivre':
+        perfil['regras'] = regras_caracteristicas(config.get('caracteristicas_unicas') or CARACTERISTICAS_PADRAO)
+        perfil['faixas_preco'] = faixas_preco_config(config)
+    perfil.update(config.get('perfis_score', {}).get(site, {}))
+    return PerfilScore(site, perfil)
+
+
+def obter_perfil(site):
+    """Perfil compilado do site; só é remontado quando o config.json muda"""
+    global _perfis_config
+    config = carregar_config()
+    with _perfis_lock:
+        # carregar_config devolve o mesmo objeto enquanto o arquivo não muda
+        if config is not _perfis_config:
+            _perfis.clear()
+            _perfis_config = config
+        perfil = _perfis.get(site)
+        if perfil is None:
+            perfil = _perfis[site] = montar_perfil(site, config)
+        return perfil
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# registro_ndjson.py - Registro append-only dos resultados em NDJSON, com segmentos comprimidos
+
+import glob
+import gzip
+import io
+import json
+import os
+import threading
+from datetime import datetime
+
+from configuracao import BASE_DIR, carregar_config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # Sem o pacote, os segmentos saem em gzip
+
+REGISTRO_DIR = f"{BASE_DIR}/resultados/ndjson"
+TAMANHO_SEGMENTO_MB = 8
+
+_registros = {}
+_registros_lock = threading.Lock()
+
+
+def config_registro():
+    """Bloco registro_ndjson do config.json"""
+    return carregar_config().get('registro_ndjson', {})
+
+
+def registro_ativo():
+    return config_registro().get('ativo', False)
+
+
+def abrir_segmento(caminho):
+    """Abre um segmento (.ndjson, .ndjson.gz ou .ndjson.zst) para leitura de texto em fluxo"""
+    if caminho.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("pacote zstandard não instalado (pip install zstandard)")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(caminho, 'rb'), closefd=True),
+                                encoding='utf-8')
+    if caminho.endswith('.gz'):
+        return gzip.open(caminho, 'rt', encoding='utf-8')
+    return open(caminho, 'r', encoding='utf-8')
+
+
+class RegistroNDJSON:
+    """Acrescenta uma linha por candidato ao arquivo atual e o comprime ao passar do tamanho do segmento"""
+
+    def __init__(self, diretorio=REGISTRO_DIR, tamanho_segmento_mb=TAMANHO_SEGMENTO_MB):
+        self.diretorio = diretorio
+        self.tamanho_segmento = tamanho_segmento_mb * 1024 * 1024
+        self.atual = f"{diretorio}/atual.ndjson"
+        self.lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def acrescentar(self, site, candidatos, executado_em=None):
+        """Grava os candidatos de uma execução (uma linha JSON compacta por candidato)"""
+        executado_em = executado_em or datetime.now().isoformat()
+        linhas = ''.join(
+            json.dumps({'monitor': site, 'observado_em': executado_em, 'dados': candidato},
+                       ensure_ascii=False, separators=(',', ':'), default=str) + '\n'
+            for candidato in candidatos
+        )
+        with self.lock:
+            with open(self.atual, 'a', encoding='utf-8') as f:
+                f.write(linhas)
+                tamanho = f.tell()
+            if tamanho >= self.tamanho_segmento:
+                self.rolar()
+
+    def rolar(self):
+        """Comprime o arquivo atual num segmento fechado (chamado com o lock)"""
+        if not os.path.exists(self.atual) or not os.path.getsize(self.atual):
+            return None
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        if zstandard is not None:
+            segmento = f"{self.diretorio}/segmento_{timestamp}.ndjson.zst"
+            with open(self.atual, 'rb') as origem, open(segmento, 'wb') as destino:
+                zstandard.ZstdCompressor(level=10).copy_stream(origem, destino)
+        else:
+            segmento = f"{self.diretorio}/segmento_{timestamp}.ndjson.gz"
+            with open(self.atual, 'rb') as origem, gzip.open(segmento, 'wb', compresslevel=6) as destino:
+                while True:
+                    bloco = origem.read(1024 * 1024)
+                    if not bloco:
+                        break
+                    destino.write(bloco)
+        os.remove(self.atual)
+        return segmento
+
+    def fechar_segmento(self):
+        """Comprime o que houver no arquivo atual, mesmo abaixo do tamanho do segmento"""
+        with self.lock:
+            return self.rolar()
+
+    def segmentos(self):
+        """Segmentos fechados em ordem cronológica, seguidos do arquivo atual"""
+        caminhos = sorted(glob.glob(f"{self.diretorio}/segmento_*.ndjson*"))
+        if os.path.exists(self.atual):
+            caminhos.append(self.atual)
+        return caminhos
+
+    def ler(self, site=None, desde=None):
+        """Gerador de (monitor, observado_em, candidato), um segmento por vez, sem carregar tudo"""
+        desde = desde.isoformat() if isinstance(desde, datetime) else desde
+        for caminho in self.segmentos():
+            try:
+                with abrir_segmento(caminho) as f:
+                    for linha in f:
+                        if not linha.strip():
+                            continue
+                        registro = json.loads(linha)
+                        if site and registro['monitor'] != site:
+                            continue
+                        if desde and registro['observado_em'] < desde:
+                            continue
+                        yield registro['monitor'], registro['observado_em'], registro['dados']
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f"⚠️ Ignorando {os.path.basename(caminho)}: {e}")
+
+
+def obter_registro(diretorio=REGISTRO_DIR):
+    """Registro compartilhado pelo processo"""
+    with _registros_lock:
+        registro = _registros.get(diretorio)
+        if registro is None:
+            tamanho = config_registro().get('tamanho_segmento_mb', TAMANHO_SEGMENTO_MB)
+            registro = _registros[diretorio] = RegistroNDJSON(diretorio, tamanho)
+        return registro
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# score_lote.py - Pontuação vetorizada (NumPy) de muitos anúncios de uma vez
+
+import json
+import sys
+import threading
+import time
+import weakref
+from datetime import datetime
+from itertools import compress
+
+import numpy as np
+
+from armazenamento import SITES_ARQUIVOS, desde_dias, obter_armazenamento
+from configuracao import BASE_DIR
+from perfis_score import obter_perfil
+
+_lotes = weakref.WeakKeyDictionary()
+_lotes_lock = threading.Lock()
+
+
+class ScoreLote:
+    """Pontua lotes de anúncios com um perfil: matriz de características e searchsorted nas faixas"""
+
+    def __init__(self, perfil):
+        self.perfil = perfil
+        regras = perfil.motor.regras
+        self.padroes = perfil.motor.padroes
+        indice_padrao = {padrao: j for j, padrao in enumerate(self.padroes)}
+
+        # Matriz regra x padrão; uma regra "todos" exige todos os seus padrões, as demais só um
+        self.regras_padroes = np.zeros((len(regras), len(self.padroes)), dtype=np.int32)
+        for i, (padroes, todos, peso, rotulo) in enumerate(regras):
+            for padrao in padroes:
+                self.regras_padroes[i, indice_padrao[padrao]] = 1
+        self.exigidos = np.array([len(r[0]) if r[1] else 1 for r in regras], dtype=np.int32)
+        self.pesos = np.array([r[2] for r in regras], dtype=np.int64)
+        self.rotulos = [r[3] for r in regras]
+
+        self.limites_preco = np.array(perfil.limites_preco, dtype=float)
+        self.pontos_preco = np.array([f[1] for f in perfil.faixas_preco], dtype=np.int64)
+        self.minimos_alerta = np.array(perfil.minimos_alerta, dtype=float)
+        self.minimos_probabilidade = np.array(perfil.minimos_probabilidade, dtype=float)
+
+    def matriz_caracteristicas(self, textos):
+        """Matriz booleana anúncio x padrão: True onde o padrão aparece no texto"""
+        # Busca de substring nativa do Python; np.char.find sobre arrays UCS4 sai mais lento
+        textos = [texto.lower() for texto in textos]
+        acertos = np.fromiter(
+            (padrao in texto for texto in textos for padrao in self.padroes),
+            dtype=bool, count=len(textos) * len(self.padroes)
+        )
+        return acertos.reshape(len(textos), len(self.padroes))
+
+    def pontuar(self, textos, precos, score_minimo=None, score_preco_minimo=None):
+        """Lista de (índice, campos de score) dos anúncios que passam no filtro de score
+
+        Sem limites, todos os anúncios entram; com eles, vale o mesmo critério dos
+        filtrar_candidatos_*: score >= score_minimo OU score_preco >= score_preco_minimo.
+        """
+        if not textos:
+            return []
+
+        matriz = self.matriz_caracteristicas(textos)
+        regras_ok = matriz.astype(np.int32) @ self.regras_padroes.T >= self.exigidos
+        scores = regras_ok @ self.pesos
+
+        faixas = np.searchsorted(self.limites_preco, np.asarray(precos, dtype=float), side='right')
+        scores_preco = self.pontos_preco[faixas]
+        totais = scores + scores_preco
+        alertas = np.searchsorted(self.minimos_alerta, totais, side='right')
+        probabilidades = np.searchsorted(self.minimos_probabilidade, totais, side='right')
+
+        if score_minimo is None and score_preco_minimo is None:
+            indices = np.arange(len(textos))
+        else:
+            aprovados = np.zeros(len(textos), dtype=bool)
+            if score_minimo is not None:
+                aprovados |= scores >= score_minimo
+            if score_preco_minimo is not None:
+                aprovados |= scores_preco >= score_preco_minimo
+            indices = np.flatnonzero(aprovados)
+
+        # Só a montagem dos dicts é por anúncio, e só para os aprovados
+        suspeitas = [f[0] for f in self.perfil.faixas_preco]
+        resultados = []
+        for indice, score, score_preco, total, linha, faixa, alerta, probabilidade in zip(
+            indices.tolist(), scores[indices].tolist(), scores_preco[indices].tolist(),
+            totais[indices].tolist(), regras_ok[indices].tolist(), faixas[indices].tolist(),
+            alertas[indices].tolist(), probabilidades[indices].tolist()
+        ):
+            resultados.append((indice, {
+                'score_similaridade': score,
+                'score_preco': score_preco,
+                'score_total': total,
+                'caracteristicas_encontradas': list(compress(self.rotulos, linha)),
+                'suspeita_preco': suspeitas[faixa],
+                'nivel_alerta': self.perfil.niveis_alerta[alerta],
+                'probabilidade_match': self.perfil.probabilidades[probabilidade]
+            }))
+        return resultados
+
+
+def lote_do_perfil(perfil):
+    """ScoreLote do perfil, montado uma vez enquanto o perfil estiver em uso"""
+    with _lotes_lock:
+        lote = _lotes.get(perfil)
+        if lote is None:
+            lote = _lotes[perfil] = ScoreLote(perfil)
+        return lote
+
+
+def pontuar_lote(perfil, textos, precos, score_minimo=None, score_preco_minimo=None):
+    """Pontua todos os anúncios de uma vez com o perfil do site"""
+    return lote_do_perfil(perfil).pontuar(textos, precos, score_minimo, score_preco_minimo)
+
+
+def texto_do_anuncio(site, anuncio):
+    """Texto pontuado pelo monitor do site, com a descrição quando o anúncio foi enriquecido"""
+    texto = anuncio.get('titulo', '')
+    if site == 'ebay':
+        texto += " " + anuncio.get('localizacao', '')
+    if anuncio.get('descricao'):
+        texto += " " + anuncio['descricao']
+    return texto
+
+
+def reprocessar_historico(dias=None):
+    """Repontua os resultados salvos com os perfis atuais do config.json"""
+    armazenamento = obter_armazenamento()
+    desde = desde_dias(dias) if dias is not None else None
+    anuncios_por_site = {}
+    for site in SITES_ARQUIVOS.values():
+        anuncios = armazenamento.consultar(site=site, desde=desde)
+        if anuncios:
+            anuncios_por_site[site] = anuncios
+
+    inicio = time.perf_counter()
+    reprocessados = []
+    mudancas = 0
+    for site, anuncios in anuncios_por_site.items():
+        pontuacoes = pontuar_lote(
+            obter_perfil(site),
+            [texto_do_anuncio(site, a) for a in anuncios],
+            [a.get('preco') or 0 for a in anuncios]
+        )
+        for indice, pontuacao in pontuacoes:
+            anuncio = anuncios[indice]
+            if anuncio.get('nivel_alerta') != pontuacao['nivel_alerta']:
+                mudancas += 1
+            anuncio.update(pontuacao)
+            reprocessados.append(anuncio)
+    duracao = time.perf_counter() - inicio
+
+    reprocessados.sort(key=lambda x: x['score_total'], reverse=True)
+    print(f"⚡ {len(reprocessados)} observação(ões) de {len(anuncios_por_site)} site(s) repontuadas em {duracao:.2f}s")
+    print(f"🔄 {mudancas} mudaram de nível de alerta")
+
+    for i, anuncio in enumerate(reprocessados[:10], 1):
+        print(f"{i:2d}. [{anuncio['score_total']}] {anuncio['nivel_alerta']} - {anuncio.get('titulo', '')[:60]}")
+
+    if not reprocessados:
+        return None
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    arquivo_saida = f"{BASE_DIR}/reprocessamento_{timestamp}.json"
+    with open(arquivo_saida, 'w', encoding='utf-8') as f:
+        json.dump(reprocessados, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Histórico repontuado salvo em: {arquivo_saida}")
+    return arquivo_saida
+
+# Execução principal
+if __name__ == "__main__":
+    print("⚡ === REPONTUAÇÃO DO HISTÓRICO ===")
+    reprocessar_historico(int(sys.argv[1]) if len(sys.argv) > 1 else None)
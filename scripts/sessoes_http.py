@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# sessoes_http.py - Sessões HTTP com pool de conexões keep-alive compartilhadas pelos monitores
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from configuracao import carregar_config
+
+# pool_conexoes: quantos hosts mantêm pool próprio; pool_max: conexões abertas por host
+POOL_PADRAO = {'pool_conexoes': 10, 'pool_max': 10}
+
+_sessoes = {}
+_sessoes_lock = threading.Lock()
+
+
+def configuracao_pool():
+    """Tamanhos de pool do config.json (bloco sessoes_http), com valores padrão"""
+    pool = dict(POOL_PADRAO)
+    pool.update(carregar_config().get('sessoes_http', {}))
+    return pool
+
+
+def criar_sessao(headers=None, pool_conexoes=None, pool_max=None):
+    """Cria uma sessão requests com pool de conexões keep-alive por host"""
+    pool = configuracao_pool()
+    adaptador = HTTPAdapter(
+        pool_connections=pool_conexoes or pool['pool_conexoes'],
+        pool_maxsize=pool_max or pool['pool_max']
+    )
+
+    sessao = requests.Session()
+    sessao.mount('https://', adaptador)
+    sessao.mount('http://', adaptador)
+    if headers:
+        sessao.headers.update(headers)
+    return sessao
+
+
+def obter_sessao(site, headers=None, pool_conexoes=None):
+    """Retorna a sessão compartilhada do site, aplicando os headers do monitor"""
+    with _sessoes_lock:
+        sessao = _sessoes.get(site)
+        if sessao is None:
+            sessao = _sessoes[site] = criar_sessao(headers, pool_conexoes=pool_conexoes)
+        elif headers:
+            sessao.headers.update(headers)
+        return sessao
+
+
+def fechar_sessoes():
+    """Fecha todas as sessões abertas e libera as conexões"""
+    with _sessoes_lock:
+        for sessao in _sessoes.values():
+            sessao.close()
+        _sessoes.clear()
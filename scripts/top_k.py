@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# top_k.py - Seleção dos K melhores candidatos em fluxo, com heap de tamanho K
+
+import heapq
+from itertools import count
+
+
+def score_total(candidato):
+    return candidato.get('score_total', 0) or 0
+
+
+class SeletorTopK:
+    """Guarda só os K maiores itens vistos até agora; empates ficam com o que chegou primeiro"""
+
+    def __init__(self, k, chave=score_total):
+        self.k = k
+        self.chave = chave
+        self.heap = []
+        self.sequencia = count()
+
+    def adicionar(self, item):
+        # A sequência negativa desempata a favor do mais antigo e evita comparar os itens
+        entrada = (self.chave(item), -next(self.sequencia), item)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entrada)
+        elif entrada > self.heap[0]:
+            heapq.heapreplace(self.heap, entrada)
+
+    def consumir(self, itens):
+        """Consome um iterável (lista, gerador, cursor) sem materializá-lo"""
+        for item in itens:
+            self.adicionar(item)
+        return self
+
+    def resultado(self):
+        """Os K itens em ordem decrescente, como sorted(..., reverse=True)[:k]"""
+        return [item for _, _, item in sorted(self.heap, reverse=True)]
+
+
+def top_k(itens, k, chave=score_total):
+    """Os K maiores itens de um iterável, consumido uma única vez"""
+    return SeletorTopK(k, chave).consumir(itens).resultado()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# varredura_paginada.py - Varredura das páginas seguintes de cada busca, com fronteira de prioridade limitada
+
+import heapq
+from itertools import count
+from urllib.parse import urlsplit
+
+from busca_assincrona import fetch_many
+from configuracao import carregar_config
+from extracoes import extrair_pagina
+from indice_vistos import fracao_inedita
+from limitador_taxa import limites_do_host
+
+# max_paginas: profundidade por termo; paginas_extras: requisições além da página 1 de cada termo
+# por varredura; max_fronteira: páginas pendentes guardadas (as de menor prioridade são descartadas)
+VARREDURA_PADRAO = {'ativo': False, 'max_paginas': 5, 'paginas_extras': 20, 'max_fronteira': 50, 'sites': {}}
+
+
+def config_varredura(site):
+    """Bloco varredura_profunda do config.json para o site: padrão global sobrescrito por sites.<site>"""
+    varredura = dict(VARREDURA_PADRAO)
+    varredura.update(carregar_config().get('varredura_profunda', {}))
+    varredura.update(varredura.pop('sites').get(site, {}))
+    return varredura
+
+
+class Fronteira:
+    """Páginas a buscar num heap: primeiro as que seguem páginas com mais anúncios inéditos, depois as mais rasas"""
+
+    def __init__(self, limite):
+        self.limite = limite
+        self.heap = []
+        self.sequencia = count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def adicionar(self, termo, pagina, requisicao, fracao_inedita=1.0):
+        heapq.heappush(self.heap, (-fracao_inedita, pagina, next(self.sequencia), termo, requisicao))
+        if len(self.heap) > self.limite:
+            # Cheia: sai a entrada de menor prioridade
+            self.heap.remove(max(self.heap))
+            heapq.heapify(self.heap)
+
+    def retirar(self, quantidade):
+        """Até `quantidade` entradas (termo, página, requisição), da mais prioritária para a menos"""
+        retiradas = []
+        while self.heap and len(retiradas) < quantidade:
+            _, pagina, _, termo, requisicao = heapq.heappop(self.heap)
+            retiradas.append((termo, pagina, requisicao))
+        return retiradas
+
+
+def requisicao_da_pagina(requisicao, parametro_pagina, pagina):
+    """Cópia da requisição da página 1 apontando para outra página"""
+    return {**requisicao, 'params': {**requisicao.get('params', {}), parametro_pagina: str(pagina)}}
+
+
+def paginas_por_rodada(requisicao):
+    """Páginas buscadas juntas a cada rodada: o que o host aceita sem esperar (rajada ou conexões simultâneas)"""
+    limites = limites_do_host(urlsplit(requisicao['url']).hostname or '')
+    return max(1, int(limites['rajada']), int(limites.get('simultaneas', 1)))
+
+
+def varrer_paginas(site, termos, requisicoes, headers, extrair, parametro_pagina):
+    """Anúncios das páginas de busca de cada termo, seguindo para as próximas páginas enquanto trazem inéditos
+
+    `requisicoes` são as da página 1 de cada termo, buscadas todas na primeira rodada. Um termo
+    avança para a página seguinte só se a atual trouxe algum anúncio fora do índice de vistos;
+    as páginas seguintes disputam o limite de paginas_extras pela fronteira, em rodadas do tamanho
+    que o host aceita. Com a varredura profunda desligada, só a página 1 é buscada.
+    """
+    varredura = config_varredura(site)
+    max_paginas = varredura['max_paginas'] if varredura['ativo'] else 1
+    extras_restantes = varredura['paginas_extras'] if varredura['ativo'] else 0
+
+    fronteira = Fronteira(max(varredura['max_fronteira'], len(termos)))
+    for termo, requisicao in zip(termos, requisicoes):
+        fronteira.adicionar(termo, 1, requisicao)
+    rodada = len(fronteira)
+
+    anuncios_todos = []
+    paginas_buscadas = 0
+    while fronteira:
+        lote = fronteira.retirar(rodada)
+        paginas_buscadas += len(lote)
+        respostas = fetch_many(site, [requisicao for _, _, requisicao in lote], headers=headers)
+
+        for (termo, pagina, requisicao), response in zip(lote, respostas):
+            if isinstance(response, Exception):
+                print(f"❌ Erro na busca {site} '{termo}' (página {pagina}): {response}")
+                continue
+            if response.status_code != 200:
+                print(f"❌ Erro HTTP {response.status_code} para '{termo}' (página {pagina})")
+                continue
+
+            anuncios = extrair_pagina(site, response, extrair, termo, pagina=pagina)
+            anuncios_todos.extend(anuncios)
+            if pagina >= max_paginas:
+                continue
+
+            # Página só com anúncios já vistos: as seguintes, mais antigas, também já foram vistas
+            inedita = fracao_inedita(site, anuncios)
+            if inedita > 0:
+                fronteira.adicionar(termo, pagina + 1, requisicao_da_pagina(requisicao, parametro_pagina, pagina + 1),
+                                    inedita)
+            elif pagina > 1:
+                print(f"🛑 {site} '{termo}': página {pagina} sem inéditos, parando")
+
+        if not extras_restantes:
+            break
+        rodada = min(paginas_por_rodada(lote[0][2]), extras_restantes)
+        extras_restantes -= min(rodada, len(fronteira))
+
+    if varredura['ativo']:
+        print(f"📄 {site}: {paginas_buscadas} página(s) varrida(s) para {len(termos)} termo(s)")
+    return anuncios_todos
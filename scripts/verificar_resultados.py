@@ -1,59 +1,58 @@
 #!/usr/bin/env python3
 # verificar_resultados.py - Análise dos resultados
 
-import json
-import glob
-import os
-from datetime import datetime
+from bisect import bisect_right
+from collections import Counter
+
+from armazenamento import obter_armazenamento
+from top_k import SeletorTopK
+
+# Faixas de score contadas: [20, 30) médio, [30, 35) alto, 35+ máximo
+LIMITES_FAIXAS = [20, 30, 35]
+FAIXAS = [None, 'medios', 'altos', 'maximos']
+
+
+def resumir(linhas, k=5):
+    """Uma passada pelas linhas: total, contagem por faixa de score e os k maiores scores"""
+    faixas = Counter()
+    seletor = SeletorTopK(k, chave=lambda linha: linha['score_total'] or 0)
+    total = 0
+    for linha in linhas:
+        total += 1
+        faixas[FAIXAS[bisect_right(LIMITES_FAIXAS, linha['score_total'] or 0)]] += 1
+        seletor.adicionar(linha)
+    return total, faixas, seletor.resultado()
+
 
 def analisar_resultados():
-    base_dir = os.path.expanduser("~/monitor_asus_rog")
-    arquivos = glob.glob(f"{base_dir}/resultados/*.json")
+    armazenamento = obter_armazenamento()
     
-    if not arquivos:
+    # Gerador de linhas resumidas do banco -> contagens e top 5, sem montar lista nenhuma
+    total, faixas, top_linhas = resumir(armazenamento.iterar_resumos())
+    
+    if not total:
         print("📭 Nenhum resultado encontrado ainda.")
+        print("💡 Resultados antigos em JSON: python3 armazenamento.py importar")
         return
     
-    print(f"📊 Analisando {len(arquivos)} arquivo(s) de resultados...")
-    
-    todos_candidatos = []
-    for arquivo in sorted(arquivos):
-        try:
-            with open(arquivo, 'r') as f:
-                dados = json.load(f)
-                if isinstance(dados, list):
-                    todos_candidatos.extend(dados)
-                else:
-                    todos_candidatos.append(dados)
-        except:
-            continue
-    
-    if not todos_candidatos:
-        print("📭 Nenhum candidato encontrado nos arquivos.")
-        return
+    print(f"📊 Analisando resultados em {armazenamento.caminho}...")
     
     # Estatísticas
     print(f"\n📈 ESTATÍSTICAS:")
-    print(f"   Total de candidatos: {len(todos_candidatos)}")
-    
-    alertas_maximos = [c for c in todos_candidatos if c.get('score_total', 0) >= 35]
-    alertas_altos = [c for c in todos_candidatos if 30 <= c.get('score_total', 0) < 35]
-    alertas_medios = [c for c in todos_candidatos if 20 <= c.get('score_total', 0) < 30]
+    print(f"   Total de candidatos: {total}")
     
-    print(f"   🚨 Alertas Máximos: {len(alertas_maximos)}")
-    print(f"   ⚠️ Alertas Altos: {len(alertas_altos)}")
-    print(f"   ⚠️ Alertas Médios: {len(alertas_medios)}")
+    print(f"   🚨 Alertas Máximos: {faixas['maximos']}")
+    print(f"   ⚠️ Alertas Altos: {faixas['altos']}")
+    print(f"   ⚠️ Alertas Médios: {faixas['medios']}")
     
-    # Mostrar top 5 candidatos
-    candidatos_ordenados = sorted(todos_candidatos, 
-                                 key=lambda x: x.get('score_total', 0), 
-                                 reverse=True)
+    # Mostrar top 5 candidatos (só eles têm o JSON completo carregado)
+    candidatos_ordenados = armazenamento.candidatos_por_id(linha['id'] for linha in top_linhas)
     
     print(f"\n🏆 TOP 5 CANDIDATOS:")
-    for i, candidato in enumerate(candidatos_ordenados[:5], 1):
+    for i, candidato in enumerate(candidatos_ordenados, 1):
         print(f"\n{i}. {candidato.get('nivel_alerta', 'N/A')} (Score: {candidato.get('score_total', 0)})")
         print(f"   {candidato.get('titulo', 'N/A')}")
         print(f"   R$ {candidato.get('preco', 0):,} - {candidato.get('site', 'N/A')}")
 
 if __name__ == "__main__":
-    analisar_resultados()
\ No newline at end of file
+    analisar_resultados()
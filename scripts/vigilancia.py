@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# vigilancia.py - Lista de anúncios vigiados: verificação frequente com GET condicional e eventos no banco
+
+import asyncio
+import hashlib
+import sys
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from armazenamento import desde_dias, obter_armazenamento
+from busca_assincrona import fetch_many_async
+from configuracao import carregar_config
+from enriquecimento import HEADERS_PADRAO, extrair_detalhes
+from extracoes import digest_pagina
+
+CHAVE_VIGILANCIA = 'vigilancia'
+
+# intervalo_minutos: frequência no daemon; adicionar_alertas: candidatos que geram alerta entram na lista
+VIGILANCIA_PADRAO = {'ativo': True, 'intervalo_minutos': 10, 'adicionar_alertas': True}
+
+# Host -> site, para a sessão HTTP e a chave do anúncio (casando por sufixo, como os limites de taxa)
+SITES_HOSTS = {
+    'olx.com.br': 'olx',
+    'mercadolivre.com.br': 'mercadolivre',
+    'enjoei.com.br': 'enjoei',
+    'ebay.com': 'ebay',
+    'shopee.com.br': 'shopee',
+    'magazineluiza.com.br': 'magalu',
+    'americanas.com.br': 'americanas',
+    'casasbahia.com.br': 'casasbahia',
+    'pontofrio.com.br': 'pontofrio'
+}
+
+# Respostas que indicam anúncio removido
+STATUS_REMOVIDO = (404, 410)
+
+
+def config_vigilancia():
+    """Bloco vigilancia do config.json, com valores padrão"""
+    vigilancia = dict(VIGILANCIA_PADRAO)
+    vigilancia.update(carregar_config().get('vigilancia', {}))
+    return vigilancia
+
+
+def site_da_url(url):
+    host = urlsplit(url).hostname or ''
+    for sufixo, site in SITES_HOSTS.items():
+        if host == sufixo or host.endswith('.' + sufixo):
+            return site
+    return CHAVE_VIGILANCIA
+
+
+def hash_texto(texto):
+    return hashlib.sha1((texto or '').encode('utf-8')).hexdigest()
+
+
+def comparar(vigiado, detalhes, agora):
+    """(novo estado, eventos) a partir da página atual do anúncio e do último estado guardado"""
+    estado = {
+        'titulo': detalhes['titulo'],
+        # Preço não encontrado na página: mantém o último, sem gerar evento
+        'preco': detalhes['preco'] or vigiado['preco'],
+        'hash_descricao': hash_texto(detalhes['descricao']),
+        'verificado_em': agora
+    }
+    if vigiado['verificado_em'] is None:
+        # Primeira verificação: só registra o ponto de partida
+        estado['alterado_em'] = agora
+        return estado, [('inicio', {'titulo': detalhes['titulo'], 'preco': estado['preco']})]
+
+    eventos = []
+    if estado['preco'] != vigiado['preco']:
+        eventos.append(('preco', {'anterior': vigiado['preco'], 'atual': estado['preco']}))
+    campos = [campo for campo in ('titulo', 'hash_descricao') if estado[campo] != vigiado[campo]]
+    if campos:
+        eventos.append(('edicao', {
+            'campos': ['descricao' if campo == 'hash_descricao' else campo for campo in campos],
+            'titulo_anterior': vigiado['titulo'],
+            'titulo': estado['titulo']
+        }))
+    if eventos:
+        estado['alterado_em'] = agora
+    return estado, eventos
+
+
+async def _buscar_todos(por_site):
+    """Respostas de todos os vigiados: sites diferentes em paralelo no mesmo loop"""
+    respostas = await asyncio.gather(*(
+        fetch_many_async(site, [{'url': v['url'], 'timeout': 15} for v in vigiados], HEADERS_PADRAO)
+        for site, vigiados in por_site.items()
+    ))
+    return zip(por_site.values(), respostas)
+
+
+def verificar_vigiados(armazenamento=None):
+    """Verifica todos os vigiados ativos e retorna os eventos gerados, como (vigiado, tipo, dados)
+
+    Página cujo corpo (sem trechos voláteis) bate com o hash guardado no próprio vigiado nem é
+    analisada; o cache HTTP só evita baixar de novo o que não mudou.
+    """
+    armazenamento = armazenamento or obter_armazenamento()
+    por_site = {}
+    for vigiado in armazenamento.vigiados():
+        por_site.setdefault(vigiado['site'], []).append(vigiado)
+    if not por_site:
+        return []
+
+    agora = datetime.now().isoformat()
+    verificacoes = []
+    for vigiados, respostas in asyncio.run(_buscar_todos(por_site)):
+        for vigiado, response in zip(vigiados, respostas):
+            if isinstance(response, Exception):
+                print(f"❌ Erro ao verificar {vigiado['url']}: {response}")
+                continue
+            if response.status_code in STATUS_REMOVIDO:
+                verificacoes.append((vigiado, {'situacao': 'removido', 'verificado_em': agora, 'alterado_em': agora},
+                                     [('removido', {'status': response.status_code, 'titulo': vigiado['titulo'],
+                                                    'preco': vigiado['preco']})]))
+            elif response.status_code != 200:
+                print(f"❌ Erro HTTP {response.status_code} em {vigiado['url']}")
+            else:
+                hash_corpo = digest_pagina(response.text)
+                if hash_corpo == vigiado['hash_corpo'] and vigiado['verificado_em'] is not None:
+                    # Mesmo corpo da última verificação do vigiado: nem analisa
+                    verificacoes.append((vigiado, {'verificado_em': agora}, []))
+                    continue
+                detalhes = extrair_detalhes(response.text, vigiado['site'])
+                if not detalhes['titulo'] and not detalhes['descricao']:
+                    # Página fora do formato esperado (bloqueio, redirecionamento): não conta como edição
+                    print(f"⚠️ Página sem título nem descrição: {vigiado['url']}")
+                    verificacoes.append((vigiado, {'verificado_em': agora}, []))
+                    continue
+                estado, eventos = comparar(vigiado, detalhes, agora)
+                estado['hash_corpo'] = hash_corpo
+                verificacoes.append((vigiado, estado, eventos))
+
+    armazenamento.registrar_verificacoes(verificacoes)
+    return [(vigiado, tipo, dados) for vigiado, _, eventos in verificacoes for tipo, dados in eventos]
+
+
+def descrever_evento(tipo, dados):
+    """Linha curta para mostrar um evento"""
+    if tipo == 'preco':
+        return f"💰 preço R$ {dados['anterior'] or 0:,.0f} -> R$ {dados['atual'] or 0:,.0f}"
+    if tipo == 'edicao':
+        return f"✏️ editado ({', '.join(dados['campos'])})"
+    if tipo == 'removido':
+        return f"🗑️ removido (HTTP {dados['status']})"
+    return f"👁️ vigiando: {dados.get('titulo') or '-'} (R$ {dados.get('preco') or 0:,.0f})"
+
+
+def vigiar_candidatos(site, candidatos, motivo='alerta'):
+    """Põe os candidatos na lista de vigiados; retorna quantos entraram agora"""
+    armazenamento = obter_armazenamento()
+    return sum(armazenamento.vigiar(c['url'], site, motivo) for c in candidatos if c.get('url'))
+
+
+class MonitorVigilancia:
+    """Interface de monitor para o daemon: a busca verifica os vigiados e devolve os eventos"""
+
+    def verificar(self):
+        return verificar_vigiados()
+
+    def resumir(self, eventos):
+        """Os eventos já estão no banco; só informa quantos foram"""
+        return f"{len(eventos)} evento(s) na tabela eventos"
+
+# Execução principal
+if __name__ == "__main__":
+    comando = sys.argv[1] if len(sys.argv) > 1 else ''
+    armazenamento = obter_armazenamento()
+
+    if comando == 'adicionar' and len(sys.argv) > 2:
+        url = sys.argv[2]
+        nova = armazenamento.vigiar(url, site_da_url(url), sys.argv[3] if len(sys.argv) > 3 else None)
+        print(f"👁️ {'Vigiando' if nova else 'Já vigiado (reativado)'}: {url}")
+    elif comando == 'remover' and len(sys.argv) > 2:
+        print(f"🧹 {armazenamento.deixar_de_vigiar(sys.argv[2])} URL(s) removida(s) da lista")
+    elif comando == 'listar':
+        for vigiado in armazenamento.vigiados(situacao=None):
+            preco = f"R$ {vigiado['preco']:,.0f}" if vigiado['preco'] else '-'
+            print(f"[{vigiado['situacao']}] {preco} {vigiado['titulo'] or '(não verificado)'} - {vigiado['url']}")
+    elif comando == 'verificar':
+        eventos = verificar_vigiados(armazenamento)
+        for vigiado, tipo, dados in eventos:
+            print(f"👁️ {descrever_evento(tipo, dados)} - {vigiado['url']}")
+        print(f"✅ {len(armazenamento.vigiados())} vigiado(s) ativo(s), {len(eventos)} evento(s)")
+    elif comando == 'eventos':
+        dias = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+        for evento in armazenamento.eventos(desde=desde_dias(dias)):
+            print(f"{evento['ocorrido_em'][:16]} {descrever_evento(evento['tipo'], evento['dados'])} - {evento['url']}")
+    else:
+        print("Uso: python3 vigilancia.py adicionar URL [motivo] | remover URL | listar | verificar | eventos [dias]")
@@ -54,6 +54,90 @@ cat > ./config/config.json << 'CONFIG_EOF'
         "enjoei",
         "ebay"
     ],
+    "limites_taxa": {
+        "padrao": {"taxa": 0.33, "rajada": 1, "simultaneas": 1},
+        "hosts": {
+            "api.mercadolibre.com": {"taxa": 0.5, "rajada": 2},
+            "olx.com.br": {"taxa": 1, "rajada": 3},
+            "shopee.com.br": {"taxa": 0.25, "rajada": 1},
+            "magazineluiza.com.br": {"taxa": 0.33, "rajada": 1},
+            "enjoei.com.br": {"taxa": 0.25, "rajada": 1},
+            "ebay.com": {"taxa": 0.25, "rajada": 1},
+            "americanas.com.br": {"taxa": 0.33, "rajada": 1},
+            "casasbahia.com.br": {"taxa": 0.33, "rajada": 1},
+            "pontofrio.com.br": {"taxa": 0.33, "rajada": 1}
+        }
+    },
+    "sessoes_http": {
+        "pool_conexoes": 10,
+        "pool_max": 10
+    },
+    "regioes_olx": {
+        "www": "Nacional",
+        "sp": "São Paulo",
+        "rj": "Rio de Janeiro",
+        "df": "Distrito Federal",
+        "mg": "Minas Gerais",
+        "pr": "Paraná",
+        "rs": "Rio Grande do Sul",
+        "ba": "Bahia",
+        "sc": "Santa Catarina",
+        "go": "Goiás"
+    },
+    "parsers_html": {
+        "padrao": "lxml"
+    },
+    "salvar_paginas": false,
+    "cache_http": {
+        "ativo": true,
+        "tamanho_max_mb": 200,
+        "ttl_minutos": {"padrao": 0, "pontofrio": 60, "casasbahia": 60, "americanas": 60}
+    },
+    "cache_extracoes": {
+        "ativo": true
+    },
+    "varredura_profunda": {
+        "ativo": true,
+        "max_paginas": 5,
+        "paginas_extras": 20,
+        "max_fronteira": 50,
+        "sites": {"olx": {"max_paginas": 8, "paginas_extras": 30}}
+    },
+    "enriquecimento": {
+        "ativo": true,
+        "score_minimo": 15,
+        "max_paginas": 10,
+        "validade_horas": 24,
+        "sites": {"ebay": {"score_minimo": 20}}
+    },
+    "vigilancia": {
+        "ativo": true,
+        "intervalo_minutos": 10,
+        "adicionar_alertas": true
+    },
+    "perfis_score": {},
+    "indice_vistos": {
+        "ativo": true
+    },
+    "registro_ndjson": {
+        "ativo": false,
+        "tamanho_segmento_mb": 8
+    },
+    "agendamento": {
+        "jitter": 0.1,
+        "score_alerta": 35,
+        "sites": {
+            "olx": {"intervalo_horas": 1, "score_alerta": 40},
+            "enjoei": {"score_alerta": 30},
+            "pontofrio": {"intervalo_horas": 6}
+        },
+        "adaptativo": {
+            "ativo": true,
+            "taxa_minima": 0.05,
+            "intervalo_minimo_horas": 0.25,
+            "intervalo_maximo_horas": 12
+        }
+    },
     "caracteristicas_unicas": [
         "anime matrix",
         "mini led", 
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# test_monitor_mercadolivre.py - Teste da busca do Mercado Livre sobre uma resposta conhecida da API (sem rede)
+
+import json
+import os
+import sys
+
+import requests
+
+# Os módulos compartilhados ficam em scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+import extracoes
+import monitor_asus_rog
+from monitor_asus_rog import MonitorASUSROG
+
+# Resposta da API de busca do Mercado Livre no formato real
+RESPOSTA_API_ML = {
+    'results': [
+        {
+            'title': 'Notebook ASUS ROG Zephyrus M16 GU604 AniMe Matrix',
+            'price': 4500,
+            'permalink': 'https://produto.mercadolivre.com.br/MLB-1234567890-notebook-asus-rog-zephyrus-m16',
+            'seller': {'nickname': 'VENDEDOR_TESTE'},
+            'address': {'city_name': 'Brasília'},
+            'date_created': '2024-01-01T10:00:00.000Z'
+        },
+        {
+            'title': 'Notebook Dell Inspiron 15 i5',
+            'price': 9500,
+            'permalink': 'https://produto.mercadolivre.com.br/MLB-9876543210-notebook-dell-inspiron',
+            'seller': {'nickname': 'OUTRO_VENDEDOR'},
+            'address': {'city_name': 'São Paulo'},
+            'date_created': '2024-01-01T11:00:00.000Z'
+        }
+    ]
+}
+
+
+def resposta_api():
+    """requests.Response com o corpo da API, como a camada de busca devolve"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(RESPOSTA_API_ML).encode('utf-8')
+    response.encoding = 'utf-8'
+    return response
+
+
+def test_extracao_mercadolivre():
+    anuncios = MonitorASUSROG().extrair_anuncios_mercadolivre(json.dumps(RESPOSTA_API_ML), 'GU604')
+
+    assert [anuncio['preco'] for anuncio in anuncios] == [4500, 9500]
+    assert anuncios[0]['titulo'] == 'Notebook ASUS ROG Zephyrus M16 GU604 AniMe Matrix'
+    assert anuncios[0]['url'].startswith('https://produto.mercadolivre.com.br/MLB-1234567890')
+    assert anuncios[0]['termo_busca'] == 'GU604'
+
+
+def test_busca_mercadolivre(monkeypatch):
+    # Caminho completo da busca, com a rede, o cache de extrações e o índice de vistos trocados
+    monkeypatch.setattr(monitor_asus_rog, 'fetch_many', lambda site, requisicoes, **kw: [resposta_api() for _ in requisicoes])
+    monkeypatch.setattr(extracoes, 'cache_extracoes_ativo', lambda: False)
+    monkeypatch.setattr(monitor_asus_rog, 'filtrar_novos', lambda site, anuncios: anuncios)
+    monkeypatch.setattr(monitor_asus_rog, 'registrar_scores', lambda site, candidatos: None)
+
+    candidatos = MonitorASUSROG().buscar_mercadolivre()
+
+    # O mesmo anúncio volta em todos os termos e é deduplicado; o Dell não passa do filtro
+    assert len(candidatos) == 1
+    assert candidatos[0]['preco'] == 4500
+    assert candidatos[0]['score_total'] >= 35
+    assert '🎯 Modelo Exato' in candidatos[0]['caracteristicas_encontradas']